@@ -1,21 +1,35 @@
 from django.contrib import admin
 from .models import *
+from .search import search_filter
+
+class FullTextSearchMixin:
+    """Admin search through the full-text index; falls back to search_fields when it finds nothing"""
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        condition = search_filter(self.search_kind, search_term) if search_term else None
+        if condition is not None and queryset.filter(condition).exists():
+            return queryset.filter(condition), False
+        return super().get_search_results(request, queryset, search_term)
 
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = 'customer'
     list_display = ['company_name', 'contact_name', 'email', 'gst_number', 'branch_location']
     search_fields = ['company_name', 'contact_name', 'gst_number']
     list_filter = ['branch_location']
 
 @admin.register(WorkOrder)
-class WorkOrderAdmin(admin.ModelAdmin):
+class WorkOrderAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = 'work_order'
     list_display = ['work_order_number', 'customer', 'project_title', 'total_cost', 'status', 'created_at']
-    list_filter = ['status', 'created_at']
+    list_filter = ['status', 'category', 'created_at']
     search_fields = ['work_order_number', 'customer__company_name', 'project_title']
     readonly_fields = ['work_order_number', 'created_at', 'updated_at']
 
 @admin.register(Invoice)
-class InvoiceAdmin(admin.ModelAdmin):
+class InvoiceAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = 'invoice'
     list_display = ['invoice_number', 'customer', 'total_amount', 'balance_due', 'status', 'due_date']
     list_filter = ['status', 'invoice_date']
     search_fields = ['invoice_number', 'customer__company_name']
@@ -59,4 +73,41 @@ class CompanySettingsAdmin(admin.ModelAdmin):
         # Allow only one company settings record
         if CompanySettings.objects.count() >= 1:
             return False
-        return True
\ No newline at end of file
+        return True
+
+@admin.register(RevenueRollup)
+class RevenueRollupAdmin(admin.ModelAdmin):
+    list_display = ['financial_year', 'month', 'is_migrated', 'status', 'invoice_count', 'total_amount', 'balance_due', 'amount_paid']
+    list_filter = ['financial_year', 'is_migrated', 'status']
+    readonly_fields = ['updated_at']
+
+@admin.register(MonthlySnapshot)
+class MonthlySnapshotAdmin(admin.ModelAdmin):
+    list_display = ['month', 'financial_year', 'invoiced_amount', 'collected_amount', 'outstanding_amount', 'invoice_count', 'frozen_at']
+    list_filter = ['financial_year']
+
+    def has_change_permission(self, request, obj=None):
+        # Frozen rows are read-only; use backfill_monthly_snapshots --refreeze
+        return False
+
+@admin.register(CostStatistic)
+class CostStatisticAdmin(admin.ModelAdmin):
+    list_display = ['scope', 'scope_key', 'count', 'mean', 'min_cost', 'max_cost', 'updated_at']
+    list_filter = ['scope']
+    exclude = ['histogram']
+
+@admin.register(NumberSequence)
+class NumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'period', 'last_value']
+    list_filter = ['name']
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'object_id', 'content', 'updated_at']
+    list_filter = ['kind']
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'target', 'status', 'done', 'total', 'created_by', 'created_at']
+    list_filter = ['kind', 'status']
+    readonly_fields = ['started_at', 'finished_at', 'updated_at']
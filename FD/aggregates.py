@@ -0,0 +1,136 @@
+# FD/aggregates.py - DATABASE-SIDE AGGREGATION FOR DASHBOARD AND LIST METRICS
+import asyncio
+from decimal import Decimal
+from django.db import models
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from .models import Customer, WorkOrder, RevenueRollup
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+
+def _sum(field, **extra):
+    """Null-safe decimal SUM() so empty groups come back as 0"""
+    return Coalesce(
+        Sum(field, **extra), Value(ZERO),
+        output_field=models.DecimalField(max_digits=20, decimal_places=2)
+    )
+
+def _breakdown_query(queryset=None):
+    if queryset is None:
+        return RevenueRollup.objects.order_by().values('is_migrated', 'status').annotate(
+            invoice_count=Coalesce(Sum('invoice_count'), Value(0)),
+            total_amount=_sum('total_amount'),
+            balance_due=_sum('balance_due'),
+            amount_paid=_sum('amount_paid'),
+        )
+    return queryset.order_by().values('is_migrated', 'status').annotate(
+        invoice_count=Count('id'),
+        total_amount=_sum('total_amount'),
+        balance_due=_sum('balance_due'),
+        amount_paid=_sum('amount_paid'),
+    )
+
+def invoice_breakdown(queryset=None):
+    """
+    Invoice totals grouped by (is_migrated, status).
+
+    Without a queryset the figures come from the RevenueRollup table, which
+    is kept current on every invoice/payment write, so the cost does not
+    grow with the invoice table. A filtered queryset is aggregated with one
+    grouped query instead. Either way at most len(STATUS_CHOICES) * 2 small
+    dicts come back for callers to fold in Python.
+    """
+    return list(_breakdown_query(queryset))
+
+async def ainvoice_breakdown(queryset=None):
+    """invoice_breakdown() for async views"""
+    return [row async for row in _breakdown_query(queryset)]
+
+def summarize_revenue(rows, is_migrated=None):
+    """Fold breakdown rows into revenue metrics, optionally for one data source"""
+    summary = {
+        'invoice_count': 0,
+        'total_revenue': ZERO,
+        'pending_payments': ZERO,
+        'active_invoices_count': 0,
+        'status_counts': {},
+        'status_totals': {},
+        'status_balances': {},
+    }
+    for row in rows:
+        if is_migrated is not None and row['is_migrated'] != is_migrated:
+            continue
+        status = row['status']
+        summary['invoice_count'] += row['invoice_count']
+        summary['total_revenue'] += row['total_amount']
+        summary['status_counts'][status] = summary['status_counts'].get(status, 0) + row['invoice_count']
+        summary['status_totals'][status] = summary['status_totals'].get(status, ZERO) + row['total_amount']
+        summary['status_balances'][status] = summary['status_balances'].get(status, ZERO) + row['balance_due']
+        if status != 'paid':
+            summary['pending_payments'] += row['balance_due']
+            summary['active_invoices_count'] += row['invoice_count']
+
+    # SQLite drops the scale on SUM(); keep money at two places like the fields
+    for key in ('total_revenue', 'pending_payments'):
+        summary[key] = summary[key].quantize(CENT)
+    for key in ('status_totals', 'status_balances'):
+        summary[key] = {status: value.quantize(CENT) for status, value in summary[key].items()}
+
+    total = summary['total_revenue']
+    summary['collected_revenue'] = total - summary['pending_payments']
+    summary['collection_rate'] = (summary['collected_revenue'] / total * 100) if total > 0 else 0
+    return summary
+
+def revenue_totals(queryset=None):
+    """All-data revenue metrics used by the list pages"""
+    return summarize_revenue(invoice_breakdown(queryset))
+
+async def arevenue_totals(queryset=None):
+    return summarize_revenue(await ainvoice_breakdown(queryset))
+
+SPLIT_COUNTS = {
+    'new': Count('id', filter=Q(is_migrated=False)),
+    'migrated': Count('id', filter=Q(is_migrated=True)),
+}
+
+def migration_split_counts(model):
+    """New vs migrated row counts for a model in a single conditional COUNT"""
+    return model.objects.aggregate(**SPLIT_COUNTS)
+
+async def amigration_split_counts(model):
+    return await model.objects.aaggregate(**SPLIT_COUNTS)
+
+def dashboard_metrics():
+    """
+    All dashboard counters in three constant-memory queries
+    (customers, work orders, invoices) instead of loading every invoice.
+    """
+    return _fold_dashboard_metrics(
+        migration_split_counts(Customer), migration_split_counts(WorkOrder), invoice_breakdown()
+    )
+
+async def adashboard_metrics():
+    """dashboard_metrics() with its three independent queries awaited together"""
+    customers, work_orders, rows = await asyncio.gather(
+        amigration_split_counts(Customer), amigration_split_counts(WorkOrder), ainvoice_breakdown()
+    )
+    return _fold_dashboard_metrics(customers, work_orders, rows)
+
+def _fold_dashboard_metrics(customers, work_orders, rows):
+    metrics = {
+        'new_customers_count': customers['new'],
+        'migrated_customers_count': customers['migrated'],
+        'new_work_orders_count': work_orders['new'],
+        'migrated_work_orders_count': work_orders['migrated'],
+    }
+    for prefix, is_migrated in (('new', False), ('migrated', True)):
+        summary = summarize_revenue(rows, is_migrated=is_migrated)
+        metrics.update({
+            f'{prefix}_invoices_count': summary['invoice_count'],
+            f'{prefix}_total_revenue': summary['total_revenue'],
+            f'{prefix}_pending_payments': summary['pending_payments'],
+            f'{prefix}_collected_revenue': summary['collected_revenue'],
+            f'{prefix}_collection_rate': summary['collection_rate'],
+        })
+    return metrics
@@ -0,0 +1,123 @@
+# FD/assets.py - INLINE <style> / <script> BLOCKS MOVED FROM TEMPLATES INTO STATIC FILES
+import os
+import re
+import textwrap
+from django.conf import settings
+
+# A block with no src; the body is everything up to the matching close tag
+INLINE_BLOCK = re.compile(r'(?P<indent>[ \t]*)<(?P<tag>style|script)\b(?P<attrs>[^>]*)>(?P<body>.*?)</(?P=tag)\s*>', re.S | re.I)
+TEMPLATE_SYNTAX = re.compile(r'{[{%#]')
+LOAD_STATIC = re.compile(r'{%\s*load\s[^%]*\bstatic\b[^%]*%}')
+EXTENDS = re.compile(r'{%\s*extends\s[^%]*%}[ \t]*\n?')
+SCRIPT_TYPES = ('', 'text/javascript', 'module')  # other types (JSON, templates) are data, not code
+EXTENSIONS = {'style': 'css', 'script': 'js'}
+
+def template_files():
+    """Every .html template under the project template directories, as (directory, relative path)"""
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.endswith('.html'):
+                    yield directory, os.path.relpath(os.path.join(root, name), directory)
+
+def static_directory():
+    return str(settings.STATICFILES_DIRS[0])
+
+def _script_type(attrs):
+    match = re.search(r'\btype\s*=\s*["\']?([^"\'\s>]+)', attrs, re.I)
+    return match.group(1).lower() if match else ''
+
+def inline_blocks(source):
+    """
+    (match, movable) for each inline style/script block. A block is movable
+    unless its body uses template syntax (it depends on the context) or
+    it is a script of a non-code type.
+    """
+    for match in INLINE_BLOCK.finditer(source):
+        attrs = match.group('attrs')
+        if match.group('tag').lower() == 'script' and (re.search(r'\bsrc\s*=', attrs, re.I) or _script_type(attrs) not in SCRIPT_TYPES):
+            continue
+        if not match.group('body').strip():
+            continue
+        yield match, not TEMPLATE_SYNTAX.search(match.group('body'))
+
+def asset_path(template, tag, index):
+    """Static path for the index-th (from 0) block of tag in template, e.g. FD/css/invoice_list.css"""
+    folder, name = os.path.split(os.path.splitext(template)[0])
+    suffix = f'-{index + 1}' if index else ''
+    return '/'.join(part for part in (folder.replace(os.sep, '/'), EXTENSIONS[tag], f'{name}{suffix}.{EXTENSIONS[tag]}') if part)
+
+def _reference(tag, attrs, path, indent):
+    if tag == 'style':
+        media = re.search(r'\bmedia\s*=\s*("[^"]*"|\'[^\']*\')', attrs, re.I)
+        return f'{indent}<link rel="stylesheet" href="{{% static \'{path}\' %}}"{" media=" + media.group(1) if media else ""}>'
+    return f'{indent}<script src="{{% static \'{path}\' %}}"{attrs.rstrip()}></script>'
+
+def _add_load_static(source):
+    if LOAD_STATIC.search(source):
+        return source
+    # {% extends %} has to stay the first tag
+    extends = EXTENDS.search(source)
+    if extends and not source[:extends.start()].strip():
+        return source[:extends.end()] + '{% load static %}\n' + source[extends.end():]
+    return '{% load static %}\n' + source
+
+def extract_template(source, template):
+    """
+    (new source, {static path: content}, [kept blocks]): every movable block
+    replaced by a <link> / <script src> at the same position, so the cascade
+    and script order are unchanged.
+    """
+    assets = {}
+    kept = []
+    counts = {}
+    pieces = []
+    position = 0
+    for match, movable in inline_blocks(source):
+        tag = match.group('tag').lower()
+        if not movable:
+            kept.append(f"{template}:{source.count(chr(10), 0, match.start()) + 1} <{tag}>")
+            continue
+        index = counts.get(tag, 0)
+        counts[tag] = index + 1
+        path = asset_path(template, tag, index)
+        assets[path] = textwrap.dedent(match.group('body').strip('\n')).rstrip() + '\n'
+        pieces.append(source[position:match.start()])
+        pieces.append(_reference(tag, match.group('attrs'), path, match.group('indent')))
+        position = match.end()
+    if not assets:
+        return source, assets, kept
+    pieces.append(source[position:])
+    return _add_load_static(''.join(pieces)), assets, kept
+
+def extract_all(write=True):
+    """
+    Move the inline blocks of every template into static files; returns
+    ({template: [static paths]}, [blocks left inline]). With write False
+    nothing is changed (a check).
+    """
+    changes = []
+    kept = []
+    for directory, template in template_files():
+        path = os.path.join(directory, template)
+        with open(path, encoding='utf-8') as handle:
+            source = handle.read()
+        new_source, assets, template_kept = extract_template(source, template)
+        kept += template_kept
+        if assets:
+            changes.append((template, path, new_source, assets))
+
+    targets = {asset: os.path.join(static_directory(), *asset.split('/')) for *_, assets in changes for asset in assets}
+    if write:
+        # Nothing is written unless every file can be
+        existing = [target for target in targets.values() if os.path.exists(target)]
+        if existing:
+            raise FileExistsError(f"Already exist (move or merge them first): {', '.join(existing)}")
+        for template, path, new_source, assets in changes:
+            for asset, content in assets.items():
+                os.makedirs(os.path.dirname(targets[asset]), exist_ok=True)
+                with open(targets[asset], 'w', encoding='utf-8') as handle:
+                    handle.write(content)
+            with open(path, 'w', encoding='utf-8') as handle:
+                handle.write(new_source)
+    return {template: list(assets) for template, _, _, assets in changes}, kept
@@ -0,0 +1,246 @@
+# FD/benchmarks.py - LATENCY / QUERY / MEMORY BENCHMARKS FOR EVERY FD ROUTE
+import math
+import random
+import time
+import tracemalloc
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from . import urls as fd_urls
+from .models import Customer, WorkOrder, Invoice, Payment
+
+# Routes that need an existing object, keyed by URL name
+ROUTE_OBJECTS = {
+    'customer_detail': Customer, 'customer_edit': Customer, 'customer_delete': Customer,
+    'customer_statement': Customer, 'customer_statement_pdf': Customer,
+    'workorder_detail': WorkOrder, 'workorder_edit': WorkOrder, 'workorder_delete': WorkOrder,
+    'convert_to_invoice': WorkOrder, 'print_workorder': WorkOrder, 'export_work_order_pdf': WorkOrder, 'project_analytics': WorkOrder,
+    'invoice_detail': Invoice, 'invoice_edit': Invoice, 'invoice_delete': Invoice,
+    'print_invoice': Invoice, 'invoice_preview': Invoice, 'export_invoice_pdf': Invoice,
+    'add_payment': Invoice, 'payment_delete': Payment,
+}
+
+# Extra query-string variants for list pages; {page}/{last_page}/{term} are filled per scale
+LIST_VARIANTS = {
+    'customer_list': ['search={term}', 'start_date={start}&end_date={end}', 'page={page}', 'page={last_page}'],
+    'workorder_list': ['search={term}', 'status=completed', 'status=completed&search={term}', 'page={page}', 'page={last_page}'],
+    'invoice_list': ['search={term}', 'status=paid', 'status=overdue&start_date={start}&end_date={end}', 'page={page}', 'page={last_page}'],
+}
+LIST_MODELS = {'customer_list': Customer, 'workorder_list': WorkOrder, 'invoice_list': Invoice}
+PAGE_SIZE = 10
+
+# Query strings for the GSTIN API routes, filled from existing customers
+GST_QUERIES = {
+    'gst_lookup': 'gst_number={gst_number}',
+    'gst_autocomplete': 'prefix={prefix}',
+    'gst_batch_lookup': 'gst_numbers={batch}',
+}
+
+# Side effects outside this database (legacy MySQL connection)
+SKIPPED_ROUTES = {'migrate_legacy_data': 'connects to the legacy MySQL server'}
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+def sample_pks(model, count, rng):
+    """count existing primary keys spread over the table, without ORDER BY RANDOM()"""
+    bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    pks = set()
+    for _ in range(count * 3):
+        pk = model.objects.filter(pk__gte=rng.randint(bounds['low'], bounds['high'])).order_by('pk').values_list('pk', flat=True).first()
+        pks.add(pk)
+        if len(pks) == count:
+            break
+    return sorted(pks)
+
+def list_context(url_name):
+    """Values substituted into LIST_VARIANTS for one list page"""
+    model = LIST_MODELS[url_name]
+    total = model.objects.count()
+    last_page = max(math.ceil(total / PAGE_SIZE), 1)
+    sample = Customer.objects.order_by('pk').values_list('company_name', flat=True).first() or 'test'
+    newest = model.objects.aggregate(newest=Max('created_at'))['newest']
+    end = newest.date() if newest else None
+    start = end.replace(day=1) if end else None
+    return {
+        'term': sample.split()[0],
+        'page': max(last_page // 2, 1),
+        'last_page': last_page,
+        'start': start or '',
+        'end': end or '',
+    }
+
+def build_cases(samples=3, seed=42):
+    """
+    (label, url_name, [paths]) for every named route in FD/urls.py. Detail
+    routes rotate through `samples` objects; list routes add search, filter
+    and deep-page variants. Unknown routes are returned as skipped.
+    """
+    rng = random.Random(seed)
+    cases, skipped = [], []
+    pk_cache = {}
+    for pattern in fd_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        name = pattern.name
+        params = list(pattern.pattern.converters)
+        if name in SKIPPED_ROUTES:
+            skipped.append({'url_name': name, 'reason': SKIPPED_ROUTES[name]})
+        elif not params:
+            cases.append((name, name, [reverse(name)]))
+            if name in LIST_VARIANTS:
+                context = list_context(name)
+                for variant in LIST_VARIANTS[name]:
+                    query = variant.format(**context)
+                    cases.append((f'{name}?{variant}', name, [f'{reverse(name)}?{query}']))
+            elif name in GST_QUERIES:
+                gst_numbers = list(Customer.objects.order_by('pk').values_list('gst_number', flat=True)[:20]) or ['24AAACA0000A1Z5']
+                query = GST_QUERIES[name].format(gst_number=gst_numbers[0], prefix=gst_numbers[0][:4], batch=','.join(gst_numbers))
+                cases[-1] = (name, name, [f'{reverse(name)}?{query}'])
+        elif name in ROUTE_OBJECTS:
+            model = ROUTE_OBJECTS[name]
+            if model not in pk_cache:
+                pk_cache[model] = sample_pks(model, samples, rng)
+            if not pk_cache[model]:
+                skipped.append({'url_name': name, 'reason': f'no {model._meta.verbose_name} rows'})
+                continue
+            paths = [reverse(name, kwargs={params[0]: pk}) for pk in pk_cache[model]]
+            cases.append((name, name, paths))
+        else:
+            skipped.append({'url_name': name, 'reason': 'no benchmark case defined'})
+    return cases, skipped
+
+def _fetch(client, path):
+    response = client.get(path, secure=True)
+    # Streaming responses do their work while being consumed
+    if getattr(response, 'streaming', False):
+        b''.join(response.streaming_content)
+    else:
+        response.content
+    return response
+
+def run_case(client, label, url_name, paths, repeat=5, cold=False):
+    """Time one route: a warm-up request, `repeat` timed requests, then one traced for memory"""
+    _fetch(client, paths[0])
+    timings, queries, statuses = [], [], set()
+    for index in range(repeat):
+        path = paths[index % len(paths)]
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = _fetch(client, path)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+        statuses.add(response.status_code)
+
+    # tracemalloc slows everything down, so memory gets its own request
+    if cold:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        _fetch(client, paths[-1])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'label': label,
+        'url_name': url_name,
+        'path': paths[0],
+        'status': sorted(statuses),
+        'requests': repeat,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+def benchmark_routes(repeat=5, samples=3, seed=42, cold=False, stdout=None):
+    """Benchmark every FD route against the current database"""
+    # A failing view is reported with its 500 status instead of stopping the run
+    client = Client(raise_request_exception=False)
+    user, _ = User.objects.get_or_create(username='fd-benchmark', defaults={'is_staff': True})
+    client.force_login(user)  # the query log page is staff-only
+
+    cases, skipped = build_cases(samples=samples, seed=seed)
+    results = []
+    for label, url_name, paths in cases:
+        result = run_case(client, label, url_name, paths, repeat=repeat, cold=cold)
+        results.append(result)
+        if stdout:
+            stdout.write(f"  {label:<60} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  {result['queries']:>4} queries  {result['peak_memory_kb']:>9.1f} KB")
+    return {'routes': results, 'skipped': skipped}
+
+def compare_runs(previous, current):
+    """Per-scale, per-route p95 and query-count change between two benchmark JSON documents"""
+    rows = []
+    previous_scales = {scale['invoices']: scale for scale in previous.get('scales', [])}
+    for scale in current.get('scales', []):
+        before = previous_scales.get(scale['invoices'])
+        if not before:
+            continue
+        before_routes = {route['label']: route for route in before['routes']}
+        for route in scale['routes']:
+            old = before_routes.get(route['label'])
+            if not old:
+                continue
+            rows.append({
+                'invoices': scale['invoices'],
+                'label': route['label'],
+                'p95_before': old['p95_ms'],
+                'p95_after': route['p95_ms'],
+                'p95_change_pct': round((route['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100, 1) if old['p95_ms'] else None,
+                'queries_before': old['queries'],
+                'queries_after': route['queries'],
+            })
+    return rows
+
+def benchmark_pdf_layouts(count=50, seed=42, stdout=None):
+    """
+    Per-document PDF render time for invoices and work orders: a Layout
+    built for every document (fonts, styles, header) against the shared
+    per-process one. Rendering only; no queries or storage are timed.
+    """
+    from .conditional import ACTIVE_SETTINGS
+    from .pdf import Layout, get_layout, render_invoice_pdf, render_work_order_pdf
+
+    rng = random.Random(seed)
+    company_settings = ACTIVE_SETTINGS.first()
+    renderers = [('invoice', Invoice, render_invoice_pdf), ('work_order', WorkOrder, render_work_order_pdf)]
+    modes = [('fresh_layout', Layout), ('shared_layout', get_layout)]
+    results = []
+    for kind, model, render in renderers:
+        objects = list(model.objects.select_related('customer').filter(pk__in=sample_pks(model, count, rng)))
+        if not objects:
+            continue
+        render(objects[0], company_settings)  # warm-up: imports, font registration
+        for mode, layout_for in modes:
+            timings, sizes = [], []
+            for obj in objects:
+                started = time.perf_counter()
+                data = render(obj, company_settings, layout=layout_for())
+                timings.append((time.perf_counter() - started) * 1000)
+                sizes.append(len(data))
+            result = {
+                'kind': kind,
+                'mode': mode,
+                'documents': len(objects),
+                'p50_ms': round(percentile(timings, 50), 2),
+                'p95_ms': round(percentile(timings, 95), 2),
+                'mean_ms': round(sum(timings) / len(timings), 2),
+                'mean_kb': round(sum(sizes) / len(sizes) / 1024, 1),
+            }
+            results.append(result)
+            if stdout:
+                stdout.write(f"  {kind:<12} {mode:<14} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  mean {result['mean_ms']:>8.2f} ms  {result['mean_kb']:>7.1f} KB")
+    return results
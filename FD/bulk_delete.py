@@ -0,0 +1,87 @@
+# FD/bulk_delete.py - CHUNKED BULK DELETE OF CUSTOMERS, WORK ORDERS AND INVOICES
+from itertools import islice
+from django.db import transaction
+from .filters import LIST_MODELS, active_filters, filtered_queryset
+from .jobs import enqueue, report_progress
+from .models import Invoice, WorkOrder
+
+BATCH_SIZE = 100   # selected rows per progress step
+CHUNK_SIZE = 200   # rows per delete transaction
+
+# Rows referencing each kind, deleted first (bottom-up) so no single delete
+# cascades through a customer's whole history; invoices take their
+# payments and reminder logs with them, a few rows each
+DEPENDENTS = {
+    'customer': [(Invoice, 'customer_id'), (WorkOrder, 'customer_id')],
+    'work_order': [(Invoice, 'work_order_id')],
+    'invoice': [],
+}
+
+def pk_ranges(pks):
+    """Sorted pks as [first, last] runs of consecutive values: a compact, exact snapshot"""
+    ranges = []
+    for pk in pks:
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ranges
+
+def start_bulk_delete(kind, ids=None, filters=None, created_by=''):
+    """
+    Queue deletion of the rows of kind with the given ids, or (ids empty)
+    of the rows matching the list filters now. Either way the job holds
+    the exact pks, so rows added or edited into the filter later are left
+    alone. Raises ValueError for bad ids or when no filter narrows the list.
+    """
+    if ids:
+        ids = sorted({int(pk) for pk in ids})
+        params = {'ids': ids}
+        total = len(ids)
+    else:
+        filters = active_filters(kind, filters or {})
+        if not filters:
+            raise ValueError("Deleting every row needs a filter")
+        matching = filtered_queryset(kind, filters)[0].order_by('pk').values_list('pk', flat=True)
+        ranges = pk_ranges(matching.iterator(chunk_size=2000))
+        params = {'filters': filters, 'ranges': ranges}
+        total = sum(last - first + 1 for first, last in ranges)
+    return enqueue('bulk_delete', target=kind, params=params, total=total, created_by=created_by)
+
+def delete_in_chunks(queryset):
+    """Delete queryset CHUNK_SIZE rows per transaction; returns the number of rows"""
+    deleted = 0
+    while True:
+        chunk = list(queryset.order_by('pk').values_list('pk', flat=True)[:CHUNK_SIZE])
+        if not chunk:
+            return deleted
+        with transaction.atomic():
+            queryset.model.objects.filter(pk__in=chunk).delete()
+        deleted += len(chunk)
+
+def delete_batch(kind, pks):
+    for model, field in DEPENDENTS[kind]:
+        delete_in_chunks(model.objects.filter(**{f'{field}__in': pks}))
+    delete_in_chunks(LIST_MODELS[kind].objects.filter(pk__in=pks))
+
+def target_pks(params):
+    """The pks a job was confirmed for, in order"""
+    if 'ids' in params:
+        yield from params['ids']
+        return
+    for first, last in params['ranges']:
+        yield from range(first, last + 1)
+
+def target_batches(job):
+    # Resume after the batches a previous worker finished
+    pks = islice(target_pks(job.params), job.done, None)
+    while True:
+        batch = list(islice(pks, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+def run_bulk_delete(job):
+    for pks in target_batches(job):
+        delete_batch(job.target, pks)
+        report_progress(job, len(pks))
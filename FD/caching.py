@@ -0,0 +1,104 @@
+# FD/caching.py - VERSIONED SHARED CACHE ENTRIES WITH SINGLE-FLIGHT RECOMPUTE
+import asyncio
+import time
+import uuid
+from django.core.cache import cache
+from django.db import transaction
+
+DATA_VERSION_KEY = 'fd:data_version'
+LOCK_TIMEOUT = 60       # seconds a recompute may hold the lock
+WAIT_FOR_RECOMPUTE = 10  # seconds a waiter polls before computing itself
+POLL_INTERVAL = 0.05
+
+def get_data_version():
+    """Version token that every Invoice/WorkOrder/Customer/Payment write replaces"""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+async def aget_data_version():
+    version = await cache.aget(DATA_VERSION_KEY)
+    if version is None:
+        await cache.aadd(DATA_VERSION_KEY, uuid.uuid4().hex, None)
+        version = await cache.aget(DATA_VERSION_KEY)
+    return version
+
+def bump_data_version():
+    # A fresh token rather than incr(): not every backend increments atomically,
+    # and two writers must never end up publishing the same version
+    cache.set(DATA_VERSION_KEY, uuid.uuid4().hex, None)
+
+def bump_data_version_on_commit():
+    """Invalidate after the write is visible, so a recompute cannot cache old rows"""
+    transaction.on_commit(bump_data_version)
+
+def get_or_compute(name, compute, timeout=24 * 60 * 60):
+    """
+    Return the cached value of compute() for the current data version.
+
+    Only one caller recomputes a missing entry (guarded by cache.add());
+    concurrent callers get the previous version while it runs, or wait
+    for the fresh value if there is nothing older to serve.
+    """
+    key = f'{name}:v{get_data_version()}'
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    last_key = f'{name}:last'
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set_many({key: value, last_key: value}, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    stale = cache.get(last_key)
+    if stale is not None:
+        return stale
+
+    deadline = time.monotonic() + WAIT_FOR_RECOMPUTE
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            break
+    # The lock holder failed or is too slow; compute without caching it twice
+    return cache.get(key) or compute()
+
+async def aget_or_compute(name, compute, timeout=24 * 60 * 60):
+    """get_or_compute() for async views: compute is a coroutine function and waiting never blocks the loop"""
+    key = f'{name}:v{await aget_data_version()}'
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    last_key = f'{name}:last'
+    lock_key = f'{key}:lock'
+    if await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = await compute()
+            await cache.aset_many({key: value, last_key: value}, timeout)
+        finally:
+            await cache.adelete(lock_key)
+        return value
+
+    stale = await cache.aget(last_key)
+    if stale is not None:
+        return stale
+
+    deadline = time.monotonic() + WAIT_FOR_RECOMPUTE
+    while time.monotonic() < deadline:
+        await asyncio.sleep(POLL_INTERVAL)
+        value = await cache.aget(key)
+        if value is not None:
+            return value
+        if await cache.aget(lock_key) is None:
+            break
+    return await cache.aget(key) or await compute()
@@ -0,0 +1,127 @@
+# FD/conditional.py - ETAG / LAST-MODIFIED VALIDATORS FOR DETAIL, PREVIEW AND PRINT PAGES
+import functools
+import hashlib
+import os
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db.models import Count, Max, Subquery
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from .models import Customer, WorkOrder, Invoice, Payment, CompanySettings
+
+# The settings row the invoice pages render (CompanySettings.objects.filter(is_active=True).first())
+ACTIVE_SETTINGS = CompanySettings.objects.filter(is_active=True).order_by('pk')
+
+@functools.lru_cache(maxsize=None)
+def render_version():
+    """
+    Newest template mtime and the static manifest hash at startup, so a
+    deploy that changes a page or the hashed asset URLs it links also
+    changes its ETags and cached renderings
+    """
+    newest = 0
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    # ManifestStaticFilesStorage only; '' before collectstatic and for plain storage
+    return f"{newest}:{getattr(staticfiles_storage, 'manifest_hash', '')}"
+
+# Each state function returns (timestamps, signature) for the page's object,
+# or None when it does not exist: the timestamps give Last-Modified, the
+# signature (everything the page renders that has no timestamp) joins them
+# in the ETag. Each is one or two small queries instead of a full render.
+
+def invoice_state(pk):
+    """Invoice detail, preview, print and PDF: invoice, customer, work order, payments, company settings"""
+    row = Invoice.objects.filter(pk=pk).annotate(
+        settings_pk=Subquery(ACTIVE_SETTINGS.values('pk')[:1]),
+        settings_updated=Subquery(ACTIVE_SETTINGS.values('updated_at')[:1]),
+    ).values_list(
+        'updated_at', 'customer__updated_at', 'work_order__updated_at', 'settings_updated', 'settings_pk',
+    ).first()
+    if row is None:
+        return None
+    # Payments have no updated_at and can change without a save of the invoice
+    # (pending payments, admin edits), so their rendered fields are compared
+    payments = list(Payment.objects.filter(invoice_id=pk).order_by('pk').values())
+    timestamps = [*row[:4], *(payment['created_at'] for payment in payments)]
+    return timestamps, (row, [sorted(payment.items()) for payment in payments])
+
+def work_order_state(pk):
+    """Work order print and PDF: the work order, its customer, company settings"""
+    row = WorkOrder.objects.filter(pk=pk).annotate(
+        settings_pk=Subquery(ACTIVE_SETTINGS.values('pk')[:1]),
+        settings_updated=Subquery(ACTIVE_SETTINGS.values('updated_at')[:1]),
+    ).values_list('updated_at', 'customer__updated_at', 'settings_updated', 'settings_pk').first()
+    return (row[:3], row) if row else None
+
+def customer_state(pk):
+    """Customer detail: the customer and its work order list (including which are invoiced)"""
+    row = Customer.objects.filter(pk=pk).annotate(
+        work_order_count=Count('workorder', distinct=True),
+        work_orders_updated=Max('workorder__updated_at'),
+        invoiced_count=Count('workorder__invoice', distinct=True),
+    ).values_list('updated_at', 'work_orders_updated', 'work_order_count', 'invoiced_count').first()
+    if row is None:
+        return None
+    # The list shows "created ... ago"; let that text age by at most an hour
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    return [*row[:2], hour], row
+
+PAGE_STATES = {
+    'invoice': invoice_state,
+    'work_order': work_order_state,
+    'customer': customer_state,
+}
+
+def _digest(*parts):
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+def content_version(kind, pk):
+    """
+    (version, last_modified) of the data a page of kind renders for pk, or
+    (None, None) when it does not exist. The version changes whenever any
+    of that data does; rendered PDFs are stored under it.
+    """
+    state = PAGE_STATES[kind](pk)
+    if state is None:
+        return None, None
+    timestamps, signature = state
+    return _digest(kind, signature), max(value for value in timestamps if value is not None)
+
+def validators(request, kind, pk):
+    """(etag, last_modified, content version) of a page, computed once per request"""
+    computed = request.__dict__.setdefault('_fd_validators', {})
+    if (kind, pk) not in computed:
+        version, last_modified = content_version(kind, pk)
+        # Pages greet the signed-in user, so the user is part of the tag
+        etag = f'"{_digest(version, request.user.pk, render_version())}"' if version else None
+        computed[kind, pk] = (etag, last_modified, version)  # None: the view answers 404
+    return computed[kind, pk]
+
+def conditional_page(kind):
+    """
+    Decorator for a page about one object of kind (pk URL argument): 304 Not
+    Modified without rendering when the client's copy is still current.
+    Responses are private and revalidated on every visit, so a browser
+    never shows a stale copy from a heuristic cache.
+    """
+    def etag(request, pk, **kwargs):
+        return validators(request, kind, pk)[0]
+
+    def last_modified(request, pk, **kwargs):
+        return validators(request, kind, pk)[1]
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
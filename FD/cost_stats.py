@@ -0,0 +1,188 @@
+# FD/cost_stats.py - STREAMING COST STATISTICS FOR PROJECT ANALYTICS
+import math
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from .models import WorkOrder, CostStatistic
+
+# Cost bands in rupees: (upper bound, key); the last band is open-ended
+COST_BANDS = [
+    (10000, 'under_10k'),
+    (50000, '10k_50k'),
+    (100000, '50k_1l'),
+    (500000, '1l_5l'),
+    (None, 'above_5l'),
+]
+
+# Percentile sketch: 8 log-spaced buckets per decade from ₹1 to ₹10 crore,
+# plus one bucket for anything below ₹1. Fixed size, so ranks are O(1).
+BUCKETS_PER_DECADE = 8
+DECADES = 8
+BUCKET_COUNT = BUCKETS_PER_DECADE * DECADES + 1
+CENT = Decimal('0.01')
+
+def cost_band(cost):
+    for upper, key in COST_BANDS:
+        if upper is None or cost < upper:
+            return key
+
+def bucket_for(cost):
+    if cost < 1:
+        return 0
+    return min(int(math.log10(cost) * BUCKETS_PER_DECADE) + 1, BUCKET_COUNT - 1)
+
+def bucket_midpoint(index):
+    if index == 0:
+        return 0.5
+    return 10 ** ((index - 0.5) / BUCKETS_PER_DECADE)
+
+def scope_keys(customer_id, category_id, cost):
+    keys = [('all', ''), ('customer', str(customer_id)), ('band', cost_band(cost))]
+    if category_id:
+        keys.append(('category', str(category_id)))
+    return keys
+
+def cost_stat_values(pk):
+    """Stored state of a work order as far as the statistics are concerned"""
+    return WorkOrder.objects.filter(pk=pk).values('status', 'total_cost', 'customer_id', 'category_id').first()
+
+def _observation(values):
+    """(cost, scope keys) when the work order counts as a completed project, else None"""
+    if values is None:
+        return None
+    if isinstance(values, WorkOrder):
+        values = {
+            'status': values.status,
+            'total_cost': values.total_cost,
+            'customer_id': values.customer_id,
+            'category_id': values.category_id,
+        }
+    if values['status'] != 'completed':
+        return None
+    # A just-saved instance may hold more places than the column stores; the
+    # cost added now must equal the one removed later from the stored row
+    cost = float(Decimal(values['total_cost'] or 0).quantize(CENT))
+    return cost, tuple(scope_keys(values['customer_id'], values['category_id'], cost))
+
+def record_work_order_change(previous, current):
+    """
+    Apply a work order write to the statistics.
+
+    Transitions to 'completed' add the cost, transitions away (or deletes)
+    remove it, and edits to a completed project replace it. Call inside the
+    transaction that writes the work order.
+    """
+    old, new = _observation(previous), _observation(current)
+    if old == new:
+        return
+    if old:
+        _update(*old, sign=-1)
+    if new:
+        _update(*new, sign=1)
+
+def _locked_stat(scope, scope_key):
+    stat = CostStatistic.objects.select_for_update().filter(scope=scope, scope_key=scope_key).first()
+    if stat is not None:
+        return stat
+    try:
+        with transaction.atomic():
+            return CostStatistic.objects.create(scope=scope, scope_key=scope_key, histogram=[0] * BUCKET_COUNT)
+    except IntegrityError:
+        return CostStatistic.objects.select_for_update().get(scope=scope, scope_key=scope_key)
+
+def _welford(stat, cost, sign):
+    """Add (sign=1) or remove (sign=-1) one observation in place"""
+    if sign > 0:
+        stat.count += 1
+        delta = cost - stat.mean
+        stat.mean += delta / stat.count
+        stat.m2 += delta * (cost - stat.mean)
+        stat.min_cost = cost if stat.min_cost is None else min(stat.min_cost, cost)
+        stat.max_cost = cost if stat.max_cost is None else max(stat.max_cost, cost)
+    elif stat.count <= 1:
+        stat.count, stat.mean, stat.m2 = 0, 0.0, 0.0
+        stat.min_cost = stat.max_cost = None
+    else:
+        # min/max cannot be un-observed; they stay as the observed range
+        previous_mean = stat.mean
+        stat.count -= 1
+        stat.mean = (previous_mean * (stat.count + 1) - cost) / stat.count
+        stat.m2 = max(stat.m2 - (cost - previous_mean) * (cost - stat.mean), 0.0)
+
+    histogram = list(stat.histogram) or [0] * BUCKET_COUNT
+    bucket = bucket_for(cost)
+    histogram[bucket] = max(histogram[bucket] + sign, 0)
+    stat.histogram = histogram
+
+def _update(cost, keys, sign):
+    for scope, scope_key in keys:
+        stat = _locked_stat(scope, scope_key)
+        _welford(stat, cost, sign)
+        stat.save()
+
+def percentile_rank(stat, cost):
+    """Mid-rank percentile of cost within the group, from the bucket sketch"""
+    if not stat.count:
+        return None
+    bucket = bucket_for(cost)
+    below = sum(stat.histogram[:bucket])
+    return round((below + stat.histogram[bucket] / 2) / stat.count * 100, 1)
+
+def percentile_value(stat, percentile):
+    """Approximate cost at a percentile (bucket midpoint)"""
+    if not stat.count:
+        return None
+    target = stat.count * percentile / 100
+    running = 0
+    for index, count in enumerate(stat.histogram):
+        running += count
+        if running >= target and count:
+            return round(bucket_midpoint(index), 2)
+    return stat.max_cost
+
+def summarize(stat, cost):
+    std_dev = stat.std_dev
+    return {
+        'count': stat.count,
+        'average_cost': round(stat.mean, 2),
+        'std_dev': round(std_dev, 2),
+        'variance': round(stat.variance, 2),
+        'z_score': round((cost - stat.mean) / std_dev, 2) if std_dev > 0 else 0.0,
+        'percentile_rank': percentile_rank(stat, cost),
+        'median_cost': percentile_value(stat, 50),
+        'p90_cost': percentile_value(stat, 90),
+        'cost_variance_percentage': round((cost - stat.mean) / stat.mean * 100, 1) if stat.mean > 0 else 0,
+    }
+
+def project_statistics(work_order):
+    """Comparison of one work order against every group it belongs to, in one query"""
+    cost = float(work_order.total_cost or 0)
+    keys = scope_keys(work_order.customer_id, work_order.category_id, cost)
+    lookup = Q()
+    for scope, scope_key in keys:
+        lookup |= Q(scope=scope, scope_key=scope_key)
+    stats = {(stat.scope, stat.scope_key): stat for stat in CostStatistic.objects.filter(lookup)}
+
+    result = {}
+    for scope, scope_key in keys:
+        stat = stats.get((scope, scope_key))
+        if stat is not None and stat.count:
+            result[scope] = summarize(stat, cost)
+    return result
+
+def rebuild_cost_statistics(work_order_model=WorkOrder, stat_model=CostStatistic):
+    """Recompute every group from completed work orders in one streamed pass"""
+    groups = defaultdict(lambda: stat_model(histogram=[0] * BUCKET_COUNT))
+    completed = work_order_model.objects.filter(status='completed').values_list('total_cost', 'customer_id', 'category_id')
+    for total_cost, customer_id, category_id in completed.iterator(chunk_size=2000):
+        cost = float(total_cost or 0)
+        for scope, scope_key in scope_keys(customer_id, category_id, cost):
+            stat = groups[(scope, scope_key)]
+            stat.scope, stat.scope_key = scope, scope_key
+            _welford(stat, cost, 1)
+
+    with transaction.atomic():
+        stat_model.objects.all().delete()
+        stat_model.objects.bulk_create(groups.values(), batch_size=500)
+    return len(groups)
@@ -0,0 +1,260 @@
+# FD/exports.py - STREAMING CSV / XLSX EXPORT OF THE LIST PAGES
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+CHUNK_SIZE = 2000  # rows per keyset batch
+
+# kind -> [(column header, ORM lookup)]
+EXPORT_COLUMNS = {
+    'customer': [
+        ('Company', 'company_name'),
+        ('Contact', 'contact_name'),
+        ('Email', 'email'),
+        ('Mobile', 'mobile_number'),
+        ('GSTIN', 'gst_number'),
+        ('Address', 'address'),
+        ('Branch', 'branch_location'),
+        ('Created', 'created_at'),
+    ],
+    'work_order': [
+        ('Work Order', 'work_order_number'),
+        ('Customer', 'customer__company_name'),
+        ('GSTIN', 'customer__gst_number'),
+        ('Project', 'project_title'),
+        ('Status', 'status'),
+        ('Base Amount', 'base_amount'),
+        ('Discount', 'discount_amount'),
+        ('GST', 'gst_amount'),
+        ('Total', 'total_cost'),
+        ('Created', 'created_at'),
+    ],
+    'invoice': [
+        ('Invoice', 'invoice_number'),
+        ('Invoice Date', 'invoice_date'),
+        ('Due Date', 'due_date'),
+        ('Customer', 'customer__company_name'),
+        ('GSTIN', 'customer__gst_number'),
+        ('Work Order', 'work_order__work_order_number'),
+        ('Project', 'work_order__project_title'),
+        ('Status', 'status'),
+        ('Subtotal', 'subtotal'),
+        ('CGST', 'cgst_amount'),
+        ('SGST', 'sgst_amount'),
+        ('IGST', 'igst_amount'),
+        ('Total', 'total_amount'),
+        ('Balance Due', 'balance_due'),
+    ],
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+def export_rows(queryset, lookups, chunk_size=CHUNK_SIZE):
+    """
+    Value tuples of queryset, newest first, in keyset batches on the
+    primary key: memory stays flat on every backend (mysqlclient buffers
+    a whole result set, so one long .iterator() query would not) and
+    each batch is an indexed range read.
+    """
+    queryset = queryset.order_by('-pk').values_list('pk', *lookups)
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__lt=last_pk)
+        rows = list(batch[:chunk_size])
+        for row in rows:
+            yield row[1:]
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
+
+def _local(value):
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+# --- CSV -----------------------------------------------------------------
+
+class _Echo:
+    """File-like object for csv.writer that hands each line back instead of storing it"""
+
+    def write(self, value):
+        return value
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def csv_value(value):
+    if value is None:
+        return ''
+    # Text that a spreadsheet would run as a formula is quoted
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return _local(value)
+
+def csv_stream(headers, rows):
+    writer = csv.writer(_Echo())
+    # BOM so Excel opens the UTF-8 file with the right encoding
+    yield '\ufeff' + writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([csv_value(value) for value in row])
+
+# --- XLSX ----------------------------------------------------------------
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Cell styles: 0 text/general, 1 bold header, 2 date, 3 date-time, 4 amount
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="5">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '</cellXfs>'
+        '</styleSheet>'
+    ),
+}
+EXCEL_EPOCH = datetime(1899, 12, 30)
+# Characters XML 1.0 does not allow, even escaped
+ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+def column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def xlsx_cell(ref, value, header=False):
+    if value is None or value == '':
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, datetime):
+        serial = (_local(value) - EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c r="{ref}" s="3"><v>{serial:.6f}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="2"><v>{(value - EXCEL_EPOCH.date()).days}</v></c>'
+    if isinstance(value, Decimal):
+        return f'<c r="{ref}" s="4"><v>{value}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(ILLEGAL_XML.sub('', str(value)))
+    style = ' s="1"' if header else ''
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+class _ChunkBuffer:
+    """Write-only, non-seekable file for ZipFile; the stream drains it after each row"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def xlsx_stream(headers, rows, sheet_name='Export'):
+    """
+    A one-sheet workbook written as it is sent: the zip entries use data
+    descriptors (no seeking back), cells hold inline strings (no shared
+    string table to keep in memory).
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        yield buffer.drain()
+
+        letters = [column_letter(index) for index in range(len(headers))]
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/></sheetView></sheetViews>'
+                b'<sheetData>'
+            )
+            sheet.write(('<row r="1">' + ''.join(
+                xlsx_cell(f'{letter}1', header, header=True) for letter, header in zip(letters, headers)
+            ) + '</row>').encode())
+            yield buffer.drain()
+
+            for number, row in enumerate(rows, start=2):
+                sheet.write((f'<row r="{number}">' + ''.join(
+                    xlsx_cell(f'{letter}{number}', value) for letter, value in zip(letters, row)
+                ) + '</row>').encode())
+                if buffer.chunks:
+                    yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
+
+# --- Response ------------------------------------------------------------
+
+def export_response(kind, queryset, file_format='csv'):
+    """StreamingHttpResponse with every row of queryset; bytes start flowing before the first query"""
+    file_format = file_format if file_format in CONTENT_TYPES else 'csv'
+    headers, lookups = zip(*EXPORT_COLUMNS[kind])
+    rows = export_rows(queryset, lookups)
+    if file_format == 'xlsx':
+        content = xlsx_stream(headers, rows, sheet_name=f"{kind.replace('_', ' ').title()}s")
+    else:
+        content = csv_stream(headers, rows)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[file_format])
+    filename = f"{kind.replace('_', '-')}s-{timezone.localdate():%Y%m%d}.{file_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
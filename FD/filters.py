@@ -0,0 +1,71 @@
+# FD/filters.py - SEARCH / STATUS / DATE FILTERS SHARED BY THE LIST PAGES AND BULK JOBS
+from datetime import date, datetime, timedelta
+from django.db.models import Q
+from django.utils import timezone
+from .models import Customer, WorkOrder, Invoice
+from .search import search_filter, search_ids, tokenize
+
+LIST_MODELS = {'customer': Customer, 'work_order': WorkOrder, 'invoice': Invoice}
+FILTER_PARAMS = ('search', 'status', 'start_date', 'end_date')
+
+def created_between(start, end):
+    """
+    Filter for rows created on local days start..end inclusive. A plain
+    range on created_at, unlike created_at__date, can use its indexes.
+    """
+    after = timezone.make_aware(datetime.combine(start, datetime.min.time()))
+    before = timezone.make_aware(datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    return Q(created_at__gte=after, created_at__lt=before)
+
+def date_range(params):
+    """(start, end) dates of start_date / end_date, or None unless both are valid"""
+    try:
+        start = datetime.strptime(params.get('start_date') or '', '%Y-%m-%d').date()
+        end = datetime.strptime(params.get('end_date') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    # created_between() needs the day after end
+    return (start, end) if end < date.max else None
+
+def active_filters(kind, params):
+    """The filter parameters that actually narrow the list of kind; empty means every row"""
+    active = {}
+    if tokenize(params.get('search', '')):
+        active['search'] = params.get('search')
+    if params.get('status') and kind != 'customer':
+        active['status'] = params.get('status')
+    if date_range(params):
+        active.update(start_date=params.get('start_date'), end_date=params.get('end_date'))
+    return active
+
+def filter_params(params):
+    """The list-filter parameters of a QueryDict, as a plain dict (stored on bulk jobs)"""
+    return {key: params.get(key) for key in FILTER_PARAMS if params.get(key)}
+
+def filtered_queryset(kind, params):
+    """
+    (queryset, ranked_ids) of a list page for its GET parameters.
+    ranked_ids are the best full-text matches, first SEARCH_LIMIT only, for
+    ordering; the queryset holds every match. None without a search.
+    """
+    model = LIST_MODELS[kind]
+    queryset = model.objects.all().order_by('-created_at')
+    ranked_ids = None
+
+    search_query = params.get('search', '')
+    if search_query:
+        # Ranked full-text matches (company, contact, GSTIN, numbers, project title)
+        ranked_ids = search_ids(kind, search_query)
+        if ranked_ids is not None:
+            queryset = queryset.filter(search_filter(kind, search_query))
+
+    status_filter = params.get('status', '')
+    if status_filter and kind != 'customer':
+        queryset = queryset.filter(status=status_filter)
+
+    # Date range filtering; an invalid range is ignored
+    dates = date_range(params)
+    if dates:
+        queryset = queryset.filter(created_between(*dates))
+
+    return queryset, ranked_ids
@@ -0,0 +1,130 @@
+# FD/forecasting.py - MONTHLY REVENUE / CUSTOMER FORECASTS FOR AI ANALYTICS
+from datetime import date
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from .caching import get_or_compute
+from .models import Customer, RevenueRollup
+
+try:
+    import numpy as np
+except ImportError:  # Forecasts are skipped, the page falls back to simple growth rates
+    np = None
+
+HORIZON = 4            # current (partial) month + the next three
+SEASON = 12            # monthly data, yearly seasonality
+MIN_MONTHS = 3         # fewer points than this cannot support a trend
+Z_95 = 1.96
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+def _month_from_index(index):
+    return date(index // 12, index % 12 + 1, 1)
+
+def _dense(rows, first, last, *fields):
+    """Scatter sparse (month, value...) rows into zero-filled arrays, one slot per month"""
+    arrays = [np.zeros(last - first + 1) for _ in fields]
+    if rows:
+        months = np.fromiter((_month_index(row['month']) - first for row in rows), dtype=np.int64, count=len(rows))
+        for array, field in zip(arrays, fields):
+            array[months] = np.fromiter((float(row[field] or 0) for row in rows), dtype=float, count=len(rows))
+    return arrays
+
+def load_series():
+    """
+    Monthly revenue, invoice count and new-customer series.
+
+    Revenue comes from the RevenueRollup (already one row per month and
+    status); customers from one grouped query. Only completed months are
+    used; the current month is partial.
+    """
+    revenue_rows = list(
+        RevenueRollup.objects.order_by().values('month').annotate(
+            revenue=Sum('total_amount'), invoices=Sum('invoice_count')
+        )
+    )
+    customer_rows = list(
+        Customer.objects.order_by().annotate(month=TruncMonth('created_at')).values('month').annotate(
+            customers=Count('id')
+        )
+    )
+    for row in customer_rows:
+        row['month'] = row['month'].date() if hasattr(row['month'], 'date') else row['month']
+
+    current = _month_index(timezone.localdate())
+    starts = [_month_index(row['month']) for row in revenue_rows + customer_rows]
+    if not starts:
+        return None
+    first, last = min(starts), current - 1
+    if last < first:
+        return None
+
+    revenue_rows = [row for row in revenue_rows if _month_index(row['month']) <= last]
+    customer_rows = [row for row in customer_rows if _month_index(row['month']) <= last]
+    revenue, invoices = _dense(revenue_rows, first, last, 'revenue', 'invoices')
+    customers, = _dense(customer_rows, first, last, 'customers')
+    return {'first': first, 'revenue': revenue, 'invoices': invoices, 'customers': customers}
+
+def _design(t, seasonal):
+    """Intercept + trend, plus two yearly Fourier harmonics when there is enough history"""
+    columns = [np.ones_like(t), t]
+    if seasonal:
+        for k in (1, 2):
+            angle = 2 * np.pi * k * t / SEASON
+            columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns)
+
+def fit_series(y, horizon=HORIZON):
+    """
+    Least-squares trend (+ seasonality) fit of one series.
+
+    Returns point forecasts and 95% prediction intervals for the next
+    `horizon` months, all computed on whole arrays.
+    """
+    n = y.shape[0]
+    t = np.arange(n, dtype=float)
+    seasonal = n >= 2 * SEASON
+    X = _design(t, seasonal)
+    coef, _, rank, _ = np.linalg.lstsq(X, y, rcond=None)
+
+    residuals = y - X @ coef
+    dof = max(n - rank, 1)
+    sigma = float(np.sqrt(residuals @ residuals / dof))
+
+    t_future = np.arange(n, n + horizon, dtype=float)
+    X_future = _design(t_future, seasonal)
+    forecast = X_future @ coef
+    # Prediction-interval width grows with leverage: x0 (X'X)^-1 x0'
+    leverage = np.einsum('ij,jk,ik->i', X_future, np.linalg.pinv(X.T @ X), X_future)
+    margin = Z_95 * sigma * np.sqrt(1 + leverage)
+
+    return {
+        'forecast': np.maximum(forecast, 0).tolist(),
+        'lower': np.maximum(forecast - margin, 0).tolist(),
+        'upper': (forecast + margin).tolist(),
+        'last_actual': float(y[-1]),
+        'seasonal': seasonal,
+    }
+
+def build_forecast(horizon=HORIZON):
+    series = load_series()
+    if series is None or series['revenue'].shape[0] < MIN_MONTHS:
+        return None
+    first = series['first']
+    months = [_month_from_index(first + series['revenue'].shape[0] + step) for step in range(horizon)]
+    return {
+        'months': months,
+        'history_months': int(series['revenue'].shape[0]),
+        'revenue': fit_series(series['revenue'], horizon),
+        'invoices': fit_series(series['invoices'], horizon),
+        'customers': fit_series(series['customers'], horizon),
+    }
+
+def get_forecast():
+    """Fitted forecast, cached until an invoice/customer write changes the data version"""
+    if np is None:
+        return None
+    # Cache an explicit marker for "not enough history" so it is not refit on every hit
+    result = get_or_compute('forecast', lambda: build_forecast() or {})
+    return result or None
@@ -0,0 +1,162 @@
+# FD/gstin.py - GSTIN VALIDATION, LOOKUP CACHE AND INDEXED PREFIX SEARCH FOR AUTOCOMPLETE
+import re
+import threading
+import time
+from collections import OrderedDict
+from django.db import transaction
+from django.db.models import Q
+from .models import Customer
+
+GSTIN_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+GSTIN_PATTERN = re.compile(r'^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z]{1}[1-9A-Z]{1}Z[0-9A-Z]{1}$')
+PREFIX_PATTERN = re.compile(r'^[0-9A-Z]{1,15}$')
+
+CACHE_SIZE = 5000            # lookups kept per process
+REGISTRY_TTL = 6 * 60 * 60   # seconds a registry answer is served from memory
+CUSTOMER_TTL = 5 * 60        # seconds customer details are cached (edits in other processes)
+NEGATIVE_TTL = 10 * 60       # seconds a failed lookup is remembered
+MIN_PREFIX = 2
+SUGGEST_LIMIT = 10
+MAX_BATCH = 500
+
+CUSTOMER_FIELDS = ['company_name', 'address', 'contact_name', 'email', 'mobile_number']
+
+def normalize(gst_number):
+    return (gst_number or '').strip().upper()
+
+def gstin_check_digit(first14):
+    """GSTIN checksum: base-36 digits weighted 1,2,1,2..., products folded by divmod 36"""
+    total = 0
+    for position, char in enumerate(first14):
+        product = GSTIN_CHARS.index(char) * (2 if position % 2 else 1)
+        total += product // 36 + product % 36
+    return GSTIN_CHARS[(36 - total % 36) % 36]
+
+def format_error(gst_number):
+    """Why gst_number cannot be a GSTIN, or None. Pure string checks, no I/O"""
+    if not gst_number:
+        return 'GST number is required'
+    if not GSTIN_PATTERN.match(gst_number):
+        return 'Invalid GST number format'
+    return None
+
+def checksum_error(gst_number):
+    if gstin_check_digit(gst_number[:14]) != gst_number[14]:
+        return 'Invalid GST number check digit'
+    return None
+
+class LookupCache:
+    """Thread-safe LRU of lookup results, each with its own expiry"""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+_cache = LookupCache()
+
+def customer_result(row):
+    return dict(success=True, from_database=True, **{field: row[field] for field in CUSTOMER_FIELDS})
+
+def fetch_gst_details(gst_number):
+    """Company details from the GST registry (placeholder until the real API is wired in)"""
+    try:
+        return {
+            'company_name': f'Company for GST {gst_number}',
+            'address': '123 Business Street, City, State - 560001',
+            'contact_name': 'Business Owner',
+            'email': f'contact{gst_number}@company.com',
+            'mobile_number': '9876543210',
+            'success': True,
+            'from_api': True
+        }
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+def _registry_lookup(gst_number):
+    result = _cache.get(gst_number)
+    if result is None:
+        error = checksum_error(gst_number)
+        result = {'success': False, 'error': error} if error else fetch_gst_details(gst_number)
+        _cache.set(gst_number, result, REGISTRY_TTL if result.get('success') else NEGATIVE_TTL)
+    return result
+
+def lookup(gst_number):
+    """
+    Details for one GSTIN: existing customer first, then the registry.
+    Malformed input is rejected before any I/O; results (failures too)
+    are kept in the per-process cache.
+    """
+    return lookup_many([gst_number])[normalize(gst_number)]
+
+def lookup_many(gst_numbers):
+    """{normalized GSTIN: result}, with one customer query for all uncached GSTINs"""
+    results, missing = {}, []
+    for gst_number in dict.fromkeys(normalize(value) for value in gst_numbers):
+        error = format_error(gst_number)
+        if error:
+            results[gst_number] = {'success': False, 'error': error}
+            continue
+        cached = _cache.get(('customer', gst_number))
+        if cached is not None:
+            results[gst_number] = cached
+        else:
+            missing.append(gst_number)
+
+    if missing:
+        # The customers are asked for before the registry, so a registry
+        # answer cached before the customer was created never shadows it
+        rows = Customer.objects.filter(gst_number__in=missing).values('gst_number', *CUSTOMER_FIELDS)
+        for row in rows:
+            result = customer_result(row)
+            _cache.set(('customer', row['gst_number']), result, CUSTOMER_TTL)
+            results[row['gst_number']] = result
+        for gst_number in missing:
+            if gst_number not in results:
+                results[gst_number] = _registry_lookup(gst_number)
+    return results
+
+def prefix_filter(prefix):
+    """
+    gst_number starts with prefix, as a range on the unique index: SQLite's
+    LIKE is case-insensitive, so startswith would scan the table there.
+    prefix is [0-9A-Z]; bumping its last character bounds the range.
+    """
+    return Q(gst_number__gte=prefix, gst_number__lt=prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+def suggest(prefix, limit=SUGGEST_LIMIT):
+    """Customers whose GSTIN starts with prefix, in GSTIN order"""
+    prefix = normalize(prefix)
+    if len(prefix) < MIN_PREFIX or not PREFIX_PATTERN.match(prefix):
+        return []
+    return list(Customer.objects.filter(prefix_filter(prefix)).order_by('gst_number').values('gst_number', 'company_name')[:limit])
+
+def customer_changed():
+    """Drop cached lookups once a customer write commits"""
+    transaction.on_commit(_cache.clear)
@@ -0,0 +1,147 @@
+# FD/instrumentation.py - OPT-IN PER-VIEW SQL TIMING AND SLOW-QUERY EXPLAIN CAPTURE
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import deque
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger('FD.querylog')
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SLOW_QUERY_MS': 100,     # statements slower than this get EXPLAIN output
+    'TOP_N': 5,               # slowest statements kept per request
+    'EXPLAIN': True,
+    'RECENT_REQUESTS': 200,   # kept in memory for the staff page (per process)
+}
+
+_recent = deque(maxlen=DEFAULTS['RECENT_REQUESTS'])
+_recent_lock = threading.Lock()
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'FD_QUERY_LOG', {}))
+    return config
+
+def recent_requests():
+    with _recent_lock:
+        return list(reversed(_recent))
+
+class QueryRecorder:
+    """connection.execute_wrapper that counts and times statements, keeping only the N slowest"""
+
+    def __init__(self, top_n):
+        self.top_n = top_n
+        self.count = 0
+        self.total = 0.0
+        self.slowest = []  # min-heap of (duration, sequence, sql, params)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.total += duration
+            entry = (duration, self.count, sql, None if many else params)
+            if len(self.slowest) < self.top_n:
+                heapq.heappush(self.slowest, entry)
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def statements(self):
+        return sorted(self.slowest, reverse=True)
+
+def explain(sql, params):
+    """Query plan for a SELECT on SQLite or MySQL; None for anything else"""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    if connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif connection.vendor == 'mysql':
+        prefix = 'EXPLAIN '
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    except Exception as e:
+        return [{'error': str(e)}]
+
+class QueryLogMiddleware:
+    """
+    Records, per request, the URL name, query count, total SQL time and the
+    slowest statements (with EXPLAIN output for those over SLOW_QUERY_MS).
+
+    Enable with FD_QUERY_LOG = {'ENABLED': True} in settings. Records go to
+    the 'FD.querylog' logger as one JSON object per line and to the
+    staff-only /query-log/ page.
+    """
+
+    def __init__(self, get_response):
+        self.config = get_config()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        global _recent
+        _recent = deque(maxlen=self.config['RECENT_REQUESTS'])
+
+    def __call__(self, request):
+        recorder = QueryRecorder(self.config['TOP_N'])
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        if recorder.count:
+            self.record(request, response, recorder, elapsed)
+        return response
+
+    def record(self, request, response, recorder, elapsed):
+        slow_seconds = self.config['SLOW_QUERY_MS'] / 1000
+        statements = []
+        for duration, sequence, sql, params in recorder.statements():
+            statement = {'sql': sql, 'ms': round(duration * 1000, 2)}
+            # EXPLAIN runs outside the wrapper, so it is not counted itself
+            if self.config['EXPLAIN'] and duration >= slow_seconds and params is not None:
+                statement['explain'] = explain(sql, params)
+            statements.append(statement)
+
+        match = getattr(request, 'resolver_match', None)
+        entry = {
+            'timestamp': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'url_name': match.url_name if match else None,
+            'status': response.status_code,
+            'query_count': recorder.count,
+            'sql_ms': round(recorder.total * 1000, 2),
+            'total_ms': round(elapsed * 1000, 2),
+            'slowest': statements,
+        }
+        with _recent_lock:
+            _recent.append(entry)
+        logger.info(json.dumps(entry, default=str))
+
+def summarize_by_view(entries):
+    """Per-URL-name totals for the staff page"""
+    summary = {}
+    for entry in entries:
+        name = entry['url_name'] or entry['path']
+        row = summary.setdefault(name, {'url_name': name, 'requests': 0, 'queries': 0, 'sql_ms': 0.0, 'max_sql_ms': 0.0})
+        row['requests'] += 1
+        row['queries'] += entry['query_count']
+        row['sql_ms'] += entry['sql_ms']
+        row['max_sql_ms'] = max(row['max_sql_ms'], entry['sql_ms'])
+    for row in summary.values():
+        row['avg_queries'] = round(row['queries'] / row['requests'], 1)
+        row['avg_sql_ms'] = round(row['sql_ms'] / row['requests'], 2)
+    return sorted(summary.values(), key=lambda row: row['sql_ms'], reverse=True)
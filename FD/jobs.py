@@ -0,0 +1,96 @@
+# FD/jobs.py - BACKGROUND JOBS: RUN AFTER COMMIT BY ONE WORKER THREAD PER KIND, RESUMABLE BY run_jobs
+import logging
+import queue
+import threading
+from datetime import timedelta
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import BackgroundJob
+
+logger = logging.getLogger('FD.jobs')
+
+# kind -> handler(job); handlers call report_progress() as they go
+JOB_HANDLERS = {
+    'bulk_delete': 'FD.bulk_delete.run_bulk_delete',
+    'prerender_invoice': 'FD.prerender.run_prerender',
+    'freeze_months': 'FD.snapshots.run_freeze_months',
+}
+STALE_AFTER = timedelta(minutes=10)  # a running job this quiet lost its worker
+
+# One worker thread per job kind in each process: jobs of a kind run one
+# after another, so a burst of saves waits in a queue instead of starting
+# a thread each and competing with requests for the CPU
+_queues = {}
+_queues_lock = threading.Lock()
+
+def enqueue(kind, target='', params=None, total=0, created_by=''):
+    """Record a job and hand it to its kind's worker once the surrounding transaction commits"""
+    job = BackgroundJob.objects.create(
+        kind=kind, target=target, params=params or {}, total=total, created_by=created_by,
+    )
+    transaction.on_commit(lambda: start(job.pk, kind))
+    return job
+
+def start(job_id, kind):
+    """Queue the job for the worker of kind, starting that thread on first use"""
+    with _queues_lock:
+        jobs = _queues.get(kind)
+        if jobs is None:
+            jobs = _queues[kind] = queue.SimpleQueue()
+            threading.Thread(target=_worker, args=(jobs,), name=f'fd-jobs-{kind}', daemon=True).start()
+    jobs.put(job_id)
+
+def _worker(jobs):
+    while True:
+        job_id = jobs.get()
+        try:
+            run_job(job_id)
+        except Exception:
+            # Claiming or recording the outcome failed; run_jobs picks the job up later
+            logger.exception("Background job %s could not be run", job_id)
+        finally:
+            connections.close_all()  # a fresh connection per job, never a dead one
+
+def claim(job_id):
+    """Mark the job running; False when another worker has it"""
+    now = timezone.now()
+    return bool(BackgroundJob.objects.filter(
+        Q(status='pending') | Q(status='running', updated_at__lt=now - STALE_AFTER), pk=job_id,
+    ).update(status='running', started_at=now, updated_at=now))
+
+def run_job(job_id):
+    """Run one job to completion in this thread; failures are stored on the job"""
+    if not claim(job_id):
+        return None
+    job = BackgroundJob.objects.get(pk=job_id)
+    try:
+        import_string(JOB_HANDLERS[job.kind])(job)
+    except Exception as e:
+        logger.exception("Background job %s failed", job_id)
+        BackgroundJob.objects.filter(pk=job_id).update(
+            status='failed', error=str(e), finished_at=timezone.now(), updated_at=timezone.now(),
+        )
+    else:
+        BackgroundJob.objects.filter(pk=job_id).update(
+            status='done', done=F('total'), finished_at=timezone.now(), updated_at=timezone.now(),
+        )
+    job.refresh_from_db()
+    return job
+
+def report_progress(job, count):
+    """Add count finished units (also keeps the job from looking stale)"""
+    job.done = min(job.done + count, job.total)
+    BackgroundJob.objects.filter(pk=job.pk).update(done=job.done, updated_at=timezone.now())
+
+def runnable_jobs():
+    """Jobs no worker is running: never started, or orphaned by a restart"""
+    stale = timezone.now() - STALE_AFTER
+    return BackgroundJob.objects.filter(
+        Q(status='pending') | Q(status='running', updated_at__lt=stale)
+    ).order_by('created_at')
+
+def run_pending():
+    """Run every runnable job in this thread; returns the jobs that were run"""
+    return [job for job in map(run_job, runnable_jobs().values_list('pk', flat=True)) if job]
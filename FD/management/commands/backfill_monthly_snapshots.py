@@ -0,0 +1,84 @@
+# FD/management/commands/backfill_monthly_snapshots.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+from FD.models import Customer, Invoice, MonthlySnapshot
+from FD.snapshots import build_snapshot, compute_month, iter_months, last_closed_month
+
+
+def compute_chunk(months):
+    """Worker: aggregate a run of months on this thread's own connection"""
+    try:
+        return [(month, compute_month(month)) for month in months]
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Freeze MonthlySnapshot rows for closed months, computing chunks of months in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help="First month (YYYY-MM). Defaults to the oldest invoice or customer.")
+        parser.add_argument('--to', dest='end', help="Last month (YYYY-MM). Defaults to the last closed month.")
+        parser.add_argument('--workers', type=int, default=4, help="Parallel database workers (default 4)")
+        parser.add_argument('--chunk-size', type=int, default=6, help="Months per work item (default 6)")
+        parser.add_argument('--refreeze', action='store_true', help="Replace snapshots that already exist in the range")
+
+    def parse_month(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f"Invalid month '{value}'. Expected YYYY-MM.")
+
+    def handle(self, *args, **options):
+        last_closed = last_closed_month()
+        end = self.parse_month(options['end']) if options['end'] else last_closed
+        if end > last_closed:
+            raise CommandError(f"{end:%Y-%m} has not closed yet; the last closed month is {last_closed:%Y-%m}.")
+
+        if options['start']:
+            start = self.parse_month(options['start'])
+        else:
+            oldest = [
+                Invoice.objects.aggregate(first=Min('invoice_date'))['first'],
+                Customer.objects.aggregate(first=Min('created_at'))['first'],
+            ]
+            oldest = [timezone.localdate(value) if isinstance(value, datetime) else value for value in oldest if value]
+            if not oldest:
+                self.stdout.write("No data to snapshot.")
+                return
+            start = min(oldest).replace(day=1)
+
+        months = list(iter_months(start, end))
+        if not options['refreeze']:
+            frozen = set(MonthlySnapshot.objects.filter(month__in=months).values_list('month', flat=True))
+            months = [month for month in months if month not in frozen]
+        if not months:
+            self.stdout.write(self.style.SUCCESS("All months in range are already frozen."))
+            return
+
+        chunk_size = max(1, options['chunk_size'])
+        chunks = [months[i:i + chunk_size] for i in range(0, len(months), chunk_size)]
+        self.stdout.write(f"Freezing {len(months)} month(s) in {len(chunks)} chunk(s) with {options['workers']} worker(s)...")
+
+        written = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            futures = [executor.submit(compute_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                results = future.result()
+                # Writes stay on this thread: one short transaction per chunk
+                with transaction.atomic():
+                    chunk_months = [month for month, figures in results]
+                    if options['refreeze']:
+                        MonthlySnapshot.objects.filter(month__in=chunk_months).delete()
+                    MonthlySnapshot.objects.bulk_create(
+                        [build_snapshot(month, figures) for month, figures in results],
+                        ignore_conflicts=True,
+                    )
+                written += len(results)
+                self.stdout.write(f"  {chunk_months[0]:%Y-%m} to {chunk_months[-1]:%Y-%m} frozen ({written}/{len(months)})")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {written} monthly snapshot(s)."))
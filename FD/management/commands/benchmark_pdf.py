@@ -0,0 +1,49 @@
+# FD/management/commands/benchmark_pdf.py
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from FD.benchmarks import benchmark_pdf_layouts
+from FD.pdf import get_layout
+from FD.sample_data import generate_sample_data, parse_scale
+
+
+class Command(BaseCommand):
+    help = (
+        "Time invoice and work order PDF rendering per document, building the layout "
+        "(fonts, styles, page header) for every document versus reusing the shared one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=50, help="Documents rendered per kind and mode (default 50)")
+        parser.add_argument('--scale', default='200', help="Invoices generated into a test database (default 200)")
+        parser.add_argument('--seed', type=int, default=42, help="Seed for data generation and sampling (default 42)")
+        parser.add_argument('--existing', action='store_true', help="Render from the configured database instead of generating data")
+
+    def handle(self, *args, **options):
+        if options['count'] < 1:
+            raise CommandError("--count must be at least 1.")
+        try:
+            scale = parse_scale(options['scale'])
+            get_layout()
+        except (ValueError, ImportError) as e:
+            raise CommandError(str(e))
+
+        setup_test_environment()
+        try:
+            if options['existing']:
+                results = self.measure(options)
+            else:
+                self.stderr.write(f"Generating {scale:,} invoices into a test database...")
+                old_config = setup_databases(verbosity=0, interactive=False)
+                try:
+                    generate_sample_data(scale, seed=options['seed'])
+                    results = self.measure(options)
+                finally:
+                    teardown_databases(old_config, verbosity=0)
+        finally:
+            teardown_test_environment()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def measure(self, options):
+        # Progress goes to stderr so stdout stays valid JSON
+        return benchmark_pdf_layouts(count=options['count'], seed=options['seed'], stdout=self.stderr)
@@ -0,0 +1,103 @@
+# FD/management/commands/benchmark_urls.py
+import json
+import platform
+import time
+import django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+from FD.benchmarks import benchmark_routes, compare_runs
+from FD.sample_data import generate_sample_data, parse_scale
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every FD route (p50/p95 latency, query count, peak memory) at one or more data scales. "
+        "Each scale runs in a fresh test database filled by the sample data generator."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='1k', help="Comma-separated invoice counts, e.g. 1k,10k,100k (default 1k)")
+        parser.add_argument('--seed', type=int, default=42, help="Seed for data generation and object sampling (default 42)")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed requests per route (default 5)")
+        parser.add_argument('--samples', type=int, default=3, help="Objects rotated through for detail routes (default 3)")
+        parser.add_argument('--cold', action='store_true', help="Clear the cache before every request")
+        parser.add_argument('--existing', action='store_true', help="Benchmark the configured database as-is instead of generating data")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+        parser.add_argument('--compare', help="Previous JSON report to compare p95 latency and query counts against")
+
+    def handle(self, *args, **options):
+        try:
+            scales = [parse_scale(value) for value in options['scales'].split(',') if value.strip()]
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'cold_cache': options['cold'],
+            'scales': [],
+        }
+
+        setup_test_environment()
+        try:
+            if options['existing']:
+                report['scales'].append(self.run_scale(None, options))
+            else:
+                for invoices in scales:
+                    report['scales'].append(self.run_scale(invoices, options))
+        finally:
+            teardown_test_environment()
+
+        if options['compare']:
+            with open(options['compare']) as handle:
+                report['comparison'] = compare_runs(json.load(handle), report)
+            for row in report['comparison']:
+                change = row['p95_change_pct']
+                if change is not None and change > 20:
+                    self.stderr.write(f"  slower: {row['label']} at {row['invoices']:,} invoices, p95 {row['p95_before']} -> {row['p95_after']} ms (+{change}%)")
+                if row['queries_after'] > row['queries_before']:
+                    self.stderr.write(f"  more queries: {row['label']} at {row['invoices']:,} invoices, {row['queries_before']} -> {row['queries_after']}")
+
+        output = json.dumps(report, indent=2, default=str)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def run_scale(self, invoices, options):
+        # Progress goes to stderr so stdout stays valid JSON
+        if invoices is None:
+            self.stderr.write("Benchmarking the existing database...")
+            return self.measure(None, {}, 0.0, options)
+
+        self.stderr.write(f"Scale {invoices:,} invoices: creating test database...")
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            cache.clear()
+            started = time.perf_counter()
+            counts = generate_sample_data(invoices, seed=options['seed'])
+            generate_seconds = round(time.perf_counter() - started, 2)
+            self.stderr.write(f"  generated {counts} in {generate_seconds}s")
+            return self.measure(invoices, counts, generate_seconds, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def measure(self, invoices, counts, generate_seconds, options):
+        result = benchmark_routes(
+            repeat=options['repeat'], samples=options['samples'], seed=options['seed'],
+            cold=options['cold'], stdout=self.stderr,
+        )
+        if invoices is None:
+            from FD.models import Invoice
+            invoices = Invoice.objects.count()
+        return {'invoices': invoices, 'counts': counts, 'generate_seconds': generate_seconds, **result}
@@ -0,0 +1,30 @@
+# FD/management/commands/extract_inline_assets.py
+from django.core.management.base import BaseCommand, CommandError
+from FD.assets import extract_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Move inline <style> and <script> blocks out of the templates into static/<app>/css and "
+        "static/<app>/js, so browsers cache them; collectstatic then fingerprints and compresses them. "
+        "Blocks that use template syntax stay inline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Change nothing; fail if any template still has a movable inline block")
+
+    def handle(self, *args, **options):
+        try:
+            moved, kept = extract_all(write=not options['check'])
+        except FileExistsError as e:
+            raise CommandError(str(e))
+        for template, assets in moved.items():
+            self.stdout.write(f"  {template}: {', '.join(assets)}")
+        for block in kept:
+            self.stdout.write(f"  kept inline (uses template syntax): {block}")
+        if options['check']:
+            if moved:
+                raise CommandError(f"{len(moved)} template(s) have inline blocks to extract; run extract_inline_assets.")
+            self.stdout.write(self.style.SUCCESS("No movable inline blocks."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Moved the inline blocks of {len(moved)} template(s); run collectstatic to publish them."))
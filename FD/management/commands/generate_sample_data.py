@@ -0,0 +1,32 @@
+# FD/management/commands/generate_sample_data.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from FD.sample_data import generate_sample_data, parse_scale
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate realistic customers, work orders, invoices and payments into an empty database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='1k', help="Number of invoices, e.g. 5000, 10k or 1m (default 1k)")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed; the same seed gives the same data (default 42)")
+        parser.add_argument('--years', type=int, default=3, help="Years of history to spread the data over (default 3)")
+
+    def handle(self, *args, **options):
+        try:
+            invoices = parse_scale(options['scale'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"Generating ~{invoices:,} invoices (seed {options['seed']})...")
+        started = time.perf_counter()
+        try:
+            counts = generate_sample_data(invoices, seed=options['seed'], years=options['years'], stdout=self.stdout)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {counts['customers']:,} customers, {counts['work_orders']:,} work orders, "
+            f"{counts['invoices']:,} invoices and {counts['payments']:,} payments "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,11 @@
+# FD/management/commands/rebuild_cost_statistics.py
+from django.core.management.base import BaseCommand
+from FD.cost_stats import rebuild_cost_statistics
+
+
+class Command(BaseCommand):
+    help = "Recompute project cost statistics from all completed work orders"
+
+    def handle(self, *args, **options):
+        count = rebuild_cost_statistics()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt cost statistics for {count} group(s)."))
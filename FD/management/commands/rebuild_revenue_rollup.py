@@ -0,0 +1,31 @@
+# FD/management/commands/rebuild_revenue_rollup.py
+from django.core.management.base import BaseCommand, CommandError
+from FD.rollups import check_rollup_consistency, rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the revenue rollup table from invoices, or check it for drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only compare the rollup with the invoice table; exit non-zero on drift",
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = check_rollup_consistency()
+            for key, expected, stored in mismatches:
+                financial_year, month, is_migrated, status = key
+                self.stdout.write(
+                    f"{month:%Y-%m} {'migrated' if is_migrated else 'new'} {status}: "
+                    f"expected {expected}, stored {stored}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} rollup bucket(s) out of date. Run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("Revenue rollup is consistent with invoices."))
+            return
+
+        count = rebuild_rollup()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt revenue rollup: {count} bucket(s)."))
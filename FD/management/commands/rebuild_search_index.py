@@ -0,0 +1,11 @@
+# FD/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from FD.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Recreate the full-text search documents for every customer, work order and invoice"
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} document(s)."))
@@ -0,0 +1,13 @@
+# FD/management/commands/run_jobs.py
+from django.core.management.base import BaseCommand
+from FD.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run background jobs that never started or lost their worker (e.g. as a scheduled task)"
+
+    def handle(self, *args, **options):
+        for job in run_pending():
+            style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+            self.stdout.write(style(f"Job {job.pk} ({job.kind} {job.target}): {job.status}, {job.done}/{job.total}"))
+        self.stdout.write("No jobs left to run.")
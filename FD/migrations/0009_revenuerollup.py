@@ -0,0 +1,84 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:24
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def populate_rollup(apps, schema_editor):
+    from FD.rollups import rebuild_rollup
+
+    rebuild_rollup(
+        invoice_model=apps.get_model("FD", "Invoice"),
+        rollup_model=apps.get_model("FD", "RevenueRollup"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0008_alter_customer_gst_number_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevenueRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("financial_year", models.CharField(max_length=9)),
+                ("month", models.DateField(help_text="First day of the invoice month")),
+                ("is_migrated", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "Draft"),
+                            ("sent", "Sent"),
+                            ("partially_paid", "Partially Paid"),
+                            ("paid", "Paid"),
+                            ("overdue", "Overdue"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("invoice_count", models.IntegerField(default=0)),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                (
+                    "balance_due",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                (
+                    "amount_paid",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Revenue Rollup",
+                "verbose_name_plural": "Revenue Rollups",
+                "db_table": "fd_revenue_rollup",
+                "ordering": ["-month", "is_migrated", "status"],
+                "unique_together": {
+                    ("financial_year", "month", "is_migrated", "status")
+                },
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
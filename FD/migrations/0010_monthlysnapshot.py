@@ -0,0 +1,80 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:26
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0009_revenuerollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlySnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "month",
+                    models.DateField(help_text="First day of the month", unique=True),
+                ),
+                ("financial_year", models.CharField(max_length=9)),
+                (
+                    "invoiced_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                (
+                    "collected_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                (
+                    "outstanding_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                (
+                    "cgst_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                (
+                    "sgst_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                (
+                    "igst_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=18
+                    ),
+                ),
+                ("invoice_count", models.IntegerField(default=0)),
+                ("payment_count", models.IntegerField(default=0)),
+                ("work_order_count", models.IntegerField(default=0)),
+                ("new_customer_count", models.IntegerField(default=0)),
+                ("frozen_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Monthly Snapshot",
+                "verbose_name_plural": "Monthly Snapshots",
+                "db_table": "fd_monthly_snapshot",
+                "ordering": ["-month"],
+            },
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_cost_statistics(apps, schema_editor):
+    from FD.cost_stats import rebuild_cost_statistics
+
+    rebuild_cost_statistics(
+        work_order_model=apps.get_model("FD", "WorkOrder"),
+        stat_model=apps.get_model("FD", "CostStatistic"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0010_monthlysnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workorder",
+            name="category",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="work_orders",
+                to="FD.projectcategory",
+            ),
+        ),
+        migrations.CreateModel(
+            name="CostStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("all", "All Projects"),
+                            ("customer", "Customer"),
+                            ("category", "Project Category"),
+                            ("band", "Cost Band"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("scope_key", models.CharField(blank=True, max_length=50)),
+                ("count", models.IntegerField(default=0)),
+                ("mean", models.FloatField(default=0)),
+                (
+                    "m2",
+                    models.FloatField(
+                        default=0, help_text="Sum of squared deviations (Welford)"
+                    ),
+                ),
+                ("min_cost", models.FloatField(blank=True, null=True)),
+                ("max_cost", models.FloatField(blank=True, null=True)),
+                (
+                    "histogram",
+                    models.JSONField(
+                        default=list, help_text="Counts per log-spaced cost bucket"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Cost Statistic",
+                "verbose_name_plural": "Cost Statistics",
+                "db_table": "fd_cost_statistic",
+                "unique_together": {("scope", "scope_key")},
+            },
+        ),
+        migrations.RunPython(populate_cost_statistics, migrations.RunPython.noop),
+    ]
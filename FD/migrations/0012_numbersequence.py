@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0011_workorder_category_coststatistic"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NumberSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(help_text="e.g. work_order", max_length=50)),
+                (
+                    "period",
+                    models.CharField(
+                        help_text="Calendar or financial year the numbers belong to",
+                        max_length=20,
+                    ),
+                ),
+                ("last_value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Number Sequence",
+                "verbose_name_plural": "Number Sequences",
+                "db_table": "fd_number_sequence",
+                "unique_together": {("name", "period")},
+            },
+        ),
+    ]
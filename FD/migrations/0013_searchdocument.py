@@ -0,0 +1,74 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:39
+
+from django.db import migrations, models
+
+
+def create_fulltext_index(apps, schema_editor):
+    from FD.search import create_fulltext_index
+
+    create_fulltext_index(schema_editor)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    from FD.search import drop_fulltext_index
+
+    drop_fulltext_index(schema_editor)
+
+
+def populate_search_index(apps, schema_editor):
+    from FD.search import rebuild_search_index
+
+    rebuild_search_index(
+        models={
+            "customer": apps.get_model("FD", "Customer"),
+            "work_order": apps.get_model("FD", "WorkOrder"),
+            "invoice": apps.get_model("FD", "Invoice"),
+        },
+        document_model=apps.get_model("FD", "SearchDocument"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0012_numbersequence"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("customer", "Customer"),
+                            ("work_order", "Work Order"),
+                            ("invoice", "Invoice"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                ("content", models.TextField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Search Document",
+                "verbose_name_plural": "Search Documents",
+                "db_table": "fd_search_document",
+                "unique_together": {("kind", "object_id")},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(populate_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.0.6 on 2026-10-17 01:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0013_searchdocument"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                fields=["created_at", "id"], name="fd_customer_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                fields=["is_migrated", "created_at"], name="fd_customer_migrated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["created_at", "id"], name="fd_invoice_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["status", "created_at", "id"],
+                name="fd_invoice_status_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["is_migrated", "status", "balance_due"],
+                name="fd_invoice_reminder_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["status", "due_date"], name="fd_invoice_status_due_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(fields=["invoice_date"], name="fd_invoice_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["status", "payment_date"], name="fd_payment_status_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["payment_date", "created_at"], name="fd_payment_ordering_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["is_migrated", "payment_date"], name="fd_payment_migrated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(fields=["created_at", "id"], name="fd_wo_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="fd_wo_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(
+                fields=["is_migrated", "created_at"], name="fd_wo_migrated_idx"
+            ),
+        ),
+    ]
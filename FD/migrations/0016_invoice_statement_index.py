@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0015_backgroundjob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["customer", "invoice_date", "id"],
+                name="fd_invoice_statement_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-17 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0016_invoice_statement_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["is_migrated", "created_at"], name="fd_invoice_migrated_idx"
+            ),
+        ),
+    ]
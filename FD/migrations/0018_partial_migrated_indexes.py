@@ -0,0 +1,69 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("FD", "0017_invoice_migrated_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                condition=models.Q(("is_migrated", True)),
+                fields=["created_at"],
+                name="fd_customer_legacy_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("is_migrated", False)),
+                fields=["status", "balance_due"],
+                name="fd_invoice_new_reminder_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("is_migrated", False)),
+                fields=["created_at"],
+                name="fd_invoice_new_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("is_migrated", True)),
+                fields=["created_at"],
+                name="fd_invoice_legacy_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                condition=models.Q(("is_migrated", True)),
+                fields=["payment_date", "created_at"],
+                name="fd_payment_legacy_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(
+                condition=models.Q(("is_migrated", False)),
+                fields=["created_at"],
+                name="fd_wo_new_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workorder",
+            index=models.Index(
+                condition=models.Q(("is_migrated", True)),
+                fields=["created_at"],
+                name="fd_wo_legacy_idx",
+            ),
+        ),
+    ]
@@ -1,5 +1,5 @@
 # FD/models.py - COMPLETE ENHANCED VERSION WITH VALIDATIONS
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from decimal import Decimal, DecimalException
@@ -25,6 +25,16 @@ def validate_mobile_number(value):
     if not re.match(pattern, value):
         raise ValidationError('Invalid Indian mobile number format. Expected: 10 digits starting with 6-9')
 
+def get_financial_year_start(day):
+    """Return April 1 of the financial year (April 1 to March 31) containing day"""
+    year = day.year if day.month >= 4 else day.year - 1
+    return date(year, 4, 1)
+
+def get_financial_year(day):
+    """Return the financial year label, e.g. 2025-2026"""
+    start = get_financial_year_start(day)
+    return f"{start.year}-{start.year + 1}"
+
 class Customer(models.Model):
     company_name = models.CharField(max_length=255)
     contact_name = models.CharField(max_length=255)
@@ -59,6 +69,16 @@ class Customer(models.Model):
         db_table = 'fd_customer'
         verbose_name = 'Customer'
         verbose_name_plural = 'Customers'
+        indexes = [
+            # List page: newest first, keyset on (created_at, id); date range filters
+            models.Index(fields=['created_at', 'id'], name='fd_customer_created_idx'),
+            # Migrated/new counts and recent rows on the dashboard and legacy page
+            models.Index(fields=['is_migrated', 'created_at'], name='fd_customer_migrated_idx'),
+            # The same for SQLite, which renders is_migrated filters as a bare
+            # "WHERE is_migrated" that only a partial index matches (MySQL
+            # compares "= true", skips partial indexes and uses the one above)
+            models.Index(fields=['created_at'], condition=models.Q(is_migrated=True), name='fd_customer_legacy_idx'),
+        ]
 
 class TermsAndConditions(models.Model):
     code = models.CharField(max_length=50, unique=True)
@@ -88,6 +108,7 @@ class WorkOrder(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     project_title = models.CharField(max_length=255)
     project_description = models.TextField(blank=True, null=True)
+    category = models.ForeignKey('ProjectCategory', on_delete=models.SET_NULL, null=True, blank=True, related_name='work_orders')
     
     # Financial Fields
     base_amount = models.DecimalField(
@@ -159,49 +180,9 @@ class WorkOrder(models.Model):
     is_migrated = models.BooleanField(default=False)
 
     def generate_work_order_number(self):
-        """Generate FDWO-YY-XXXX format work order number"""
-        from datetime import datetime
-        
-        current_year = datetime.now().year
-        year_suffix = str(current_year)[-2:]  # Last 2 digits of year
-        
-        # Find the highest existing work order number for this year
-        existing_orders = WorkOrder.objects.filter(
-            work_order_number__startswith=f'FDWO-{year_suffix}-'
-        ).order_by('-work_order_number')
-        
-        if existing_orders.exists():
-            try:
-                # Extract number from FDWO-YY-XXXX format
-                last_number = existing_orders.first().work_order_number
-                last_sequence = int(last_number.split('-')[-1])
-                new_sequence = last_sequence + 1
-                
-                # If we reach 9999, check for FDWO1 prefix
-                if new_sequence > 9999:
-                    existing_orders_fdwo1 = WorkOrder.objects.filter(
-                        work_order_number__startswith=f'FDWO1-{year_suffix}-'
-                    ).order_by('-work_order_number')
-                    
-                    if existing_orders_fdwo1.exists():
-                        last_number_fdwo1 = existing_orders_fdwo1.first().work_order_number
-                        last_sequence_fdwo1 = int(last_number_fdwo1.split('-')[-1])
-                        new_sequence = last_sequence_fdwo1 + 1
-                        prefix = f"FDWO1-{year_suffix}-"
-                    else:
-                        new_sequence = 1
-                        prefix = f"FDWO1-{year_suffix}-"
-                else:
-                    prefix = f"FDWO-{year_suffix}-"
-                    
-            except (ValueError, IndexError):
-                new_sequence = 1
-                prefix = f"FDWO-{year_suffix}-"
-        else:
-            new_sequence = 1
-            prefix = f"FDWO-{year_suffix}-"
-            
-        return f"{prefix}{new_sequence:04d}"
+        """Next FDWO-YY-XXXX number (FDWO1-YY-XXXX past 9999) from this year's sequence"""
+        from .sequences import next_work_order_number
+        return next_work_order_number()
 
     def calculate_financials(self):
         """Calculate GST, discount, and total cost automatically with error handling"""
@@ -226,26 +207,23 @@ class WorkOrder(models.Model):
             self.total_cost = base
 
     def save(self, *args, **kwargs):
-        # Generate work order number if it doesn't exist
+        from .cost_stats import cost_stat_values, record_work_order_change
+
+        # Generate work order number if it doesn't exist. Taken before the
+        # transaction below so the sequence row is locked only briefly
+        # (work order numbers may have gaps; invoice numbers may not)
         if not self.work_order_number:
             self.work_order_number = self.generate_work_order_number()
         
         # Auto-calculate financials
         self.calculate_financials()
         
-        # Save the object
-        try:
+        with transaction.atomic():
+            previous = cost_stat_values(self.pk) if self.pk else None
             super().save(*args, **kwargs)
-        except Exception as e:
-            # If there's a unique constraint error, generate a new number and try again
-            if 'UNIQUE constraint failed' in str(e) and 'work_order_number' in str(e):
-                # Generate a temporary unique number with timestamp
-                import time
-                timestamp = int(time.time())
-                self.work_order_number = f"FDWO-TEMP-{timestamp}"
-                super().save(*args, **kwargs)
-            else:
-                raise e
+            
+            # Completed projects feed the cost statistics used by project analytics
+            record_work_order_change(previous, self)
 
     def __str__(self):
         return self.work_order_number
@@ -254,6 +232,15 @@ class WorkOrder(models.Model):
         db_table = 'fd_work_order'
         verbose_name = 'Work Order'
         verbose_name_plural = 'Work Orders'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='fd_wo_created_idx'),
+            # Status filter on the list page (and completed work orders for cost statistics)
+            models.Index(fields=['status', 'created_at', 'id'], name='fd_wo_status_created_idx'),
+            models.Index(fields=['is_migrated', 'created_at'], name='fd_wo_migrated_idx'),
+            # Partial twins of fd_wo_migrated_idx for SQLite (see Customer)
+            models.Index(fields=['created_at'], condition=models.Q(is_migrated=False), name='fd_wo_new_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_migrated=True), name='fd_wo_legacy_idx'),
+        ]
 
 class Invoice(models.Model):
     STATUS_CHOICES = [
@@ -362,73 +349,52 @@ class Invoice(models.Model):
     is_migrated = models.BooleanField(default=False)
 
     def save(self, *args, **kwargs):
-        from django.db import IntegrityError
+        from .rollups import invoice_rollup_values, record_invoice_change
+        from .snapshots import thaw_months
+
+        with transaction.atomic():
+            previous = invoice_rollup_values(self.pk) if self.pk else None
+            self._save_invoice(*args, **kwargs)
+            # Keep the revenue rollup in step inside the same transaction
+            record_invoice_change(previous, self)
+            # Frozen months it was or now is dated in (back-dated invoices included)
+            thaw_months(previous and previous['invoice_date'], self.invoice_date)
+
+    def delete(self, *args, **kwargs):
+        from .rollups import invoice_rollup_values
+
+        with transaction.atomic():
+            # The rollup must lose the stored row, not this possibly stale
+            # copy (e.g. a payment changed the status since it was loaded)
+            self._rollup_values = invoice_rollup_values(self.pk)
+            return super().delete(*args, **kwargs)
+
+    def _save_invoice(self, *args, **kwargs):
+        from .sequences import next_invoice_number
         
         # Generate invoice number only for new invoices
         if not self.invoice_number:
-            max_attempts = 5
-            for attempt in range(max_attempts):
-                try:
-                    # Get current financial year
-                    today = timezone.now().date()
-                    if today.month >= 4:
-                        financial_year = f"{today.year}-{today.year + 1}"
-                    else:
-                        financial_year = f"{today.year - 1}-{today.year}"
-                    
-                    # Extract last two digits for short format (25-26)
-                    year_parts = financial_year.split('-')
-                    short_year = f"{year_parts[0][-2:]}{year_parts[1][-2]}"
-                    
-                    # Find the last invoice for this financial year
-                    last_invoice = Invoice.objects.filter(
-                        invoice_number__startswith=f"FD{short_year}/I/"
-                    ).order_by('-invoice_number').first()
-                    
-                    if last_invoice and last_invoice.invoice_number:
-                        try:
-                            # Extract number from format FD25-26/I/0013
-                            parts = last_invoice.invoice_number.split('/')
-                            if len(parts) >= 3:
-                                last_number = int(parts[2])
-                                new_number = last_number + 1
-                            else:
-                                new_number = 1
-                        except (ValueError, IndexError):
-                            new_number = 1
-                    else:
-                        # Start from 0013 for continuity as requested
-                        new_number = 13
-                        
-                    self.invoice_number = f"FD{short_year}/I/{new_number:04d}"
-                    
-                    # Calculate GST breakup before saving
-                    self.calculate_gst_breakup()
-                    
-                    # Calculate balance due
-                    self.balance_due = self.total_amount - self.amount_paid
-                    
-                    # Update status based on payment
-                    if self.balance_due == 0 and self.total_amount > 0:
-                        self.status = 'paid'
-                    elif self.amount_paid > 0 and self.balance_due > 0:
-                        self.status = 'partially_paid'
-                    elif self.balance_due > 0 and self.due_date < timezone.now().date():
-                        self.status = 'overdue'
-                    elif self.status == 'draft' and self.invoice_number:
-                        self.status = 'sent'
-                        
-                    super().save(*args, **kwargs)
-                    break  # Success, exit loop
-                    
-                except IntegrityError:
-                    if attempt == max_attempts - 1:
-                        raise
-                    # Regenerate number and try again
-                    continue
-        else:
-            # For existing invoices, just save normally
-            super().save(*args, **kwargs)
+            # Allocated inside the caller's transaction so a failed save
+            # returns the number and the financial-year series stays gapless
+            self.invoice_number = next_invoice_number(self.invoice_date)
+            
+            # Calculate GST breakup before saving
+            self.calculate_gst_breakup()
+            
+            # Calculate balance due
+            self.balance_due = self.total_amount - self.amount_paid
+            
+            # Update status based on payment
+            if self.balance_due == 0 and self.total_amount > 0:
+                self.status = 'paid'
+            elif self.amount_paid > 0 and self.balance_due > 0:
+                self.status = 'partially_paid'
+            elif self.balance_due > 0 and self.due_date < timezone.now().date():
+                self.status = 'overdue'
+            elif self.status == 'draft' and self.invoice_number:
+                self.status = 'sent'
+        
+        super().save(*args, **kwargs)
 
     def calculate_gst_breakup(self):
         """Calculate CGST, SGST, IGST based on place of supply"""
@@ -501,6 +467,24 @@ class Invoice(models.Model):
         db_table = 'fd_invoice'
         verbose_name = 'Invoice'
         verbose_name_plural = 'Invoices'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='fd_invoice_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='fd_invoice_status_created_idx'),
+            # Reminders: new invoices, sent/overdue, balance outstanding
+            models.Index(fields=['is_migrated', 'status', 'balance_due'], name='fd_invoice_reminder_idx'),
+            # Dashboard and legacy-data lists: newest new / migrated invoices
+            models.Index(fields=['is_migrated', 'created_at'], name='fd_invoice_migrated_idx'),
+            # Partial twins of the two above for SQLite (see Customer)
+            models.Index(fields=['status', 'balance_due'], condition=models.Q(is_migrated=False), name='fd_invoice_new_reminder_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_migrated=False), name='fd_invoice_new_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_migrated=True), name='fd_invoice_legacy_idx'),
+            # Scheduled reminders and overdue sweeps by status and due date
+            models.Index(fields=['status', 'due_date'], name='fd_invoice_status_due_idx'),
+            # Monthly figures and snapshots by invoice date
+            models.Index(fields=['invoice_date'], name='fd_invoice_date_idx'),
+            # Customer statements: a customer's invoices in date order
+            models.Index(fields=['customer', 'invoice_date', 'id'], name='fd_invoice_statement_idx'),
+        ]
 
 class Payment(models.Model):
     PAYMENT_METHODS = [
@@ -534,30 +518,39 @@ class Payment(models.Model):
     is_migrated = models.BooleanField(default=False)
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update invoice payment status
-        if self.status == 'completed':
-            self.update_invoice_payment_status()
+        from .snapshots import thaw_months
+
+        with transaction.atomic():
+            previous_date = Payment.objects.filter(pk=self.pk).values_list('payment_date', flat=True).first() if self.pk else None
+            super().save(*args, **kwargs)
+            thaw_months(previous_date, self.payment_date)
+            # Update invoice payment status
+            if self.status == 'completed':
+                self.update_invoice_payment_status()
 
     def update_invoice_payment_status(self):
         """Update the parent invoice's payment status"""
         try:
-            invoice = self.invoice
-            total_paid = sum(
-                payment.amount for payment in invoice.payments.filter(status='completed')
-            )
-            invoice.amount_paid = total_paid
-            invoice.balance_due = invoice.total_amount - total_paid
-            
-            # Update invoice status based on payment
-            if invoice.balance_due == 0:
-                invoice.status = 'paid'
-            elif total_paid > 0:
-                invoice.status = 'partially_paid'
-            elif invoice.due_date < timezone.now().date():
-                invoice.status = 'overdue'
+            with transaction.atomic():
+                invoice = Invoice.objects.get(pk=self.invoice_id)
+                total_paid = invoice.payments.filter(status='completed').aggregate(
+                    total=models.Sum('amount')
+                )['total'] or Decimal('0.00')
+                invoice.amount_paid = total_paid
+                invoice.balance_due = invoice.total_amount - total_paid
                 
-            invoice.save()
+                # Update invoice status based on payment
+                if invoice.balance_due == 0:
+                    invoice.status = 'paid'
+                elif total_paid > 0:
+                    invoice.status = 'partially_paid'
+                elif invoice.due_date < timezone.now().date():
+                    invoice.status = 'overdue'
+                elif invoice.status in ('paid', 'partially_paid'):
+                    # Last payment was removed
+                    invoice.status = 'sent'
+                    
+                invoice.save()
         except Exception as e:
             # Log error but don't break the payment save
             print(f"Error updating invoice payment status: {e}")
@@ -584,6 +577,15 @@ class Payment(models.Model):
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
         ordering = ['-payment_date', '-created_at']
+        indexes = [
+            # Collected amounts per period (completed payments by payment date)
+            models.Index(fields=['status', 'payment_date'], name='fd_payment_status_date_idx'),
+            # Default ordering (admin and payment history)
+            models.Index(fields=['payment_date', 'created_at'], name='fd_payment_ordering_idx'),
+            models.Index(fields=['is_migrated', 'payment_date'], name='fd_payment_migrated_idx'),
+            # Partial twin for SQLite (see Customer), in the default ordering
+            models.Index(fields=['payment_date', 'created_at'], condition=models.Q(is_migrated=True), name='fd_payment_legacy_idx'),
+        ]
 
 class EmailConfiguration(models.Model):
     name = models.CharField(max_length=255, default='Default')
@@ -727,4 +729,178 @@ class TaxConfiguration(models.Model):
     class Meta:
         db_table = 'fd_tax_configuration'
         verbose_name = 'Tax Configuration'
-        verbose_name_plural = 'Tax Configurations'
\ No newline at end of file
+        verbose_name_plural = 'Tax Configurations'
+
+# Reporting models
+class RevenueRollup(models.Model):
+    """Invoice totals per financial year, invoice month, data source and status"""
+    financial_year = models.CharField(max_length=9)
+    month = models.DateField(help_text="First day of the invoice month")
+    is_migrated = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=Invoice.STATUS_CHOICES)
+    invoice_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    balance_due = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    amount_paid = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.month:%b %Y} - {self.status} ({'migrated' if self.is_migrated else 'new'})"
+
+    class Meta:
+        db_table = 'fd_revenue_rollup'
+        verbose_name = 'Revenue Rollup'
+        verbose_name_plural = 'Revenue Rollups'
+        unique_together = ('financial_year', 'month', 'is_migrated', 'status')
+        ordering = ['-month', 'is_migrated', 'status']
+
+class MonthlySnapshot(models.Model):
+    """Frozen figures for a closed calendar month; never updated, deleted and frozen again when its rows change"""
+    month = models.DateField(unique=True, help_text="First day of the month")
+    financial_year = models.CharField(max_length=9)
+    invoiced_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    collected_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    outstanding_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    cgst_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    sgst_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    igst_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    invoice_count = models.IntegerField(default=0)
+    payment_count = models.IntegerField(default=0)
+    work_order_count = models.IntegerField(default=0)
+    new_customer_count = models.IntegerField(default=0)
+    frozen_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError('Monthly snapshots are frozen. Re-run backfill_monthly_snapshots --refreeze instead.')
+        super().save(*args, **kwargs)
+
+    @property
+    def gst_collected(self):
+        return self.cgst_amount + self.sgst_amount + self.igst_amount
+
+    def __str__(self):
+        return f"Snapshot {self.month:%b %Y}"
+
+    class Meta:
+        db_table = 'fd_monthly_snapshot'
+        verbose_name = 'Monthly Snapshot'
+        verbose_name_plural = 'Monthly Snapshots'
+        ordering = ['-month']
+
+class CostStatistic(models.Model):
+    """Streaming cost statistics of completed work orders for one comparison group"""
+    SCOPE_CHOICES = [
+        ('all', 'All Projects'),
+        ('customer', 'Customer'),
+        ('category', 'Project Category'),
+        ('band', 'Cost Band'),
+    ]
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    scope_key = models.CharField(max_length=50, blank=True)
+    count = models.IntegerField(default=0)
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0, help_text="Sum of squared deviations (Welford)")
+    min_cost = models.FloatField(null=True, blank=True)
+    max_cost = models.FloatField(null=True, blank=True)
+    histogram = models.JSONField(default=list, help_text="Counts per log-spaced cost bucket")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_dev(self):
+        return self.variance ** 0.5
+
+    def __str__(self):
+        return f"{self.get_scope_display()} {self.scope_key}".strip()
+
+    class Meta:
+        db_table = 'fd_cost_statistic'
+        verbose_name = 'Cost Statistic'
+        verbose_name_plural = 'Cost Statistics'
+        unique_together = ('scope', 'scope_key')
+
+class NumberSequence(models.Model):
+    """Counter behind generated document numbers; one row per sequence and period (FD/sequences.py)"""
+    name = models.CharField(max_length=50, help_text="e.g. work_order")
+    period = models.CharField(max_length=20, help_text="Calendar or financial year the numbers belong to")
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} {self.period}: {self.last_value}"
+
+    class Meta:
+        db_table = 'fd_number_sequence'
+        verbose_name = 'Number Sequence'
+        verbose_name_plural = 'Number Sequences'
+        unique_together = ('name', 'period')
+
+class SearchDocument(models.Model):
+    """Searchable text of one customer, work order or invoice (FD/search.py)"""
+    KIND_CHOICES = [
+        ('customer', 'Customer'),
+        ('work_order', 'Work Order'),
+        ('invoice', 'Invoice'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    content = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}"
+
+    class Meta:
+        db_table = 'fd_search_document'
+        verbose_name = 'Search Document'
+        verbose_name_plural = 'Search Documents'
+        unique_together = ('kind', 'object_id')
+
+class BackgroundJob(models.Model):
+    """Long-running work done outside the request, with progress for the UI (FD/jobs.py)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50, help_text="Handler name, e.g. bulk_delete")
+    target = models.CharField(max_length=50, blank=True, help_text="What the job works on, e.g. customer")
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.CharField(max_length=150, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def percent(self):
+        if self.status == 'done':
+            return 100
+        return min(int(self.done * 100 / self.total), 100) if self.total else 0
+
+    @property
+    def is_active(self):
+        return self.status in ('pending', 'running')
+
+    def __str__(self):
+        return f"{self.kind} {self.target} #{self.pk} ({self.status})"
+
+    class Meta:
+        db_table = 'fd_background_job'
+        verbose_name = 'Background Job'
+        verbose_name_plural = 'Background Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['kind', 'target', 'status'], name='fd_job_kind_target_idx'),
+        ]
@@ -0,0 +1,204 @@
+# FD/pagination.py - KEYSET (CURSOR) PAGINATION FOR THE LIST VIEWS
+import base64
+import hashlib
+from datetime import datetime
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from .caching import get_or_compute
+from .projections import project
+
+COUNT_CACHE_TIMEOUT = 10 * 60
+
+def encode_cursor(number, row):
+    """Opaque token for the page after/before row: page number, created_at, id"""
+    raw = f"{number}|{row.created_at.isoformat()}|{row.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """(page number, created_at, id), or None for a malformed or tampered token"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        number, created_at, pk = raw.split('|')
+        return int(number), datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def cached_count(queryset):
+    """Exact count of a filtered queryset, cached until the next data change"""
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+    return get_or_compute(f'count:{digest}', queryset.count, COUNT_CACHE_TIMEOUT)
+
+class KeysetPage:
+    """The parts of a Django Page the list templates use, for a cursor-addressed page"""
+
+    def __init__(self, object_list, number, has_next, has_previous, page_size, total=None):
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.page_size = page_size
+        self.total = total
+        self.next_cursor = encode_cursor(number + 1, object_list[-1]) if has_next and object_list else None
+        self.previous_cursor = encode_cursor(number - 1, object_list[0]) if has_previous and object_list else None
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def start_index(self):
+        return (self.number - 1) * self.page_size + 1 if self.object_list else 0
+
+    def end_index(self):
+        return (self.number - 1) * self.page_size + len(self.object_list)
+
+class RankedHits:
+    """Ids of every search hit for Paginator: the ranked ones, then the rest of the queryset"""
+
+    def __init__(self, ranked, rest, count):
+        self.ranked = ranked
+        self.rest = rest
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        start, stop = index.start or 0, index.stop
+        pks = self.ranked[start:stop]
+        if stop > len(self.ranked):
+            pks += list(self.rest[max(start - len(self.ranked), 0):stop - len(self.ranked)])
+        return pks
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin that pages on (created_at, id), newest first.
+
+    ?after=<cursor> / ?before=<cursor> fetch the next/previous page with an
+    indexed range condition, so page 5000 costs the same as page 1. Plain
+    ?page=N links still work (OFFSET paging) for bookmarks and the elided
+    page strip. The total is an exact count cached per data version; set
+    count_total = False to skip it entirely.
+
+    Search results (ranked_ids) are paged by number instead: the ranked
+    hits first, best match first, then any further matches newest first.
+
+    With a projection (a ProjectionRow class) the page holds those rows,
+    fetched in one joined query, instead of model instances.
+    """
+    paginate_by = 10
+    count_total = True
+    page_strip_each_side = 2
+    ranked_ids = None  # set by get_queryset for search results, best match first
+    projection = None
+
+    def get_pagination_query(self):
+        params = self.request.GET.copy()
+        for key in ('page', 'after', 'before'):
+            params.pop(key, None)
+        return params.urlencode()
+
+    def get_total_count(self, queryset):
+        if not self.count_total:
+            return None
+        if not hasattr(self, '_total_count'):
+            self._total_count = cached_count(queryset)
+        return self._total_count
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.projection is not None:
+            queryset = project(queryset, self.projection)
+        if self.ranked_ids is not None:
+            return self.paginate_ranked(queryset, page_size)
+        queryset = queryset.order_by('-created_at', '-pk')
+        self.total_count = self.get_total_count(queryset)
+        if 'page' in self.request.GET:
+            return self.paginate_by_number(queryset, page_size)
+
+        after = decode_cursor(self.request.GET.get('after', ''))
+        before = decode_cursor(self.request.GET.get('before', ''))
+        if before:
+            number, created_at, pk = before
+            rows = list(queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+            ).order_by('created_at', 'pk')[:page_size + 1])
+            has_previous = len(rows) > page_size and number > 1
+            rows = rows[:page_size][::-1]
+            has_next = True
+        else:
+            number, created_at, pk = after or (1, None, None)
+            if after:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            rows = list(queryset[:page_size + 1])
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+            has_previous = number > 1
+
+        page = KeysetPage(rows, max(number, 1), has_next, has_previous, page_size, self.total_count)
+        self.page_strip = self.build_page_strip(page.number, page_size)
+        return None, page, page.object_list, page.has_other_pages()
+
+    def paginate_by_number(self, queryset, page_size):
+        paginator = Paginator(queryset, page_size)
+        if self.total_count is not None:
+            paginator.count = self.total_count  # cached_property; skips the second COUNT(*)
+        try:
+            page = paginator.page(self.request.GET.get('page') or 1)
+        except InvalidPage:
+            raise Http404("Invalid page.")
+        # Continue from a numbered page with cursors
+        page.object_list = list(page.object_list)
+        page.next_cursor = encode_cursor(page.number + 1, page.object_list[-1]) if page.has_next() and page.object_list else None
+        page.previous_cursor = encode_cursor(page.number - 1, page.object_list[0]) if page.has_previous() and page.object_list else None
+        self.page_strip = self.build_page_strip(page.number, page_size, paginator)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def paginate_ranked(self, queryset, page_size):
+        """Page through search hits in rank order, after the view's other filters"""
+        matching = set(queryset.filter(pk__in=self.ranked_ids).order_by().values_list('pk', flat=True))
+        ranked = [pk for pk in self.ranked_ids if pk in matching]
+        self.total_count = self.get_total_count(queryset)
+        if self.total_count is None:
+            self.total_count = queryset.count()
+        rest = queryset.exclude(pk__in=ranked).order_by('-created_at', '-pk').values_list('pk', flat=True)
+        paginator = Paginator(RankedHits(ranked, rest, self.total_count), page_size)
+        try:
+            page = paginator.page(self.request.GET.get('page') or 1)
+        except InvalidPage:
+            raise Http404("Invalid page.")
+        rows = {row.pk: row for row in queryset.filter(pk__in=page.object_list)}
+        page.object_list = [rows[pk] for pk in page.object_list if pk in rows]
+        page.next_cursor = page.previous_cursor = None
+        self.page_strip = self.build_page_strip(page.number, page_size, paginator)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def build_page_strip(self, number, page_size, paginator=None):
+        """Elided page numbers around the current page, None for each gap. Needs the total"""
+        if self.total_count is None:
+            self.last_page = None
+            return []
+        if paginator is None:
+            paginator = Paginator(range(self.total_count), page_size)
+        self.last_page = paginator.num_pages
+        strip = paginator.get_elided_page_range(min(number, paginator.num_pages), on_each_side=self.page_strip_each_side, on_ends=1)
+        return [None if num == paginator.ELLIPSIS else num for num in strip]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['pagination_query'] = self.get_pagination_query()
+        context['page_strip'] = getattr(self, 'page_strip', [])
+        context['total_count'] = getattr(self, 'total_count', None)
+        context['last_page'] = getattr(self, 'last_page', None)
+        return context
@@ -0,0 +1,418 @@
+# FD/pdf.py - INVOICE / WORK ORDER / STATEMENT PDF RENDERING WITH A LAYOUT BUILT ONCE PER PROCESS
+import functools
+import io
+import itertools
+import threading
+from xml.sax.saxutils import escape
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont, TTFError
+    from reportlab.platypus import BaseDocTemplate, Frame, NextPageTemplate, PageTemplate, Paragraph, Spacer, Table, TableStyle
+except ImportError:
+    pdfmetrics = None
+
+# Part of every stored PDF's key: bump when the rendered layout changes
+LAYOUT_VERSION = 2
+
+RUPEE = '₹'
+# (regular, bold) TrueType fonts tried in order; the first pair that loads
+# and has a ₹ glyph is embedded. FD_PDF_FONTS in settings replaces the list.
+FONT_CANDIDATES = [
+    (settings.BASE_DIR / 'static' / 'fonts' / 'DejaVuSans.ttf', settings.BASE_DIR / 'static' / 'fonts' / 'DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/dejavu/DejaVuSans.ttf', '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf', '/usr/share/fonts/truetype/noto/NotoSans-Bold.ttf'),
+]
+
+mm = 72 / 25.4  # points
+CELL_FONT_SIZE = 8
+CELL_PADDING = 6  # reportlab's default left / right table cell padding
+PAGE_WIDTH, PAGE_HEIGHT = 210 * mm, 297 * mm  # A4
+MARGIN = 18 * mm
+HEADER_HEIGHT = 30 * mm
+FOOTER_HEIGHT = 14 * mm
+
+def pdf_filename(invoice):
+    # Invoice numbers contain '/', which would read as directories
+    return f"invoice_{invoice.invoice_number.replace('/', '_')}.pdf"
+
+def work_order_filename(work_order):
+    return f"work_order_{work_order.work_order_number.replace('/', '_')}.pdf"
+
+def register_fonts():
+    """(regular, bold, currency prefix): an embedded ₹-capable TTF, else Helvetica with 'Rs. '"""
+    for regular, bold in getattr(settings, 'FD_PDF_FONTS', FONT_CANDIDATES):
+        try:
+            faces = (TTFont('FDSans', str(regular)), TTFont('FDSans-Bold', str(bold)))
+        except (OSError, TTFError):
+            continue
+        if all(ord(RUPEE) in face.face.charToGlyph for face in faces):
+            for face in faces:
+                pdfmetrics.registerFont(face)
+            return 'FDSans', 'FDSans-Bold', RUPEE
+    return 'Helvetica', 'Helvetica-Bold', 'Rs. '
+
+class PageDecor:
+    """
+    Company header and footer of one CompanySettings version, wrapped once
+    and drawn on every page of every document (drawOn reuses the layout).
+    """
+
+    def __init__(self, layout, company_settings):
+        width = PAGE_WIDTH - 2 * MARGIN
+        styles = layout.styles
+        header = []
+        footer = []
+        if company_settings:
+            header = [
+                Paragraph(escape(company_settings.company_name), styles['company']),
+                Paragraph(escape(company_settings.address).replace('\n', '<br/>'), styles['small']),
+                Paragraph(escape(
+                    f"GST: {company_settings.gst_number} | Phone: {company_settings.phone} | Email: {company_settings.email}"
+                ), styles['small']),
+            ]
+            footer = [
+                Paragraph(escape(company_settings.invoice_footer), styles['footer']),
+                Paragraph(escape(f"{company_settings.legal_name} | GST: {company_settings.gst_number}"), styles['footer']),
+            ]
+        self.header = [(paragraph, paragraph.wrap(width, HEADER_HEIGHT)[1]) for paragraph in header]
+        self.footer = [(paragraph, paragraph.wrap(width, FOOTER_HEIGHT)[1]) for paragraph in footer]
+        self.font = layout.font
+        # drawOn briefly attaches the canvas to the paragraph, so threads take turns
+        self.lock = threading.Lock()
+
+    def draw(self, canvas, doc):
+        with self.lock:
+            self._draw(canvas, doc)
+
+    def _draw(self, canvas, doc):
+        canvas.saveState()
+        y = PAGE_HEIGHT - MARGIN
+        for paragraph, height in self.header:
+            y -= height
+            paragraph.drawOn(canvas, MARGIN, y)
+        canvas.setStrokeColor(colors.grey)
+        canvas.line(MARGIN, PAGE_HEIGHT - MARGIN - HEADER_HEIGHT + 4, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN - HEADER_HEIGHT + 4)
+        y = MARGIN + FOOTER_HEIGHT
+        for paragraph, height in self.footer:
+            y -= height
+            paragraph.drawOn(canvas, MARGIN, y)
+        canvas.setFont(self.font, 8)
+        canvas.drawRightString(PAGE_WIDTH - MARGIN, MARGIN / 2, f"Page {doc.page}")
+        canvas.restoreState()
+
+class FlowableStream(list):
+    """
+    Story for doc.build that is filled from an iterator as the build
+    consumes it, so a long document never holds all of its flowables.
+    A few are kept ahead for keepWithNext and split handling.
+    """
+
+    def __init__(self, flowables, ahead=20):
+        super().__init__()
+        self.source = iter(flowables)
+        self.ahead = ahead
+        self._fill()
+
+    def _fill(self):
+        while self.source is not None and list.__len__(self) < self.ahead:
+            try:
+                self.append(next(self.source))
+            except StopIteration:
+                self.source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self._fill()
+
+class Layout:
+    """Fonts, paragraph styles, table styles and page decorations shared by every document"""
+
+    def __init__(self):
+        self.font, self.bold, self.currency = register_fonts()
+        sample = getSampleStyleSheet()
+
+        def style(name, parent, **overrides):
+            return ParagraphStyle(name, parent=sample[parent], fontName=overrides.pop('fontName', self.font), **overrides)
+
+        self.styles = {
+            'company': style('FDCompany', 'Title', fontName=self.bold, fontSize=16, leading=20, alignment=0, spaceAfter=2),
+            'title': style('FDTitle', 'Heading1', fontName=self.bold),
+            'heading': style('FDHeading', 'Heading2', fontName=self.bold),
+            'section': style('FDSection', 'Heading3', fontName=self.bold, fontSize=10, spaceBefore=6, spaceAfter=4),
+            'normal': style('FDNormal', 'Normal'),
+            'small': style('FDSmall', 'Normal', fontSize=8, leading=10),
+            'cell': style('FDCell', 'Normal', fontSize=CELL_FONT_SIZE, leading=10),
+            'footer': style('FDFooter', 'Normal', fontSize=7, leading=9, alignment=TA_CENTER, textColor=colors.grey),
+            'right': style('FDRight', 'Normal', alignment=TA_RIGHT),
+        }
+        self.amount_table = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), self.bold),
+            ('FONTSIZE', (0, 0), (-1, 0), 14),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('FONTNAME', (0, 1), (-1, -1), self.font),
+            ('FONTSIZE', (0, 1), (-1, -1), 12),
+        ])
+        self.info_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ])
+        self.columns_table = TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ])
+        self.breakdown_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTNAME', (0, -1), (-1, -1), self.bold),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('LINEBELOW', (0, 0), (-1, -2), 0.25, colors.lightgrey),
+            ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+        ])
+        self.statement_head = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), self.bold),
+            ('FONTSIZE', (0, 0), (-1, -1), CELL_FONT_SIZE),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+            ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+        ])
+        self.statement_rows = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTSIZE', (0, 0), (-1, -1), CELL_FONT_SIZE),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+            ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ])
+        self._decor = {}
+        self._decor_lock = threading.Lock()
+
+    def money(self, value):
+        return f'{self.currency}{value}'
+
+    def text(self, value, style='normal'):
+        """Paragraph of plain text: markup characters escaped, line breaks kept"""
+        return Paragraph(escape(str(value or '')).replace('\n', '<br/>'), self.styles[style])
+
+    def cell(self, value, width):
+        """Plain string when value fits width on one line (much cheaper to lay out), else a wrapping Paragraph"""
+        value = str(value or '')
+        if '\n' not in value and pdfmetrics.stringWidth(value, self.font, CELL_FONT_SIZE) <= width - 2 * CELL_PADDING:
+            return value
+        return self.text(value, 'cell')
+
+    def decor(self, company_settings):
+        """PageDecor for this CompanySettings version, built on first use"""
+        key = (company_settings.pk, company_settings.updated_at) if company_settings else None
+        with self._decor_lock:
+            decor = self._decor.get(key)
+            if decor is None:
+                if len(self._decor) >= 8:
+                    self._decor.clear()  # settings rarely change; old versions are never drawn again
+                decor = self._decor[key] = PageDecor(self, company_settings)
+        return decor
+
+    def build(self, story, company_settings, continued_header=None):
+        """
+        PDF bytes of story on A4 pages with the company header and footer.
+        continued_header (a flowable, e.g. table column headings) is drawn
+        at the top of every page after the first.
+        """
+        buffer = io.BytesIO()
+        decor = self.decor(company_settings)
+        doc = BaseDocTemplate(buffer, pagesize=(PAGE_WIDTH, PAGE_HEIGHT), leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN)
+        width = PAGE_WIDTH - 2 * MARGIN
+        height = PAGE_HEIGHT - 2 * MARGIN - HEADER_HEIGHT - FOOTER_HEIGHT
+        # Frames keep per-build state, so each document gets its own (they are cheap)
+        templates = [PageTemplate(id='page', frames=[Frame(MARGIN, MARGIN + FOOTER_HEIGHT, width, height, id='content')], onPage=decor.draw)]
+        if continued_header is not None:
+            header_height = continued_header.wrap(width, height)[1]
+            top = PAGE_HEIGHT - MARGIN - HEADER_HEIGHT
+
+            def draw_continued(canvas, doc):
+                decor.draw(canvas, doc)
+                continued_header.drawOn(canvas, MARGIN, top - header_height)
+
+            templates.append(PageTemplate(
+                id='continued', onPage=draw_continued,
+                frames=[Frame(MARGIN, MARGIN + FOOTER_HEIGHT, width, height - header_height, id='content')],
+            ))
+            story = itertools.chain([NextPageTemplate('continued')], story)
+        doc.addPageTemplates(templates)
+        # story may be any iterable, e.g. a generator of table chunks
+        doc.build(FlowableStream(story))
+        return buffer.getvalue()
+
+@functools.lru_cache(maxsize=None)
+def get_layout():
+    """The process-wide Layout. Raises ImportError without reportlab."""
+    if pdfmetrics is None:
+        raise ImportError("PDF export requires reportlab")
+    return Layout()
+
+def render_invoice_pdf(invoice, company_settings=None, layout=None):
+    """The invoice as PDF bytes. Raises ImportError without reportlab."""
+    layout = layout or get_layout()
+    money = layout.money
+    story = [
+        layout.text(f"INVOICE: {invoice.invoice_number}", 'title'),
+        Spacer(1, 4 * mm),
+        layout.text(f"Date: {invoice.invoice_date}"),
+        layout.text(f"Due Date: {invoice.due_date}"),
+        layout.text(f"Customer: {invoice.customer.company_name}"),
+        Spacer(1, 5 * mm),
+        Table([
+            ['Description', 'Amount'],
+            ['Base Amount', money(invoice.base_amount)],
+            [f'GST ({invoice.gst_percentage}%)', money(invoice.gst_amount)],
+            ['Total Amount', money(invoice.total_amount)],
+            ['Amount Paid', money(invoice.amount_paid)],
+            ['Balance Due', money(invoice.balance_due)],
+        ], style=layout.amount_table),
+        Spacer(1, 5 * mm),
+    ]
+    if invoice.terms_and_conditions:
+        story += [layout.text("Terms & Conditions:", 'heading'), layout.text(invoice.terms_and_conditions)]
+    return layout.build(story, company_settings)
+
+def _info_table(layout, rows):
+    return Table(
+        [[label, layout.text(value, 'cell')] for label, value in rows],
+        colWidths=[22 * mm, None], style=layout.info_table,
+    )
+
+def render_work_order_pdf(work_order, company_settings=None, layout=None):
+    """The work order as PDF bytes, with the sections of the print page. Raises ImportError without reportlab."""
+    layout = layout or get_layout()
+    money = layout.money
+    customer = work_order.customer
+    created = timezone.localtime(work_order.created_at).strftime('%b %d, %Y') if work_order.created_at else ''
+    taxable = (work_order.base_amount or 0) - (work_order.discount_amount or 0)
+
+    column_width = (PAGE_WIDTH - 2 * MARGIN) / 3
+    overview = Table([[
+        [layout.text("Project Details", 'section'), _info_table(layout, [
+            ('Work Order No', work_order.work_order_number),
+            ('Project Title', work_order.project_title),
+            ('Created Date', created),
+            ('Status', work_order.get_status_display()),
+        ])],
+        [layout.text("Client Information", 'section'), _info_table(layout, [
+            ('Company', customer.company_name),
+            ('Contact', customer.contact_name),
+            ('Email', customer.email),
+            ('Phone', customer.mobile_number),
+            ('GST Number', customer.gst_number),
+        ])],
+        [layout.text("Payment Summary", 'section'), _info_table(layout, [
+            ('Base Amount', money(work_order.base_amount)),
+            ('Discount', f"{work_order.discount}%"),
+            ('GST', f"{work_order.gst_percentage}%"),
+            ('Total', money(work_order.total_cost)),
+        ])],
+    ]], colWidths=[column_width] * 3, style=layout.columns_table)
+
+    story = [layout.text(f"WORK ORDER: {work_order.work_order_number}", 'title'), overview]
+    if work_order.project_description:
+        story += [layout.text("Project Description", 'section'), layout.text(work_order.project_description)]
+    story += [
+        layout.text("Financial Breakdown", 'section'),
+        Table([
+            ['Base Amount', money(work_order.base_amount)],
+            [f'Discount ({work_order.discount}%)', f"-{money(work_order.discount_amount)}"],
+            ['Taxable Amount', money(taxable)],
+            [f'GST ({work_order.gst_percentage}%)', money(work_order.gst_amount)],
+            ['Total Amount', money(work_order.total_cost)],
+        ], colWidths=[None, 45 * mm], style=layout.breakdown_table),
+    ]
+    if company_settings:
+        story += [layout.text("Payment Information", 'section'), _info_table(layout, [
+            ('Bank Name', company_settings.bank_name),
+            ('Account Number', company_settings.account_number),
+            ('Account Holder', company_settings.account_holder),
+            ('IFSC Code', company_settings.ifsc_code),
+            ('Branch', company_settings.branch),
+        ])]
+    story.append(layout.text("Terms & Conditions", 'section'))
+    story.append(layout.text(work_order.terms_and_conditions or "Terms and conditions will be provided separately."))
+    story.append(Spacer(1, 4 * mm))
+    story.append(layout.text("This is a computer-generated work order. No signature required.", 'footer'))
+    return layout.build(story, company_settings)
+
+STATEMENT_COLUMNS = ['Date', 'Reference', 'Details', 'Debit', 'Credit', 'Balance']
+STATEMENT_WIDTHS = [20 * mm, 34 * mm, 50 * mm, 23 * mm, 23 * mm, 24 * mm]  # 174 mm, the frame width
+STATEMENT_ROWS_PER_TABLE = 50  # lines per table flowable; tables split across pages themselves
+
+def _statement_tables(layout, statement):
+    money = layout.money
+    lines = iter(statement)
+    while True:
+        chunk = list(itertools.islice(lines, STATEMENT_ROWS_PER_TABLE))
+        if not chunk:
+            return
+        yield Table([
+            [
+                f"{line.date:%d %b %Y}", line.reference, layout.cell(line.details, STATEMENT_WIDTHS[2]),
+                money(line.debit) if line.debit is not None else '',
+                money(line.credit) if line.credit is not None else '',
+                money(line.balance),
+            ] for line in chunk
+        ], colWidths=STATEMENT_WIDTHS, style=layout.statement_rows)
+
+def _statement_story(layout, statement):
+    customer = statement.customer
+    money = layout.money
+    period = f"{statement.start:%d %b %Y}" if statement.start else "All transactions"
+    end = statement.end or timezone.localdate()
+    yield layout.text("STATEMENT OF ACCOUNT", 'title')
+    yield layout.text(f"{period} to {end:%d %b %Y}")
+    yield Spacer(1, 3 * mm)
+    yield _info_table(layout, [
+        ('Customer', customer.company_name),
+        ('Contact', f"{customer.contact_name} | {customer.email} | {customer.mobile_number}"),
+        ('Address', customer.address),
+        ('GST Number', customer.gst_number),
+    ])
+    yield Spacer(1, 4 * mm)
+    yield Table([STATEMENT_COLUMNS], colWidths=STATEMENT_WIDTHS, style=layout.statement_head)
+    yield Table([['', '', 'Opening balance', '', '', money(statement.opening)]], colWidths=STATEMENT_WIDTHS, style=layout.statement_rows)
+    # Lines are read from the database as these tables are laid out...
+    yield from _statement_tables(layout, statement)
+    # ...so the statement's totals are complete from here on
+    yield Spacer(1, 4 * mm)
+    yield Table([
+        ['Opening balance', money(statement.opening)],
+        ['Invoiced', money(statement.debits)],
+        ['Received', money(statement.credits)],
+        ['Balance Due', money(statement.closing)],
+    ], colWidths=[None, 45 * mm], style=layout.breakdown_table, hAlign='RIGHT')
+    yield Spacer(1, 4 * mm)
+    yield layout.text(f"{statement.count} transactions. This is a computer-generated statement. No signature required.", 'footer')
+
+def render_statement_pdf(statement, company_settings=None, layout=None):
+    """
+    The statement as PDF bytes. Lines are pulled from the statement as
+    pages fill, so the flowables in memory stay a few tables however long
+    the statement is. Raises ImportError without reportlab.
+    """
+    layout = layout or get_layout()
+    continued = Table([STATEMENT_COLUMNS], colWidths=STATEMENT_WIDTHS, style=layout.statement_head)
+    return layout.build(_statement_story(layout, statement), company_settings, continued_header=continued)
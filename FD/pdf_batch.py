@@ -0,0 +1,144 @@
+# FD/pdf_batch.py - MANY INVOICE PDFS RENDERED ACROSS PROCESSES, STREAMED AS ONE ZIP
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+import django
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .conditional import ACTIVE_SETTINGS
+from .exports import _ChunkBuffer
+from .filters import active_filters, filtered_queryset
+from .models import Invoice
+from .pdf import pdf_filename, render_invoice_pdf
+
+CHUNK_SIZE = 200           # invoices read per query
+PENDING_PER_WORKER = 2     # PDFs queued ahead of each worker; bounds what waits in memory
+MAX_TASKS_PER_CHILD = 100  # a worker is replaced after this many PDFs, so its memory cannot creep
+PDFS_PER_WORKER = 100      # a spawned worker takes ~1s to start; smaller batches render faster in-process
+INVOICE_DATE_PARAMS = (('invoice_date_from', 'invoice_date__gte'), ('invoice_date_to', 'invoice_date__lte'))
+REQUEST_MAX_INVOICES = 200  # PDFs one web request may render; larger batches go through export_invoice_pdfs
+
+def batch_queryset(params):
+    """
+    Invoices chosen by params: 'ids' (comma-separated, or a list), else the
+    invoice list filters narrowed by invoice_date_from / invoice_date_to
+    (YYYY-MM-DD, inclusive; the list's own dates are creation dates).
+    Raises ValueError for malformed ids or dates.
+    """
+    ids = params.get('ids')
+    if ids:
+        if isinstance(ids, str):
+            ids = ids.split(',')
+        try:
+            return Invoice.objects.filter(pk__in=[int(pk) for pk in ids if str(pk).strip()])
+        except ValueError:
+            raise ValueError("ids must be a comma-separated list of invoice ids")
+    queryset = filtered_queryset('invoice', params)[0]
+    for name, lookup in INVOICE_DATE_PARAMS:
+        if params.get(name):
+            try:
+                day = datetime.strptime(params.get(name), '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+            queryset = queryset.filter(**{lookup: day})
+    return queryset
+
+def request_queryset(params):
+    """
+    batch_queryset() for a web request: ids or at least one filter, and no
+    more than REQUEST_MAX_INVOICES invoices. Raises ValueError otherwise.
+    """
+    if not params.get('ids') and not active_filters('invoice', params) and not any(
+        params.get(name) for name, _ in INVOICE_DATE_PARAMS
+    ):
+        raise ValueError("choose invoices (ids) or filter the list first")
+    queryset = batch_queryset(params)
+    total = queryset.count()
+    if total > REQUEST_MAX_INVOICES:
+        raise ValueError(
+            f"{total:,} invoices match; download at most {REQUEST_MAX_INVOICES} at once, "
+            f"or run python manage.py export_invoice_pdfs for larger batches"
+        )
+    return queryset
+
+def worker_count(total, workers=None):
+    """Processes to use: as asked, else one per core but no more than the batch is worth"""
+    if workers is None:
+        workers = min(os.cpu_count() or 1, total // PDFS_PER_WORKER)
+    return max(1, min(workers, total))
+
+def iter_invoices(queryset, chunk_size=CHUNK_SIZE):
+    """Invoices (with customer) of queryset in keyset batches on pk"""
+    queryset = queryset.select_related('customer').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        yield from batch
+        if len(batch) < chunk_size:
+            return
+        last_pk = batch[-1].pk
+
+def _render(invoice, company_settings):
+    return pdf_filename(invoice), render_invoice_pdf(invoice, company_settings)
+
+def render_many(queryset, workers=None):
+    """
+    (filename, PDF bytes) for every invoice of queryset, in completion
+    order. The reportlab work runs in a pool of worker processes, one per
+    core by default; a single worker renders in this process instead.
+    """
+    company_settings = ACTIVE_SETTINGS.first()
+    workers = worker_count(queryset.count(), workers)
+    if workers == 1:
+        for invoice in iter_invoices(queryset):
+            yield _render(invoice, company_settings)
+        return
+
+    # Workers are spawned, not forked: a fresh interpreter shares no database
+    # connection or lock with the web process. They never query; the parent
+    # sends each invoice with the data it renders. django.setup itself is
+    # the initializer, since unpickling anything from FD needs the app registry.
+    pool = ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup,
+        max_tasks_per_child=MAX_TASKS_PER_CHILD,
+    )
+    try:
+        pending = set()
+        for invoice in iter_invoices(queryset):
+            pending.add(pool.submit(_render, invoice, company_settings))
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        # Also reached when the client disconnects mid-download
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def zip_stream(files):
+    """ZIP archive of (name, bytes) pairs, sent entry by entry as they arrive"""
+    buffer = _ChunkBuffer()
+    # PDFs are already compressed (reportlab's pageCompression), so entries are stored
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            yield buffer.drain()
+    yield buffer.drain()
+
+def batch_pdf_response(queryset):
+    """
+    The ZIP as a download, rendered in this process: a web worker must not
+    start a process pool (spawn re-runs sys.executable, which under uWSGI or
+    mod_wsgi is the server, not python). request_queryset() bounds the work.
+    """
+    filename = f'invoices-{timezone.localdate():%Y%m%d}.zip'
+    response = StreamingHttpResponse(zip_stream(render_many(queryset, workers=1)), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
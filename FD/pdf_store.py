@@ -0,0 +1,162 @@
+# FD/pdf_store.py - RENDERED INVOICE / WORK ORDER PDFS, KEYED BY CONTENT VERSION, SIZE-BOUNDED
+import io
+import logging
+import os
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from .conditional import ACTIVE_SETTINGS, content_version
+from .models import Invoice, WorkOrder
+from .pdf import LAYOUT_VERSION, render_invoice_pdf, render_work_order_pdf
+
+logger = logging.getLogger('FD')
+
+DEFAULTS = {
+    'BACKEND': 'disk',                 # 'disk' or 'cache' (the default cache backend)
+    'DIRECTORY': None,                 # disk: defaults to MEDIA_ROOT/pdf_cache
+    'MAX_BYTES': 256 * 1024 * 1024,    # disk: total budget, least recently used files go first
+    'TIMEOUT': 30 * 24 * 60 * 60,      # cache: seconds an entry lives
+}
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'FD_PDF_STORE', {}))
+    if config['DIRECTORY'] is None:
+        config['DIRECTORY'] = os.path.join(settings.MEDIA_ROOT, 'pdf_cache')
+    return config
+
+class DiskStore:
+    """
+    One file per (name, version). A hit refreshes the file's mtime, so
+    eviction by oldest mtime is least-recently-used; files are written
+    under a temporary name and renamed, so readers never see half a PDF.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, name, version):
+        return os.path.join(self.directory, f'{name}-{version}.pdf')
+
+    def open(self, name, version):
+        """Binary file of the stored PDF, or None"""
+        path = self.path(name, version)
+        try:
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted meanwhile; the open handle still reads it
+        return handle
+
+    def save(self, name, version, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(name, version)
+        temporary = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(temporary, 'wb') as handle:
+            handle.write(data)
+        os.replace(temporary, path)
+        # Earlier versions of the same document can never be served again
+        prefix = f'{name}-'
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(prefix) and entry.name.endswith('.pdf') and entry.path != path:
+                self._remove(entry.path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Remove least recently used files until the store fits in max_bytes"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pdf'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                self._remove(path)
+                total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.pdf'):
+                    self._remove(entry.path)
+
+class CacheStore:
+    """
+    PDFs in the default cache (shared by all workers online). Versioned keys
+    make old versions unreachable; the cache's own culling bounds the size.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def key(self, name, version):
+        return f'pdf:{name}:{version}'
+
+    def open(self, name, version):
+        data = cache.get(self.key(name, version))
+        return io.BytesIO(data) if data is not None else None
+
+    def save(self, name, version, data):
+        cache.set(self.key(name, version), data, self.timeout)
+
+    def clear(self):
+        pass  # entries expire with the cache
+
+def get_store():
+    config = get_config()
+    if config['BACKEND'] == 'cache':
+        return CacheStore(config['TIMEOUT'])
+    return DiskStore(config['DIRECTORY'], config['MAX_BYTES'])
+
+# Kind (as in conditional.PAGE_STATES) -> (model, renderer)
+DOCUMENTS = {
+    'invoice': (Invoice, render_invoice_pdf),
+    'work_order': (WorkOrder, render_work_order_pdf),
+}
+
+def document_pdf(kind, pk, version=None):
+    """
+    (binary file, object) for the PDF of the invoice or work order pk,
+    rendered only when no copy of its current version is stored. Raises
+    the model's DoesNotExist, and ImportError without reportlab.
+    """
+    model, render = DOCUMENTS[kind]
+    # The version is read before the data it is rendered from: a concurrent
+    # change can at worst store newer content under the older key
+    if version is None:
+        version = content_version(kind, pk)[0]
+        if version is None:
+            raise model.DoesNotExist(f'{model._meta.verbose_name} {pk} does not exist')
+    version = f'{LAYOUT_VERSION}-{version}'
+    name = f'{kind}-{pk}'
+    obj = model.objects.select_related('customer').get(pk=pk)
+
+    store = get_store()
+    handle = store.open(name, version)
+    if handle is None:
+        data = render(obj, ACTIVE_SETTINGS.first())
+        try:
+            store.save(name, version, data)
+        except OSError:
+            logger.exception("Could not store the PDF of %s %s", kind, pk)
+        handle = io.BytesIO(data)
+    return handle, obj
+
+def invoice_pdf(pk, version=None):
+    return document_pdf('invoice', pk, version)
@@ -0,0 +1,80 @@
+# FD/prerender.py - INVOICE PDF AND PRINT PAGE RENDERED IN THE BACKGROUND AFTER EVERY CHANGE
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from .conditional import ACTIVE_SETTINGS, content_version, render_version
+from .jobs import enqueue, report_progress
+from .models import BackgroundJob, Invoice
+from .pdf_store import document_pdf
+
+logger = logging.getLogger('FD.jobs')
+
+DEFAULTS = {
+    'ENABLED': True,                      # queue a prerender job when an invoice or its payments change
+    'PRINT_TIMEOUT': 30 * 24 * 60 * 60,   # seconds a rendered print page stays in the cache
+}
+JOB_KIND = 'prerender_invoice'
+PRINT_TEMPLATE = 'FD/print_invoice_enhanced.html'
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'FD_PRERENDER', {}))
+    return config
+
+def print_key(pk, version):
+    # render_version: a deploy with new templates or asset hashes renders afresh
+    return f'fd:print_invoice:{pk}:{version}:{render_version()}'
+
+def invoice_print_html(pk, version=None):
+    """
+    The print page of invoice pk, from the cache when its current version
+    was rendered already (usually by the prerender job), else rendered and
+    cached now. Raises Invoice.DoesNotExist.
+    """
+    if version is None:
+        version = content_version('invoice', pk)[0]
+        if version is None:
+            raise Invoice.DoesNotExist(f'Invoice {pk} does not exist')
+    key = print_key(pk, version)
+    html = cache.get(key)
+    if html is None:
+        invoice = Invoice.objects.select_related('customer', 'work_order').get(pk=pk)
+        html = render_to_string(PRINT_TEMPLATE, {
+            'invoice': invoice,
+            'object': invoice,
+            'company_settings': ACTIVE_SETTINGS.first(),
+        })
+        cache.set(key, html, get_config()['PRINT_TIMEOUT'])
+    return html
+
+def schedule(invoice_id):
+    """Queue prerendering of the invoice once the current transaction commits"""
+    if get_config()['ENABLED']:
+        transaction.on_commit(lambda: queue_prerender(invoice_id))
+
+def queue_prerender(invoice_id):
+    """Prerender job for the invoice, unless one is already waiting (it will render the latest data)"""
+    jobs = BackgroundJob.objects.filter(kind=JOB_KIND, target=str(invoice_id))
+    if jobs.filter(status='pending').exists():
+        return None
+    # Finished jobs of this invoice are no longer interesting; failures stay in the job log
+    jobs.filter(status='done').delete()
+    return enqueue(JOB_KIND, target=str(invoice_id), total=2, created_by='prerender')
+
+def run_prerender(job):
+    """Store the PDF and cache the print page of the invoice's current version"""
+    pk = int(job.target)
+    version = content_version('invoice', pk)[0]
+    if version is None:
+        logger.info("Invoice %s was deleted before it could be prerendered", pk)
+        return
+    try:
+        handle, _ = document_pdf('invoice', pk, version)
+        handle.close()
+    except ImportError:
+        logger.info("reportlab is not installed; invoice %s PDF not prerendered", pk)
+    report_progress(job, 1)
+    invoice_print_html(pk, version)
+    report_progress(job, 1)
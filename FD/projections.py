@@ -0,0 +1,91 @@
+# FD/projections.py - LIGHTWEIGHT __slots__ ROWS FOR THE LIST PAGES
+from django.db.models.query import ValuesListIterable
+
+class ProjectionRow:
+    """
+    Read-only row holding just the columns a template renders.
+
+    Each name in __slots__ is read from the ORM lookup of the same name
+    (or lookups[name]); names in `related` become nested rows filled from
+    the same joined query, so {{ invoice.customer.company_name }} keeps
+    working without a query per row.
+    """
+    __slots__ = ()
+    lookups = {}
+    related = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.iterable = type(f'{cls.__name__}Iterable', (ProjectionIterable,), {'row_class': cls})
+
+    @classmethod
+    def columns(cls, prefix=''):
+        """ORM lookups in slot order, nested rows flattened in place"""
+        columns = []
+        for name in cls.__slots__:
+            if name in cls.related:
+                columns += cls.related[name].columns(f'{prefix}{name}__')
+            else:
+                columns.append(prefix + cls.lookups.get(name, name))
+        return columns
+
+    @classmethod
+    def from_values(cls, values, position=0):
+        """(row, next position) built from a flat values_list tuple"""
+        row = object.__new__(cls)
+        for name in cls.__slots__:
+            if name in cls.related:
+                value, position = cls.related[name].from_values(values, position)
+            else:
+                value = values[position]
+                position += 1
+            setattr(row, name, value)
+        return row, position
+
+    def __repr__(self):
+        return f'<{type(self).__name__} pk={getattr(self, "pk", None)}>'
+
+class ProjectionIterable(ValuesListIterable):
+    """values_list() iteration that yields row_class instances instead of tuples"""
+    row_class = None
+
+    def __iter__(self):
+        from_values = self.row_class.from_values
+        for values in super().__iter__():
+            yield from_values(values)[0]
+
+def project(queryset, row_class):
+    """
+    queryset narrowed to row_class's columns (one SELECT with the joins it
+    needs). Still a QuerySet: filter(), order_by(), slicing and count()
+    work as usual, and iterating it yields row_class instances.
+    """
+    queryset = queryset.values_list(*row_class.columns())
+    queryset._iterable_class = row_class.iterable
+    return queryset
+
+# --- Rows rendered by the list templates ---------------------------------
+
+class CustomerNameRow(ProjectionRow):
+    __slots__ = ('company_name', 'contact_name')
+
+class CustomerRow(ProjectionRow):
+    __slots__ = ('pk', 'company_name', 'contact_name', 'email', 'mobile_number', 'gst_number', 'branch_location', 'created_at')
+
+class WorkOrderRow(ProjectionRow):
+    __slots__ = (
+        'pk', 'work_order_number', 'project_title', 'project_description', 'customer',
+        'base_amount', 'total_cost', 'status', 'invoice', 'created_at',
+    )
+    lookups = {'invoice': 'invoice__id'}  # only tested for presence ("not yet invoiced")
+    related = {'customer': CustomerNameRow}
+
+class ProjectTitleRow(ProjectionRow):
+    __slots__ = ('project_title', 'project_description')
+
+class InvoiceRow(ProjectionRow):
+    __slots__ = (
+        'pk', 'invoice_number', 'customer', 'work_order', 'invoice_date', 'due_date',
+        'total_amount', 'balance_due', 'status', 'created_at',
+    )
+    related = {'customer': CustomerNameRow, 'work_order': ProjectTitleRow}
@@ -0,0 +1,153 @@
+# FD/rollups.py - INCREMENTALLY MAINTAINED REVENUE ROLLUP
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from .models import Invoice, RevenueRollup, get_financial_year
+
+ROLLUP_FIELDS = ('invoice_date', 'is_migrated', 'status', 'total_amount', 'balance_due', 'amount_paid')
+AMOUNT_FIELDS = ('total_amount', 'balance_due', 'amount_paid')
+CENT = Decimal('0.01')
+
+def _as_date(value):
+    """invoice_date defaults to timezone.now, so unsaved instances may hold a datetime"""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+def rollup_key(invoice_date, is_migrated, status):
+    """(financial_year, month, is_migrated, status) bucket for an invoice"""
+    month = _as_date(invoice_date).replace(day=1)
+    return (get_financial_year(month), month, bool(is_migrated), status)
+
+def _lookup(key):
+    financial_year, month, is_migrated, status = key
+    return {
+        'financial_year': financial_year,
+        'month': month,
+        'is_migrated': is_migrated,
+        'status': status,
+    }
+
+def invoice_rollup_values(pk):
+    """Stored state of an invoice as far as the rollup is concerned"""
+    return Invoice.objects.filter(pk=pk).values(*ROLLUP_FIELDS).first()
+
+def _contribution(values):
+    """Bucket key and [count, total_amount, balance_due, amount_paid] for one invoice"""
+    if isinstance(values, Invoice):
+        values = {field: getattr(values, field) for field in ROLLUP_FIELDS}
+    key = rollup_key(values['invoice_date'], values['is_migrated'], values['status'])
+    return key, [1] + [Decimal(str(values[field] or 0)) for field in AMOUNT_FIELDS]
+
+def record_invoice_change(previous, current):
+    """
+    Move an invoice's contribution from its previous bucket to its current one.
+
+    previous/current are Invoice instances or invoice_rollup_values() dicts;
+    None means the invoice did not exist before (create) or after (delete).
+    Call inside the transaction that writes the invoice.
+    """
+    deltas = defaultdict(lambda: [0, Decimal('0.00'), Decimal('0.00'), Decimal('0.00')])
+    for values, sign in ((previous, -1), (current, 1)):
+        if values is None:
+            continue
+        key, amounts = _contribution(values)
+        for index, amount in enumerate(amounts):
+            deltas[key][index] += sign * amount
+
+    for key, delta in deltas.items():
+        if any(delta):
+            _apply_delta(key, delta)
+
+def record_invoice_delete(invoice):
+    # Invoice.delete() leaves the stored values; queryset deletes load fresh rows
+    record_invoice_change(getattr(invoice, '_rollup_values', None) or invoice, None)
+
+def _apply_delta(key, delta):
+    count, total_amount, balance_due, amount_paid = delta
+    lookup = _lookup(key)
+    changes = {
+        'invoice_count': F('invoice_count') + count,
+        'total_amount': F('total_amount') + total_amount,
+        'balance_due': F('balance_due') + balance_due,
+        'amount_paid': F('amount_paid') + amount_paid,
+        'updated_at': timezone.now(),
+    }
+    # Atomic in-place increment; only the first write to a bucket inserts
+    if RevenueRollup.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            RevenueRollup.objects.create(
+                invoice_count=count,
+                total_amount=total_amount,
+                balance_due=balance_due,
+                amount_paid=amount_paid,
+                **lookup
+            )
+    except IntegrityError:
+        # A concurrent writer created the bucket first
+        RevenueRollup.objects.filter(**lookup).update(**changes)
+
+def expected_rollup_rows(invoice_model=Invoice):
+    """Rollup rows recomputed from the invoice table (one grouped query)"""
+    rows = invoice_model.objects.order_by().annotate(
+        month=TruncMonth('invoice_date')
+    ).values('month', 'is_migrated', 'status').annotate(
+        invoice_count=Count('id'),
+        total_amount=Sum('total_amount'),
+        balance_due=Sum('balance_due'),
+        amount_paid=Sum('amount_paid'),
+    )
+    for row in rows.iterator():
+        month = _as_date(row['month'])
+        yield {
+            'financial_year': get_financial_year(month),
+            'month': month,
+            'is_migrated': row['is_migrated'],
+            'status': row['status'],
+            'invoice_count': row['invoice_count'],
+            'total_amount': Decimal(row['total_amount'] or 0).quantize(CENT),
+            'balance_due': Decimal(row['balance_due'] or 0).quantize(CENT),
+            'amount_paid': Decimal(row['amount_paid'] or 0).quantize(CENT),
+        }
+
+def rebuild_rollup(invoice_model=Invoice, rollup_model=RevenueRollup):
+    """Throw the rollup away and rebuild it from the invoice table"""
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        rows = [rollup_model(**row) for row in expected_rollup_rows(invoice_model)]
+        rollup_model.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+def _row_values(row):
+    return (
+        row['invoice_count'],
+        Decimal(row['total_amount']).quantize(CENT),
+        Decimal(row['balance_due']).quantize(CENT),
+        Decimal(row['amount_paid']).quantize(CENT),
+    )
+
+def check_rollup_consistency():
+    """Return [(key, expected, stored)] for every bucket that disagrees with the invoices"""
+    empty = (0, Decimal('0.00'), Decimal('0.00'), Decimal('0.00'))
+    expected = {
+        (row['financial_year'], row['month'], row['is_migrated'], row['status']): _row_values(row)
+        for row in expected_rollup_rows()
+    }
+    stored = {
+        (row['financial_year'], row['month'], row['is_migrated'], row['status']): _row_values(row)
+        for row in RevenueRollup.objects.values(
+            'financial_year', 'month', 'is_migrated', 'status',
+            'invoice_count', 'total_amount', 'balance_due', 'amount_paid'
+        )
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        if expected.get(key, empty) != stored.get(key, empty):
+            mismatches.append((key, expected.get(key, empty), stored.get(key, empty)))
+    return mismatches
@@ -0,0 +1,334 @@
+# FD/sample_data.py - SEEDED SYNTHETIC CUSTOMERS / WORK ORDERS / INVOICES / PAYMENTS
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from .caching import bump_data_version
+from .cost_stats import rebuild_cost_statistics
+from .gstin import gstin_check_digit
+from .models import (
+    Customer, WorkOrder, Invoice, Payment, ProjectCategory, RevenueRollup, MonthlySnapshot,
+    get_financial_year,
+)
+from .rollups import rebuild_rollup
+from .search import rebuild_search_index
+from .sequences import (
+    INVOICE_FIRST_NUMBER, INVOICE_SEQUENCE, WORK_ORDER_SEQUENCE,
+    format_invoice_number, format_work_order_number, set_sequence,
+)
+
+CENT = Decimal('0.01')
+BATCH_SIZE = 2000
+
+# Shape of the generated data, per invoice
+CUSTOMERS_PER_INVOICE = 0.05
+WORK_ORDERS_PER_INVOICE = 1.5   # not every work order reaches an invoice
+
+# (state, GST state code, weight) - most customers are in Gujarat (CGST + SGST)
+STATES = [
+    ('Gujarat', '24', 60), ('Maharashtra', '27', 12), ('Karnataka', '29', 8),
+    ('Delhi', '07', 6), ('Rajasthan', '08', 5), ('Tamil Nadu', '33', 5), ('Telangana', '36', 4),
+]
+CITIES = {
+    'Gujarat': ['Ahmedabad', 'Surat', 'Vadodara', 'Rajkot', 'Gandhinagar'],
+    'Maharashtra': ['Mumbai', 'Pune', 'Nagpur'],
+    'Karnataka': ['Bengaluru', 'Mysuru'],
+    'Delhi': ['New Delhi'],
+    'Rajasthan': ['Jaipur', 'Udaipur'],
+    'Tamil Nadu': ['Chennai', 'Coimbatore'],
+    'Telangana': ['Hyderabad'],
+}
+NAME_PARTS = ['Shree', 'Om', 'Sai', 'Krishna', 'Ganesh', 'Apex', 'Nova', 'Vertex', 'Pragati', 'Samarth',
+              'Navkar', 'Arihant', 'Trident', 'Zenith', 'Sunrise', 'Bluechip', 'Matrix', 'Orbit']
+NAME_TRADES = ['Infotech', 'Textiles', 'Enterprises', 'Logistics', 'Pharma', 'Exports', 'Foods',
+               'Engineering', 'Ceramics', 'Chemicals', 'Motors', 'Retail', 'Diamonds', 'Plastics']
+NAME_SUFFIXES = ['Pvt Ltd', 'LLP', 'Ltd', '& Co', 'Industries']
+FIRST_NAMES = ['Amit', 'Priya', 'Rahul', 'Neha', 'Vikram', 'Kavita', 'Rohan', 'Anjali', 'Hardik',
+               'Pooja', 'Nirav', 'Sneha', 'Kunal', 'Meera', 'Jignesh', 'Riya', 'Sanjay', 'Divya']
+LAST_NAMES = ['Patel', 'Shah', 'Mehta', 'Desai', 'Joshi', 'Sharma', 'Iyer', 'Reddy', 'Gupta',
+              'Trivedi', 'Nair', 'Kulkarni', 'Chauhan', 'Parikh']
+PROJECTS = ['Website Redesign', 'E-commerce Store', 'Mobile App', 'ERP Integration', 'SEO Campaign',
+            'Brand Identity', 'CRM Setup', 'Cloud Migration', 'Payment Gateway', 'Inventory Portal',
+            'Social Media Management', 'Annual Maintenance', 'Data Dashboard', 'Landing Pages']
+CATEGORIES = ['Web Development', 'Mobile Apps', 'Digital Marketing', 'Design', 'Maintenance']
+
+# Work order status once it has had time to progress, and the share of each that is invoiced
+WORK_ORDER_STATUSES = [('completed', 70), ('confirmed', 10), ('in_progress', 8), ('draft', 7), ('cancelled', 5)]
+INVOICED_SHARE = {'completed': 0.9, 'confirmed': 0.3}
+PAYMENT_METHODS = ['bank_transfer', 'upi', 'cheque', 'credit_card', 'cash']
+
+def parse_scale(value):
+    """'10k', '1m' or a plain number -> invoice count"""
+    value = str(value).strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    number = value[:-1] if multiplier > 1 else value
+    try:
+        scale = int(float(number) * multiplier)
+    except ValueError:
+        raise ValueError(f"Invalid scale '{value}'. Use a number such as 5000, 10k or 1m.")
+    if scale < 1:
+        raise ValueError("Scale must be at least 1 invoice.")
+    return scale
+
+def make_gstin(rng, state_code, serial):
+    """Valid GSTIN whose PAN digits encode serial, so every generated number is unique"""
+    letters = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(3))
+    # Fourth PAN letter 'C' = company; serial spread across the 4 digits and last letter
+    block, digits = divmod(serial, 10000)
+    pan = f"{letters}C{'ABCDEFGHIJKLMNOPQRSTUVWXYZ'[block // 26 % 26]}{digits:04d}{'ABCDEFGHIJKLMNOPQRSTUVWXYZ'[block % 26]}"
+    first14 = f"{state_code}{pan}1Z"
+    return first14 + gstin_check_digit(first14)
+
+def make_mobile(rng):
+    return f"{rng.choice('6789')}{rng.randrange(10 ** 9):09d}"
+
+def weighted(rng, choices):
+    return rng.choices([choice[0] for choice in choices], weights=[choice[-1] for choice in choices])[0]
+
+def money(value):
+    return Decimal(value).quantize(CENT)
+
+def spread(start, end, count):
+    """count sorted datetimes across [start, end), one per equal slice, in one pass"""
+    step = (end - start) / max(count, 1)
+    return (start + step * index for index in range(count))
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we set"""
+    fields = [field for model in models for field in model._meta.fields if getattr(field, 'auto_now_add', False) or getattr(field, 'auto_now', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+class SampleDataGenerator:
+    """
+    Streams customers, work orders, invoices and payments into the database
+    in BATCH_SIZE bulk inserts. Primary keys are assigned here so related
+    rows can be built without reading anything back (works on MySQL too).
+    """
+
+    def __init__(self, invoices, seed=42, years=3, stdout=None):
+        self.rng = random.Random(seed)
+        self.invoice_target = invoices
+        self.customer_count = max(int(invoices * CUSTOMERS_PER_INVOICE), 1)
+        self.work_order_count = max(int(invoices * WORK_ORDERS_PER_INVOICE), 1)
+        self.now = timezone.now()
+        self.today = timezone.localdate()
+        self.start = self.now - timedelta(days=365 * years)
+        self.stdout = stdout
+        self.counts = {'customers': 0, 'work_orders': 0, 'invoices': 0, 'payments': 0}
+
+    def log(self, message):
+        if self.stdout:
+            self.stdout.write(message)
+
+    def next_ids(self):
+        return {
+            model: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+            for model in (Customer, WorkOrder, Invoice, Payment)
+        }
+
+    def run(self):
+        if Customer.objects.exists() or WorkOrder.objects.exists() or Invoice.objects.exists():
+            raise ValueError("The database already has customers, work orders or invoices; generate into an empty database.")
+        self.ids = self.next_ids()
+        self.categories = self.ensure_categories()
+        with explicit_timestamps(Customer, WorkOrder, Invoice, Payment):
+            self.customers = self.create_customers()
+            self.create_work_orders()
+        self.refresh_derived()
+        return self.counts
+
+    def ensure_categories(self):
+        categories = []
+        for name in CATEGORIES:
+            category, _ = ProjectCategory.objects.get_or_create(name=name)
+            categories.append(category.pk)
+        return categories
+
+    def create_customers(self):
+        """Returns (pk, created_at, state) for every customer, oldest first"""
+        customers, batch = [], []
+        for serial, created_at in enumerate(spread(self.start, self.now, self.customer_count)):
+            state, code, _ = self.rng.choices(STATES, weights=[state[2] for state in STATES])[0]
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            company = f"{self.rng.choice(NAME_PARTS)} {self.rng.choice(NAME_TRADES)} {self.rng.choice(NAME_SUFFIXES)}"
+            pk = self.ids[Customer] + serial
+            batch.append(Customer(
+                pk=pk,
+                company_name=company,
+                contact_name=f"{first} {last}",
+                mobile_number=make_mobile(self.rng),
+                email=f"{first.lower()}.{last.lower()}{serial}@example.com",
+                gst_number=make_gstin(self.rng, code, serial),
+                address=f"{self.rng.randint(1, 999)}, {self.rng.choice(LAST_NAMES)} Complex, {self.rng.choice(CITIES[state])}, {state}",
+                branch_location=self.rng.choice(CITIES[state]),
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+            customers.append((pk, created_at, state))
+            if len(batch) >= BATCH_SIZE:
+                self.flush(Customer, batch, 'customers')
+        self.flush(Customer, batch, 'customers')
+        return customers
+
+    def create_work_orders(self):
+        work_orders, invoices, payments = [], [], []
+        wo_sequences, invoice_sequences = {}, {}
+        invoice_pk, payment_pk = self.ids[Invoice], self.ids[Payment]
+        customer_times = [customer[1] for customer in self.customers]
+        created_customers = 0
+
+        for index, created_at in enumerate(spread(self.start, self.now, self.work_order_count)):
+            # Only customers that already exist can place an order
+            while created_customers < len(customer_times) and customer_times[created_customers] <= created_at:
+                created_customers += 1
+            customer_pk, _, state = self.customers[self.rng.randrange(max(created_customers, 1))]
+
+            age = (self.now - created_at).days
+            status = weighted(self.rng, WORK_ORDER_STATUSES) if age > 45 else self.rng.choice(['draft', 'confirmed', 'in_progress', 'completed'])
+            year = timezone.localtime(created_at).year
+            wo_sequences[year] = wo_sequences.get(year, 0) + 1
+
+            base = money(self.rng.lognormvariate(10.8, 0.9))  # median around ₹50k
+            discount = Decimal(self.rng.choice([0, 0, 0, 5, 10]))
+            work_order = WorkOrder(
+                pk=self.ids[WorkOrder] + index,
+                work_order_number=format_work_order_number(year, wo_sequences[year]),
+                customer_id=customer_pk,
+                category_id=self.rng.choice(self.categories),
+                project_title=self.rng.choice(PROJECTS),
+                project_description='Generated sample project',
+                base_amount=base,
+                gst_percentage=Decimal('18.00'),
+                discount=discount,
+                place_of_supply=state,
+                start_date=timezone.localtime(created_at).date(),
+                end_date=timezone.localtime(created_at).date() + timedelta(days=self.rng.randint(7, 90)),
+                status=status,
+                terms_and_conditions='Standard terms apply.',
+                created_by='sample-data',
+                created_at=created_at,
+                updated_at=created_at,
+            )
+            work_order.calculate_financials()
+            for field in ('discount_amount', 'gst_amount', 'total_cost'):
+                setattr(work_order, field, money(getattr(work_order, field)))
+            work_orders.append(work_order)
+
+            if self.rng.random() < INVOICED_SHARE.get(status, 0):
+                invoice_date = timezone.localtime(created_at).date() + timedelta(days=self.rng.randint(1, 20))
+                if invoice_date <= self.today:
+                    fy = get_financial_year(invoice_date)
+                    invoice_sequences[fy] = invoice_sequences.get(fy, INVOICE_FIRST_NUMBER - 1) + 1
+                    invoice = self.build_invoice(invoice_pk, work_order, invoice_date, invoice_sequences[fy])
+                    new_payments = self.build_payments(payment_pk, invoice)
+                    payments.extend(new_payments)
+                    invoices.append(invoice)
+                    invoice_pk += 1
+                    payment_pk += len(new_payments)
+
+            if len(work_orders) >= BATCH_SIZE:
+                self.flush_orders(work_orders, invoices, payments)
+        self.flush_orders(work_orders, invoices, payments)
+        self.sequences = {(WORK_ORDER_SEQUENCE, str(year)): last for year, last in wo_sequences.items()}
+        self.sequences.update({(INVOICE_SEQUENCE, fy): last for fy, last in invoice_sequences.items()})
+
+    def build_invoice(self, pk, work_order, invoice_date, sequence):
+        invoice = Invoice(
+            pk=pk,
+            invoice_number=format_invoice_number(get_financial_year(invoice_date), sequence),
+            work_order_id=work_order.pk,
+            customer_id=work_order.customer_id,
+            invoice_date=invoice_date,
+            due_date=invoice_date + timedelta(days=30),
+            base_amount=work_order.base_amount,
+            gst_percentage=work_order.gst_percentage,
+            gst_amount=work_order.gst_amount,
+            subtotal=work_order.base_amount - work_order.discount_amount,
+            total_amount=work_order.total_cost,
+            place_of_supply=work_order.place_of_supply,
+            terms_and_conditions=work_order.terms_and_conditions,
+            status='sent',
+        )
+        invoice.calculate_gst_breakup()
+        for field in ('cgst_amount', 'sgst_amount', 'igst_amount'):
+            setattr(invoice, field, money(getattr(invoice, field)))
+        created = timezone.make_aware(datetime.combine(invoice_date, time(10)))
+        invoice.created_at = invoice.updated_at = min(created, self.now)
+        return invoice
+
+    def build_payments(self, first_pk, invoice):
+        """0-2 completed payments; sets amount_paid, balance_due and status on the invoice"""
+        latest = min(self.today, invoice.due_date + timedelta(days=45))
+        days_open = (latest - invoice.invoice_date).days
+        outcome = self.rng.random()
+        if days_open <= 0 or outcome < 0.2:
+            amounts = []
+        elif outcome < 0.35:
+            amounts = [money(invoice.total_amount * Decimal(self.rng.choice(['0.3', '0.5'])))]
+        elif outcome < 0.5:
+            first = money(invoice.total_amount / 2)
+            amounts = [first, invoice.total_amount - first]
+        else:
+            amounts = [invoice.total_amount]
+
+        payments = []
+        for offset, amount in enumerate(amounts):
+            payment_date = invoice.invoice_date + timedelta(days=self.rng.randint(0, max(days_open, 0)))
+            payments.append(Payment(
+                pk=first_pk + offset,
+                invoice_id=invoice.pk,
+                payment_date=payment_date,
+                amount=amount,
+                payment_method=self.rng.choice(PAYMENT_METHODS),
+                reference_number=f"REF{invoice.pk:08d}{offset}",
+                status='completed',
+                created_at=timezone.make_aware(datetime.combine(payment_date, time(15))),
+            ))
+
+        invoice.amount_paid = sum(amounts, Decimal('0.00'))
+        invoice.balance_due = invoice.total_amount - invoice.amount_paid
+        if invoice.balance_due == 0:
+            invoice.status = 'paid'
+        elif invoice.amount_paid > 0:
+            invoice.status = 'partially_paid'
+        elif invoice.due_date < self.today:
+            invoice.status = 'overdue'
+        return payments
+
+    def flush(self, model, batch, counter):
+        if batch:
+            model.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+            self.counts[counter] += len(batch)
+            batch.clear()
+
+    def flush_orders(self, work_orders, invoices, payments):
+        with transaction.atomic():
+            self.flush(WorkOrder, work_orders, 'work_orders')
+            self.flush(Invoice, invoices, 'invoices')
+            self.flush(Payment, payments, 'payments')
+        self.log(f"  {self.counts['work_orders']:,} work orders, {self.counts['invoices']:,} invoices, {self.counts['payments']:,} payments")
+
+    def refresh_derived(self):
+        """bulk_create skips save() and signals, so rebuild what they would have maintained"""
+        for (name, period), last_value in self.sequences.items():
+            set_sequence(name, period, last_value)
+        rebuild_rollup(Invoice, RevenueRollup)
+        rebuild_cost_statistics()
+        rebuild_search_index()
+        # Months frozen before the data existed would be wrong; they refreeze on demand
+        MonthlySnapshot.objects.all().delete()
+        bump_data_version()
+
+def generate_sample_data(invoices, seed=42, years=3, stdout=None):
+    return SampleDataGenerator(invoices, seed=seed, years=years, stdout=stdout).run()
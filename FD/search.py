@@ -0,0 +1,235 @@
+# FD/search.py - FULL-TEXT SEARCH INDEX OVER CUSTOMERS, WORK ORDERS AND INVOICES
+import re
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import Customer, WorkOrder, Invoice, SearchDocument
+
+SEARCH_LIMIT = 500            # ranked ids returned per search (fits any IN (...) limit); filtering has no limit
+FTS_TABLE = 'fd_search_fts'   # SQLite FTS5 index over fd_search_document.content
+MYSQL_MIN_TOKEN = 3           # innodb_ft_min_token_size default
+
+# kind -> (model, fields joined into the searchable text)
+DOCUMENT_FIELDS = {
+    'customer': (Customer, ['company_name', 'contact_name', 'gst_number']),
+    'work_order': (WorkOrder, ['work_order_number', 'project_title', 'customer__company_name']),
+    'invoice': (Invoice, ['invoice_number', 'work_order__project_title', 'customer__company_name']),
+}
+KIND_BY_MODEL = {model: kind for kind, (model, _) in DOCUMENT_FIELDS.items()}
+
+# Identifier-like queries (a digit, no spaces) also match inside these columns
+IDENTIFIER_FIELDS = {'customer': 'gst_number', 'work_order': 'work_order_number', 'invoice': 'invoice_number'}
+IDENTIFIER = re.compile(r'^(?=.*\d)[\w/-]+$')
+IDENTIFIER_MIN_LENGTH = 3
+
+# SQLite: external-content FTS5 table kept in step by triggers on fd_search_document
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"content, content='fd_search_document', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS fd_search_document_ai AFTER INSERT ON fd_search_document BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END",
+    f"CREATE TRIGGER IF NOT EXISTS fd_search_document_ad AFTER DELETE ON fd_search_document BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); END",
+    f"CREATE TRIGGER IF NOT EXISTS fd_search_document_au AFTER UPDATE ON fd_search_document BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); "
+    f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS fd_search_document_ai",
+    "DROP TRIGGER IF EXISTS fd_search_document_ad",
+    "DROP TRIGGER IF EXISTS fd_search_document_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+MYSQL_FTS_SQL = ["ALTER TABLE fd_search_document ADD FULLTEXT INDEX fd_search_content_ft (content)"]
+MYSQL_DROP_SQL = ["ALTER TABLE fd_search_document DROP INDEX fd_search_content_ft"]
+
+def create_fulltext_index(schema_editor):
+    """Migration helper: FTS5 table + triggers on SQLite, FULLTEXT index on MySQL"""
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_FTS_SQL, 'mysql': MYSQL_FTS_SQL}.get(vendor, [])
+    try:
+        for sql in statements:
+            schema_editor.execute(sql)
+    except DatabaseError:
+        # SQLite built without FTS5: search falls back to LIKE on the document table
+        if vendor != 'sqlite':
+            raise
+
+def drop_fulltext_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {'sqlite': SQLITE_DROP_SQL, 'mysql': MYSQL_DROP_SQL}.get(vendor, []):
+        schema_editor.execute(sql)
+
+def _fts5_ready():
+    """Whether this database has the FTS5 table (checked once per database)"""
+    name = connection.settings_dict['NAME']
+    if name not in _fts5_ready.checked:
+        _fts5_ready.checked[name] = FTS_TABLE in connection.introspection.table_names()
+    return _fts5_ready.checked[name]
+_fts5_ready.checked = {}
+
+def tokenize(query):
+    return [token.lower() for token in re.findall(r'\w+', query or '')]
+
+# --- Index maintenance ---------------------------------------------------
+
+def document_rows(model, fields, pks=None):
+    """(object_id, content) for rows of model; works with historical models in migrations"""
+    queryset = model.objects.order_by()
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    for row in queryset.values_list('pk', *fields).iterator(chunk_size=2000):
+        yield row[0], ' '.join(str(value) for value in row[1:] if value)
+
+def index_documents(kind, rows, document_model=SearchDocument):
+    """Insert or update the documents for (object_id, content) rows of one kind"""
+    rows = dict(rows)
+    if not rows:
+        return
+    existing = {
+        document.object_id: document
+        for document in document_model.objects.filter(kind=kind, object_id__in=list(rows))
+    }
+    changed, created = [], []
+    for object_id, content in rows.items():
+        document = existing.get(object_id)
+        if document is None:
+            created.append(document_model(kind=kind, object_id=object_id, content=content))
+        elif document.content != content:
+            document.content = content
+            changed.append(document)
+    document_model.objects.bulk_create(created, batch_size=500)
+    document_model.objects.bulk_update(changed, ['content'], batch_size=500)
+
+def reindex(instance):
+    """Refresh the document of a saved customer/work order/invoice and of rows that quote it"""
+    kind = KIND_BY_MODEL[type(instance)]
+    model, fields = DOCUMENT_FIELDS[kind]
+    index_documents(kind, document_rows(model, fields, [instance.pk]))
+    # Company names and project titles are copied into other documents
+    if kind == 'customer':
+        for related_kind in ('work_order', 'invoice'):
+            related_model, related_fields = DOCUMENT_FIELDS[related_kind]
+            pks = list(related_model.objects.filter(customer_id=instance.pk).values_list('pk', flat=True))
+            index_documents(related_kind, document_rows(related_model, related_fields, pks))
+    elif kind == 'work_order':
+        invoice_pks = list(Invoice.objects.filter(work_order_id=instance.pk).values_list('pk', flat=True))
+        index_documents('invoice', document_rows(Invoice, DOCUMENT_FIELDS['invoice'][1], invoice_pks))
+
+def remove(instance):
+    SearchDocument.objects.filter(kind=KIND_BY_MODEL[type(instance)], object_id=instance.pk).delete()
+
+def rebuild_search_index(models=None, document_model=SearchDocument):
+    """Recreate every document; models maps kind -> model (historical models in migrations)"""
+    document_model.objects.all().delete()
+    count = 0
+    for kind, (model, fields) in DOCUMENT_FIELDS.items():
+        model = (models or {}).get(kind, model)
+        batch = []
+        for object_id, content in document_rows(model, fields):
+            batch.append(document_model(kind=kind, object_id=object_id, content=content))
+            if len(batch) >= 2000:
+                document_model.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        document_model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+# --- Querying ------------------------------------------------------------
+
+def _fts5_query(terms):
+    # Every term must match; the last one also as a prefix (search-as-you-type)
+    match = ' AND '.join(f'"{term}"' for term in terms[:-1])
+    return f'{match} AND "{terms[-1]}"*' if match else f'"{terms[-1]}"*'
+
+def _boolean_query(terms):
+    return ' '.join(f'+{term}*' for term in terms)
+
+def _like_documents(kind, terms):
+    condition = Q()
+    for term in terms:
+        condition &= Q(content__icontains=term)
+    return SearchDocument.objects.filter(condition, kind=kind)
+
+def _sqlite_search(kind, terms, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT d.object_id FROM {FTS_TABLE} JOIN fd_search_document d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND d.kind = %s ORDER BY bm25({FTS_TABLE}) LIMIT %s",
+            [_fts5_query(terms), kind, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+def _mysql_search(kind, terms, limit):
+    boolean_query = _boolean_query(terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT object_id FROM fd_search_document "
+            "WHERE kind = %s AND MATCH(content) AGAINST (%s IN BOOLEAN MODE) "
+            "ORDER BY MATCH(content) AGAINST (%s IN BOOLEAN MODE) DESC LIMIT %s",
+            [kind, boolean_query, boolean_query, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+def _like_search(kind, terms, limit):
+    documents = _like_documents(kind, terms).order_by('-updated_at')
+    return list(documents.values_list('object_id', flat=True)[:limit])
+
+def _use_mysql_fulltext(terms):
+    return connection.vendor == 'mysql' and all(len(term) >= MYSQL_MIN_TOKEN for term in terms)
+
+def search_ids(kind, query, limit=SEARCH_LIMIT):
+    """
+    Ids of kind ('customer', 'work_order' or 'invoice') matching every word
+    of query, best match first, at most limit of them (for ranking; filter
+    with search_filter). None when the query has no words.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    if connection.vendor == 'sqlite' and _fts5_ready():
+        return _sqlite_search(kind, terms, limit)
+    if _use_mysql_fulltext(terms):
+        return _mysql_search(kind, terms, limit)
+    return _like_search(kind, terms, limit)
+
+def identifier_lookup(kind, query):
+    """
+    Q for a query that looks like (part of) a GSTIN or document number,
+    matched anywhere in that column as the list search used to; word
+    search only matches from the start of each word. None otherwise.
+    """
+    query = (query or '').strip()
+    if len(query) < IDENTIFIER_MIN_LENGTH or not IDENTIFIER.match(query):
+        return None
+    return Q(**{f'{IDENTIFIER_FIELDS[kind]}__icontains': query})
+
+def search_filter(kind, query):
+    """
+    Q for every row of kind matching every word of query, however many
+    there are: a subquery on the same index search_ids ranks from, plus
+    identifier_lookup(). None when the query has no words.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    if connection.vendor == 'sqlite' and _fts5_ready():
+        # The FTS match runs once, as an IN list; written as a join, SQLite
+        # drives from the document index and re-runs MATCH for every document
+        matches = RawSQL(
+            f"SELECT object_id FROM fd_search_document WHERE kind = %s "
+            f"AND id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+            [kind, _fts5_query(terms)],
+        )
+    elif _use_mysql_fulltext(terms):
+        matches = RawSQL(
+            "SELECT object_id FROM fd_search_document WHERE kind = %s AND MATCH(content) AGAINST (%s IN BOOLEAN MODE)",
+            [kind, _boolean_query(terms)],
+        )
+    else:
+        matches = _like_documents(kind, terms).values('object_id')
+    condition = Q(pk__in=matches)
+    identifier = identifier_lookup(kind, query)
+    return condition | identifier if identifier is not None else condition
@@ -0,0 +1,141 @@
+# FD/sequences.py - ATOMIC PER-PERIOD COUNTERS FOR DOCUMENT NUMBERS
+import re
+from datetime import datetime
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Invoice, NumberSequence, WorkOrder, get_financial_year
+
+WORK_ORDER_SEQUENCE = 'work_order'
+WORK_ORDER_BLOCK = 9999  # FDWO-YY-0001..9999, then FDWO1-YY-0001 onwards
+WORK_ORDER_NUMBER = re.compile(r'^FDWO(?P<block>1?)-\d{2}-(?P<sequence>\d{4,})$')
+INVOICE_SEQUENCE = 'invoice'
+INVOICE_FIRST_NUMBER = 13  # numbering continues from the previous system
+
+def _advance(name, period, count):
+    """
+    Add count to the counter in one indexed statement and return the new
+    value, or None when the row does not exist yet. The UPDATE takes the
+    row lock, so concurrent callers queue here instead of colliding.
+    """
+    quote = connection.ops.quote_name
+    table, value = quote(NumberSequence._meta.db_table), quote('last_value')
+    where = f"{quote('name')} = %s AND {quote('period')} = %s"
+    params = [count, name, period]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            # LAST_INSERT_ID(expr) comes back in the UPDATE's own OK packet
+            cursor.execute(f"UPDATE {table} SET {value} = LAST_INSERT_ID({value} + %s) WHERE {where}", params)
+            return cursor.lastrowid if cursor.rowcount else None
+        if connection.features.can_return_columns_from_insert:
+            cursor.execute(f"UPDATE {table} SET {value} = {value} + %s WHERE {where} RETURNING {value}", params)
+            row = cursor.fetchone()
+            return row[0] if row else None
+    # No RETURNING: read back under the lock the UPDATE took
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"UPDATE {table} SET {value} = {value} + %s WHERE {where}", params)
+        if not cursor.rowcount:
+            return None
+        cursor.execute(f"SELECT {value} FROM {table} WHERE {where}", params[1:])
+        return cursor.fetchone()[0]
+
+def allocate(name, period, count=1, seed=None):
+    """
+    Reserve count consecutive numbers and return the first one.
+
+    Runs in the caller's transaction: the numbers are released again if it
+    rolls back, and the row stays locked until it ends. seed() gives the
+    last number already used when the period's row is first created.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    last = _advance(name, period, count)
+    if last is None:
+        try:
+            with transaction.atomic():
+                NumberSequence.objects.create(name=name, period=period, last_value=seed() if seed else 0)
+        except IntegrityError:
+            pass  # Created by a concurrent writer; its row is just as good
+        last = _advance(name, period, count)
+    return last - count + 1
+
+def set_sequence(name, period, last_value):
+    """Move a counter forward to at least last_value (after bulk inserts that bypass allocate)"""
+    sequence, created = NumberSequence.objects.get_or_create(name=name, period=period, defaults={'last_value': last_value})
+    if not created and sequence.last_value < last_value:
+        NumberSequence.objects.filter(pk=sequence.pk, last_value__lt=last_value).update(last_value=last_value)
+
+def format_work_order_number(year, sequence):
+    """FDWO-YY-NNNN for the first 9999 of a year, FDWO1-YY-NNNN after that"""
+    year_suffix = str(year)[-2:]
+    if sequence > WORK_ORDER_BLOCK:
+        return f"FDWO1-{year_suffix}-{sequence - WORK_ORDER_BLOCK:04d}"
+    return f"FDWO-{year_suffix}-{sequence:04d}"
+
+def parse_work_order_number(number):
+    """Sequence position of an FDWO/FDWO1 number, or None for anything else"""
+    match = WORK_ORDER_NUMBER.match(number or '')
+    if not match:
+        return None
+    return int(match.group('sequence')) + (WORK_ORDER_BLOCK if match.group('block') else 0)
+
+def _work_order_seed(year):
+    """Highest sequence already used in year; only read when the year's counter is created"""
+    year_suffix = str(year)[-2:]
+    numbers = WorkOrder.objects.filter(
+        Q(work_order_number__startswith=f'FDWO-{year_suffix}-') | Q(work_order_number__startswith=f'FDWO1-{year_suffix}-')
+    ).values_list('work_order_number', flat=True)
+    return max(filter(None, map(parse_work_order_number, numbers.iterator())), default=0)
+
+def reserve_work_order_numbers(count=1, year=None):
+    """count consecutive work order numbers for year (default: this year)"""
+    year = year or timezone.localdate().year
+    first = allocate(WORK_ORDER_SEQUENCE, str(year), count, seed=lambda: _work_order_seed(year))
+    return [format_work_order_number(year, sequence) for sequence in range(first, first + count)]
+
+def next_work_order_number(year=None):
+    return reserve_work_order_numbers(1, year)[0]
+
+def invoice_prefix(financial_year):
+    """'2025-2026' -> 'FD252/I/' (two digits of the start year, tens digit of the end year)"""
+    start_year, end_year = financial_year.split('-')
+    return f"FD{start_year[-2:]}{end_year[-2]}/I/"
+
+def format_invoice_number(financial_year, sequence):
+    return f"{invoice_prefix(financial_year)}{sequence:04d}"
+
+def _invoice_seed(financial_year):
+    """Highest number already issued in the financial year; only read when its counter is created"""
+    prefix = invoice_prefix(financial_year)
+    numbers = Invoice.objects.filter(invoice_number__startswith=prefix).values_list('invoice_number', flat=True)
+    issued = (int(number[len(prefix):]) for number in numbers.iterator() if number[len(prefix):].isdigit())
+    return max(issued, default=INVOICE_FIRST_NUMBER - 1)
+
+def reserve_invoice_numbers(count=1, day=None):
+    """
+    count contiguous invoice numbers in the financial year containing day.
+
+    Must be called inside the transaction that saves the invoices: the
+    counter row stays locked until it commits, and a rollback hands the
+    numbers back, so the series has no gaps.
+    """
+    if isinstance(day, datetime):
+        day = timezone.localdate(day)  # Invoice.invoice_date defaults to timezone.now
+    financial_year = get_financial_year(day or timezone.localdate())
+    first = allocate(INVOICE_SEQUENCE, financial_year, count, seed=lambda: _invoice_seed(financial_year))
+    return [format_invoice_number(financial_year, sequence) for sequence in range(first, first + count)]
+
+def next_invoice_number(day=None):
+    return reserve_invoice_numbers(1, day)[0]
+
+def assign_invoice_numbers(invoices):
+    """Number unsaved invoices for batch invoicing: one range per financial year, in list order"""
+    by_year = {}
+    for invoice in invoices:
+        if not invoice.invoice_number:
+            by_year.setdefault(get_financial_year(invoice.invoice_date), []).append(invoice)
+    for batch in by_year.values():
+        numbers = reserve_invoice_numbers(len(batch), batch[0].invoice_date)
+        for invoice, number in zip(batch, numbers):
+            invoice.invoice_number = number
+    return invoices
@@ -0,0 +1,78 @@
+# FD/signals.py - KEEP DERIVED DATA (ROLLUPS, SNAPSHOTS, STATISTICS, SEARCH INDEX, CACHE VERSION, RENDERED INVOICES) IN STEP
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .caching import bump_data_version_on_commit
+from .models import Customer, WorkOrder, Invoice, Payment
+from .cost_stats import record_work_order_change
+from .rollups import record_invoice_delete
+from . import gstin, prerender, search, snapshots
+
+def _deleted_directly(origin, model):
+    """True when delete() was called on model itself, not cascaded from a parent"""
+    if isinstance(origin, QuerySet):
+        return origin.model is model
+    return isinstance(origin, model)
+
+@receiver(post_delete, sender=Invoice)
+def invoice_deleted(sender, instance, **kwargs):
+    # Covers single deletes, queryset (bulk) deletes and cascades from customers/work orders
+    record_invoice_delete(instance)
+
+@receiver(post_delete, sender=WorkOrder)
+def work_order_deleted(sender, instance, **kwargs):
+    # A deleted completed project leaves the cost statistics
+    record_work_order_change(instance, None)
+
+@receiver(post_delete, sender=Payment)
+def payment_deleted(sender, instance, origin=None, **kwargs):
+    # When the invoice itself is being deleted there is nothing left to update
+    if _deleted_directly(origin, Payment):
+        instance.update_invoice_payment_status()
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=WorkOrder)
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=Payment)
+def snapshot_row_deleted(sender, instance, **kwargs):
+    # Saves thaw their months in Invoice.save / Payment.save, which know the previous date
+    snapshots.thaw_months(getattr(instance, snapshots.SNAPSHOT_DATES[sender]))
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=WorkOrder)
+@receiver(post_save, sender=Invoice)
+def search_document_saved(sender, instance, raw=False, **kwargs):
+    # raw: loaddata fixtures; run rebuild_search_index afterwards
+    if not raw:
+        search.reindex(instance)
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=WorkOrder)
+@receiver(post_delete, sender=Invoice)
+def search_document_deleted(sender, instance, **kwargs):
+    search.remove(instance)
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=Payment)
+def invoice_render_changed(sender, instance, raw=False, **kwargs):
+    # The PDF and print page are rendered after commit, before anyone asks for them
+    if not raw:
+        prerender.schedule(instance.pk if sender is Invoice else instance.invoice_id)
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def gstin_customer_changed(sender, **kwargs):
+    # This process's lookup cache; others see the change within CUSTOMER_TTL
+    gstin.customer_changed()
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=WorkOrder)
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=WorkOrder)
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=Payment)
+def data_changed(sender, **kwargs):
+    # Shared dashboard/analytics cache entries are keyed by this version
+    bump_data_version_on_commit()
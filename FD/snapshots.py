@@ -0,0 +1,178 @@
+# FD/snapshots.py - FROZEN MONTHLY FIGURES FOR FINANCIAL-YEAR REPORTING
+from datetime import date, datetime, time
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from .jobs import enqueue, report_progress
+from .models import (
+    Customer, WorkOrder, Invoice, Payment, MonthlySnapshot, BackgroundJob,
+    get_financial_year, get_financial_year_start,
+)
+
+AMOUNT_FIELDS = (
+    'invoiced_amount', 'collected_amount', 'outstanding_amount',
+    'cgst_amount', 'sgst_amount', 'igst_amount',
+)
+COUNT_FIELDS = ('invoice_count', 'payment_count', 'work_order_count', 'new_customer_count')
+# Balances keep moving after a month closes (payments arrive later), so the
+# year's figure is always aggregated live, never summed from snapshots
+LIVE_FIELDS = ('outstanding_amount',)
+FROZEN_FIELDS = tuple(field for field in AMOUNT_FIELDS + COUNT_FIELDS if field not in LIVE_FIELDS)
+CENT = Decimal('0.01')
+# The date that puts a row in a month's snapshot
+SNAPSHOT_DATES = {Customer: 'created_at', WorkOrder: 'created_at', Invoice: 'invoice_date', Payment: 'payment_date'}
+FREEZE_JOB = 'freeze_months'
+
+def add_months(month, count):
+    years, index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, index + 1, 1)
+
+def iter_months(first, last):
+    """First days of every month from first to last, inclusive"""
+    month = first.replace(day=1)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+def current_month():
+    return timezone.localdate().replace(day=1)
+
+def last_closed_month():
+    return add_months(current_month(), -1)
+
+def month_of(value):
+    """First day of the (local) month of a date or datetime"""
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value.replace(day=1)
+
+def thaw_months(*days):
+    """
+    Drop the snapshots of the closed months holding any of days (dates or
+    datetimes, None ignored) once the current transaction commits; the next
+    financial_year_summary() reads them live and queues their refreeze.
+    """
+    last_closed = last_closed_month()
+    months = {month for month in map(month_of, filter(None, days)) if month <= last_closed}
+    if months:
+        transaction.on_commit(lambda: MonthlySnapshot.objects.filter(month__in=months).delete())
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+def compute_period(start, end):
+    """
+    Live figures for invoices dated, payments received and records created
+    in [start, end). Four aggregate queries whatever the period length.
+    """
+    figures = Invoice.objects.filter(invoice_date__gte=start, invoice_date__lt=end).aggregate(
+        invoiced_amount=Sum('total_amount'),
+        outstanding_amount=Sum('balance_due'),
+        cgst_amount=Sum('cgst_amount'),
+        sgst_amount=Sum('sgst_amount'),
+        igst_amount=Sum('igst_amount'),
+        invoice_count=Count('id'),
+    )
+    figures.update(Payment.objects.filter(
+        status='completed', payment_date__gte=start, payment_date__lt=end
+    ).aggregate(collected_amount=Sum('amount'), payment_count=Count('id')))
+
+    created = {'created_at__gte': _start_of_day(start), 'created_at__lt': _start_of_day(end)}
+    figures['work_order_count'] = WorkOrder.objects.filter(**created).count()
+    figures['new_customer_count'] = Customer.objects.filter(**created).count()
+
+    for field in AMOUNT_FIELDS:
+        figures[field] = Decimal(figures[field] or 0).quantize(CENT)
+    return figures
+
+def compute_month(month):
+    return compute_period(month, add_months(month, 1))
+
+def build_snapshot(month, figures):
+    return MonthlySnapshot(month=month, financial_year=get_financial_year(month), **figures)
+
+def freeze_month(month):
+    """Snapshot a closed month, or return the existing frozen row"""
+    if month > last_closed_month():
+        raise ValueError(f"{month:%b %Y} has not closed yet")
+    existing = MonthlySnapshot.objects.filter(month=month).first()
+    if existing:
+        return existing
+    try:
+        with transaction.atomic():
+            snapshot = build_snapshot(month, compute_month(month))
+            snapshot.save()
+            return snapshot
+    except IntegrityError:
+        # Frozen concurrently by another request or the backfill command
+        return MonthlySnapshot.objects.get(month=month)
+
+def queue_freeze(months):
+    """Background job freezing closed months that have no snapshot, unless one is already waiting"""
+    if BackgroundJob.objects.filter(kind=FREEZE_JOB, status='pending').exists():
+        return None
+    return enqueue(FREEZE_JOB, params={'months': [month.isoformat() for month in months]},
+                   total=len(months), created_by='snapshots')
+
+def run_freeze_months(job):
+    for value in job.params['months']:
+        freeze_month(date.fromisoformat(value))
+        report_progress(job, 1)
+
+def month_runs(months):
+    """Sorted months as [start, end) periods of consecutive months"""
+    runs = []
+    for month in months:
+        if runs and runs[-1][1] == month:
+            runs[-1][1] = add_months(month, 1)
+        else:
+            runs.append([month, add_months(month, 1)])
+    return runs
+
+def _empty_totals():
+    totals = {field: Decimal('0.00') for field in AMOUNT_FIELDS}
+    totals.update({field: 0 for field in COUNT_FIELDS})
+    return totals
+
+def financial_year_summary(day=None):
+    """
+    Financial-year-to-date figures for the year containing day.
+
+    Closed months come from MonthlySnapshot where frozen; the rest (months
+    not frozen yet or thawed by a change, and the open months) are
+    aggregated live, four queries per run of consecutive months, plus the
+    year's outstanding balance. Nothing is frozen here: missing months are
+    handed to a background job.
+    """
+    day = day or timezone.localdate()
+    start = get_financial_year_start(day)
+    end = add_months(start, 12)
+    open_from = min(max(current_month(), start), end)
+
+    snapshots = MonthlySnapshot.objects.filter(month__gte=start, month__lt=open_from)
+    frozen = {snapshot.month: snapshot for snapshot in snapshots}
+    missing = [month for month in iter_months(start, add_months(open_from, -1)) if month not in frozen]
+    if missing:
+        queue_freeze(missing)
+
+    totals = _empty_totals()
+    for snapshot in frozen.values():
+        for field in FROZEN_FIELDS:
+            totals[field] += getattr(snapshot, field)
+    for period_start, period_end in month_runs(missing + list(iter_months(open_from, add_months(end, -1)))):
+        live = compute_period(period_start, period_end)
+        for field in FROZEN_FIELDS:
+            totals[field] += live[field]
+    outstanding = Invoice.objects.filter(invoice_date__gte=start, invoice_date__lt=end).aggregate(
+        total=Sum('balance_due'))['total']
+    totals['outstanding_amount'] = Decimal(outstanding or 0).quantize(CENT)
+
+    totals.update({
+        'financial_year': get_financial_year(start),
+        'start': start,
+        'end': date(end.year, 3, 31),
+        'gst_collected': totals['cgst_amount'] + totals['sgst_amount'] + totals['igst_amount'],
+        'closed_months': len(frozen) + len(missing),
+    })
+    return totals
@@ -0,0 +1,151 @@
+# FD/statement.py - CUSTOMER STATEMENT OF ACCOUNT, INVOICES AND PAYMENTS MERGED IN DATE ORDER
+import heapq
+import itertools
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+from django.db.models import Q, Sum
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template
+from django.utils import timezone
+from .conditional import ACTIVE_SETTINGS
+from .models import Invoice, Payment
+
+CHUNK_SIZE = 500     # invoices / payments read per query
+ROWS_PER_CHUNK = 200  # statement lines per streamed HTML chunk
+
+# Never billed: neither these invoices nor payments against them appear
+EXCLUDED_STATUSES = ('draft', 'cancelled')
+PAYMENT_METHODS = dict(Payment.PAYMENT_METHODS)
+
+StatementLine = namedtuple('StatementLine', 'date kind reference details debit credit balance')
+
+def parse_period(params):
+    """(start, end) dates from start_date / end_date (YYYY-MM-DD); a missing or invalid bound is open"""
+    bounds = []
+    for name in ('start_date', 'end_date'):
+        try:
+            bounds.append(datetime.strptime(params.get(name) or '', '%Y-%m-%d').date())
+        except ValueError:
+            bounds.append(None)
+    return tuple(bounds)
+
+def billed_invoices(customer_id):
+    return Invoice.objects.filter(customer_id=customer_id).exclude(status__in=EXCLUDED_STATUSES)
+
+def received_payments(customer_id):
+    # Only completed payments count towards amount_paid
+    return Payment.objects.filter(invoice__customer_id=customer_id, status='completed').exclude(
+        invoice__status__in=EXCLUDED_STATUSES
+    )
+
+def iter_by_date(queryset, date_field, fields, chunk_size=CHUNK_SIZE):
+    """
+    (date, pk, *fields) rows of queryset ordered by date then pk, in keyset
+    batches: memory stays flat however many rows there are (as in
+    exports.export_rows) and each batch resumes from an index position.
+    """
+    queryset = queryset.order_by(date_field, 'pk').values_list(date_field, 'pk', *fields)
+    last = None
+    while True:
+        batch = queryset
+        if last is not None:
+            batch = queryset.filter(Q(**{f'{date_field}__gt': last[0]}) | Q(**{date_field: last[0], 'pk__gt': last[1]}))
+        rows = list(batch[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+
+class Statement:
+    """
+    Statement of account of one customer from start to end (either may be
+    None for an open range). Iterating yields StatementLines in date order,
+    invoices before payments on the same day, with the running balance;
+    afterwards debits, credits and closing hold the period totals.
+    """
+
+    def __init__(self, customer, start=None, end=None, chunk_size=CHUNK_SIZE):
+        self.customer = customer
+        self.start = start
+        self.end = end
+        self.chunk_size = chunk_size
+        self.opening = self._opening_balance()
+        self.debits = Decimal('0.00')
+        self.credits = Decimal('0.00')
+        self.count = 0
+        self.generated_at = timezone.now()
+
+    @property
+    def closing(self):
+        return self.opening + self.debits - self.credits
+
+    def _opening_balance(self):
+        if self.start is None:
+            return Decimal('0.00')
+        invoiced = billed_invoices(self.customer.pk).filter(invoice_date__lt=self.start).aggregate(
+            total=Sum('total_amount'))['total'] or Decimal('0.00')
+        paid = received_payments(self.customer.pk).filter(payment_date__lt=self.start).aggregate(
+            total=Sum('amount'))['total'] or Decimal('0.00')
+        # SQLite drops the scale on SUM(); keep money at two places like the fields
+        return (invoiced - paid).quantize(Decimal('0.01'))
+
+    def _in_period(self, queryset, date_field):
+        if self.start:
+            queryset = queryset.filter(**{f'{date_field}__gte': self.start})
+        if self.end:
+            queryset = queryset.filter(**{f'{date_field}__lte': self.end})
+        return queryset
+
+    # Both event streams yield (date, kind order, pk, line fields...): merging
+    # on the tuple orders by date, then invoices first, then pk
+
+    def _invoice_events(self):
+        queryset = self._in_period(billed_invoices(self.customer.pk), 'invoice_date')
+        for day, pk, number, title, due, total in iter_by_date(
+            queryset, 'invoice_date', ['invoice_number', 'work_order__project_title', 'due_date', 'total_amount'],
+            self.chunk_size,
+        ):
+            yield day, 0, pk, 'Invoice', number, f"{title} (due {due:%d %b %Y})", total, None
+
+    def _payment_events(self):
+        queryset = self._in_period(received_payments(self.customer.pk), 'payment_date')
+        for day, pk, invoice_number, method, reference, amount in iter_by_date(
+            queryset, 'payment_date', ['invoice__invoice_number', 'payment_method', 'reference_number', 'amount'],
+            self.chunk_size,
+        ):
+            details = f"{PAYMENT_METHODS.get(method, method)} against {invoice_number}"
+            yield day, 1, pk, 'Payment', reference or '-', details, None, amount
+
+    def __iter__(self):
+        balance = self.opening
+        for day, _, _, kind, reference, details, debit, credit in heapq.merge(self._invoice_events(), self._payment_events()):
+            if debit is not None:
+                balance += debit
+                self.debits += debit
+            if credit is not None:
+                balance -= credit
+                self.credits += credit
+            self.count += 1
+            yield StatementLine(day, kind, reference, details, debit, credit, balance)
+
+def statement_html(statement, request=None):
+    """The statement page in pieces: heading, ROWS_PER_CHUNK lines at a time, then the totals"""
+    context = {'statement': statement, 'customer': statement.customer, 'company_settings': ACTIVE_SETTINGS.first()}
+    yield get_template('FD/statement_start.html').render(context, request)
+    rows = get_template('FD/statement_rows.html')
+    lines = iter(statement)
+    while True:
+        chunk = list(itertools.islice(lines, ROWS_PER_CHUNK))
+        if not chunk:
+            break
+        yield rows.render({'lines': chunk})
+    # Totals are known only now that every line has been read
+    yield get_template('FD/statement_end.html').render(context, request)
+
+def statement_response(statement, request=None):
+    return StreamingHttpResponse(statement_html(statement, request), content_type='text/html; charset=utf-8')
+
+def statement_filename(statement):
+    period = f"{statement.start or 'start'}_{statement.end or timezone.localdate()}"
+    return f"statement_{statement.customer.pk}_{period}.pdf"
@@ -1,3 +1,967 @@
-from django.test import TestCase
+import asyncio
+import os
+import re
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+import numpy
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.db.models import F, Q, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from . import gstin, jobs, pdf_store, prerender
+from .aggregates import invoice_breakdown
+from .bulk_delete import start_bulk_delete
+from .caching import aget_or_compute, get_data_version, get_or_compute
+from .conditional import render_version
+from .cost_stats import BUCKET_COUNT, bucket_for
+from .filters import created_between, filtered_queryset
+from .jobs import run_job
+from .pdf_batch import batch_queryset
+from .models import (
+    Customer, WorkOrder, Invoice, Payment, BackgroundJob, CompanySettings, CostStatistic, MonthlySnapshot,
+    NumberSequence, RevenueRollup, get_financial_year,
+)
+from .projections import CustomerRow, WorkOrderRow, InvoiceRow, project
+from .rollups import check_rollup_consistency
+from .search import SEARCH_LIMIT, rebuild_search_index
+from .sequences import (
+    assign_invoice_numbers, format_work_order_number, invoice_prefix, next_invoice_number,
+    parse_work_order_number, reserve_work_order_numbers,
+)
+from .snapshots import FREEZE_JOB, financial_year_summary, last_closed_month
+from .statement import Statement, billed_invoices
 
-# Create your tests here.
+
+def create_customer(serial):
+    return Customer.objects.create(
+        company_name=f"Test Company {serial}",
+        contact_name="Test Contact",
+        mobile_number="9876543210",
+        email=f"test{serial}@example.com",
+        gst_number=f"24ABCDE{serial:04d}F1Z5",
+        address="Ahmedabad, Gujarat",
+        branch_location="Ahmedabad",
+    )
+
+def create_work_order(customer):
+    return WorkOrder.objects.create(
+        customer=customer,
+        project_title="Website",
+        base_amount=Decimal('1000.00'),
+        terms_and_conditions="Standard terms",
+        created_by="tests",
+        status='confirmed',
+    )
+
+def build_invoice(work_order, invoice_date=None):
+    invoice_date = invoice_date or timezone.localdate()
+    return Invoice(
+        work_order=work_order,
+        customer=work_order.customer,
+        invoice_date=invoice_date,
+        due_date=invoice_date + timedelta(days=30),
+        base_amount=work_order.base_amount,
+        subtotal=work_order.base_amount,
+        gst_amount=work_order.gst_amount,
+        total_amount=work_order.total_cost,
+        balance_due=work_order.total_cost,
+        terms_and_conditions=work_order.terms_and_conditions,
+        status='sent',
+    )
+
+def sequence_numbers(invoices_or_numbers):
+    return sorted(int(str(number).rsplit('/', 1)[1]) for number in invoices_or_numbers)
+
+
+class InvoiceNumberSequenceTests(TestCase):
+    def setUp(self):
+        self.customer = create_customer(1)
+        self.prefix = invoice_prefix(get_financial_year(timezone.localdate()))
+
+    def test_first_invoice_of_financial_year_starts_at_0013(self):
+        invoice = build_invoice(create_work_order(self.customer))
+        invoice.save()
+        self.assertEqual(invoice.invoice_number, f"{self.prefix}0013")
+
+    def test_numbers_are_consecutive(self):
+        numbers = []
+        for _ in range(5):
+            invoice = build_invoice(create_work_order(self.customer))
+            invoice.save()
+            numbers.append(invoice.invoice_number)
+        self.assertEqual(sequence_numbers(numbers), list(range(13, 18)))
+
+    def test_rolled_back_invoice_returns_its_number(self):
+        build_invoice(create_work_order(self.customer)).save()
+        work_order = create_work_order(self.customer)
+        try:
+            with transaction.atomic():
+                build_invoice(work_order).save()
+                raise RuntimeError("conversion failed after the invoice was saved")
+        except RuntimeError:
+            pass
+        invoice = build_invoice(work_order)
+        invoice.save()
+        self.assertEqual(invoice.invoice_number, f"{self.prefix}0014")
+
+    def test_counter_continues_from_existing_numbers(self):
+        legacy = build_invoice(create_work_order(self.customer))
+        legacy.invoice_number = f"{self.prefix}0041"
+        legacy.save()
+        NumberSequence.objects.all().delete()
+
+        invoice = build_invoice(create_work_order(self.customer))
+        invoice.save()
+        self.assertEqual(invoice.invoice_number, f"{self.prefix}0042")
+
+    def test_financial_year_follows_invoice_date(self):
+        invoice = build_invoice(create_work_order(self.customer), invoice_date=date(2024, 3, 31))
+        invoice.save()
+        self.assertEqual(invoice.invoice_number, "FD232/I/0013")
+
+    def test_batch_gets_contiguous_range_per_financial_year(self):
+        invoices = [build_invoice(create_work_order(self.customer)) for _ in range(3)]
+        invoices.append(build_invoice(create_work_order(self.customer), invoice_date=date(2024, 4, 1)))
+        with transaction.atomic():
+            assign_invoice_numbers(invoices)
+            for invoice in invoices:
+                invoice.save()
+        self.assertEqual([invoice.invoice_number for invoice in invoices[:3]], [f"{self.prefix}{n:04d}" for n in (13, 14, 15)])
+        self.assertEqual(invoices[3].invoice_number, "FD242/I/0013")
+        self.assertEqual(next_invoice_number(), f"{self.prefix}0016")
+
+
+class WorkOrderNumberSequenceTests(TestCase):
+    YEAR = 2031  # no work orders are created in it except by these tests
+
+    def setUp(self):
+        self.customer = create_customer(1)
+
+    def create_numbered(self, number):
+        work_order = create_work_order(self.customer)
+        WorkOrder.objects.filter(pk=work_order.pk).update(work_order_number=number)
+
+    def test_counter_is_seeded_from_existing_numbers(self):
+        self.create_numbered("FDWO-31-0041")
+        self.create_numbered("FDWO-31-0007")
+        self.create_numbered("FDWO-30-0500")
+        self.assertEqual(reserve_work_order_numbers(2, self.YEAR), ["FDWO-31-0042", "FDWO-31-0043"])
+
+    def test_seed_includes_the_second_block(self):
+        self.create_numbered("FDWO-31-9999")
+        self.create_numbered("FDWO1-31-0005")
+        self.assertEqual(reserve_work_order_numbers(1, self.YEAR), ["FDWO1-31-0006"])
+
+    def test_9999_rolls_over_to_the_second_block(self):
+        self.create_numbered("FDWO-31-9998")
+        self.assertEqual(
+            reserve_work_order_numbers(3, self.YEAR),
+            ["FDWO-31-9999", "FDWO1-31-0001", "FDWO1-31-0002"],
+        )
+
+    def test_each_year_starts_again_at_0001(self):
+        self.assertEqual(reserve_work_order_numbers(2, self.YEAR), ["FDWO-31-0001", "FDWO-31-0002"])
+        self.assertEqual(reserve_work_order_numbers(1, self.YEAR + 1), ["FDWO-32-0001"])
+        self.assertEqual(reserve_work_order_numbers(1, self.YEAR), ["FDWO-31-0003"])
+
+    def test_format_and_parse_round_trip(self):
+        for sequence in (1, 9999, 10000, 19998, 20000):
+            with self.subTest(sequence):
+                self.assertEqual(parse_work_order_number(format_work_order_number(self.YEAR, sequence)), sequence)
+
+    def test_malformed_numbers_are_not_parsed(self):
+        for number in ("", "FDWO-31-", "FDWO-31-12a4", "FDWO-31-0001-2", "FDWO2-31-0001", "XFDWO-31-0001",
+                       "FDWO-2031-0001", "FDWO-31-001", "INV-31-0001", "FD252/I/0013"):
+            with self.subTest(number):
+                self.assertIsNone(parse_work_order_number(number))
+
+    def test_malformed_numbers_do_not_seed_the_counter(self):
+        self.create_numbered("FDWO-31-0003")
+        self.create_numbered("FDWO-31-0900-old")
+        self.assertEqual(reserve_work_order_numbers(1, self.YEAR), ["FDWO-31-0004"])
+
+
+@override_settings(FD_PRERENDER={'ENABLED': False})
+class InvoiceNumberConcurrencyTests(TransactionTestCase):
+    """Parallel writers on a database connection each; the counter UPDATE serializes them"""
+    WRITERS = 8
+    INVOICES_PER_WRITER = 10
+
+    def test_parallel_writers_get_unique_gapless_numbers(self):
+        work_orders = [
+            [create_work_order(create_customer(writer * 100 + index)) for index in range(self.INVOICES_PER_WRITER)]
+            for writer in range(self.WRITERS)
+        ]
+        numbers, errors = [], []
+        barrier = threading.Barrier(self.WRITERS)
+
+        def writer(orders):
+            try:
+                barrier.wait()
+                for work_order in orders:
+                    invoice = build_invoice(work_order)
+                    invoice.save()
+                    numbers.append(invoice.invoice_number)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer, args=(orders,)) for orders in work_orders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        total = self.WRITERS * self.INVOICES_PER_WRITER
+        self.assertEqual(len(set(numbers)), total)
+        self.assertEqual(sequence_numbers(numbers), list(range(13, 13 + total)))
+
+
+@override_settings(FD_PRERENDER={'ENABLED': False})
+class RevenueRollupTests(TestCase):
+    """The rollup is kept equal to the invoice table by every invoice write"""
+
+    def assertRollupMatchesInvoices(self):
+        self.assertEqual(check_rollup_consistency(), [])
+        breakdown = lambda rows: {
+            (row['is_migrated'], row['status']): (row['invoice_count'], Decimal(row['total_amount']), Decimal(row['balance_due']), Decimal(row['amount_paid']))
+            for row in rows if row['invoice_count']
+        }
+        self.assertEqual(breakdown(invoice_breakdown()), breakdown(invoice_breakdown(Invoice.objects.all())))
+
+    def test_rollup_follows_create_update_status_change_and_delete(self):
+        customer = create_customer(1)
+        invoices = [build_invoice(create_work_order(customer), invoice_date=date(2025, 3, 31)) for _ in range(2)]
+        for invoice in invoices:
+            invoice.save()
+        self.assertRollupMatchesInvoices()
+
+        invoices[0].total_amount += Decimal('100.00')
+        invoices[0].balance_due += Decimal('100.00')
+        invoices[0].invoice_date = date(2025, 4, 1)  # the next financial year
+        invoices[0].save()
+        self.assertRollupMatchesInvoices()
+
+        Payment.objects.create(invoice=invoices[1], amount=Decimal('100.00'), payment_method='cash')
+        self.assertEqual(Invoice.objects.get(pk=invoices[1].pk).status, 'partially_paid')
+        self.assertRollupMatchesInvoices()
+
+        invoices[1].delete()  # still holds the status from before the payment
+        self.assertRollupMatchesInvoices()
+        self.assertEqual(sum(row['invoice_count'] for row in invoice_breakdown()), 1)
+
+    def test_check_reports_drift_until_rebuilt(self):
+        build_invoice(create_work_order(create_customer(1)), invoice_date=date(2025, 3, 31)).save()
+        call_command('rebuild_revenue_rollup', '--check', stdout=StringIO())
+        RevenueRollup.objects.update(total_amount=F('total_amount') + 1)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_revenue_rollup', '--check', stdout=out)
+        self.assertIn('2025-03 new overdue', out.getvalue())
+        call_command('rebuild_revenue_rollup', stdout=StringIO())
+        call_command('rebuild_revenue_rollup', '--check', stdout=StringIO())
+
+
+class CostStatisticsTests(TestCase):
+    """Streaming mean, variance and histogram against numpy over the completed work orders"""
+
+    def assertStatisticsMatch(self, work_orders):
+        stored = WorkOrder.objects.filter(pk__in=[work_order.pk for work_order in work_orders], status='completed')
+        costs = numpy.array([float(cost) for cost in stored.values_list('total_cost', flat=True)])
+        self.assertEqual(len(costs), len(work_orders))
+        stat = CostStatistic.objects.get(scope='all', scope_key='')
+        self.assertEqual(stat.count, len(costs))
+        self.assertAlmostEqual(stat.mean, costs.mean(), places=6)
+        self.assertAlmostEqual(stat.variance, costs.var(ddof=1), delta=costs.var(ddof=1) * 1e-9)
+        histogram = numpy.bincount([bucket_for(cost) for cost in costs], minlength=BUCKET_COUNT)
+        self.assertEqual(stat.histogram, histogram.tolist())
+
+    def test_add_and_remove_match_numpy(self):
+        customer = create_customer(1)
+        work_orders = []
+        for amount in ('950.00', '12500.00', '48000.50', '260000.00', '7300.25', '99999.99', '15.00'):
+            work_order = create_work_order(customer)
+            work_order.base_amount = Decimal(amount)
+            work_order.status = 'completed'
+            work_order.save()
+            work_orders.append(work_order)
+        self.assertStatisticsMatch(work_orders)
+
+        work_orders[1].status = 'in_progress'
+        work_orders[1].save()
+        work_orders[3].delete()
+        work_orders[4].base_amount = Decimal('31000.00')  # an edit replaces the observation
+        work_orders[4].save()
+        self.assertStatisticsMatch([work_orders[index] for index in (0, 2, 4, 5, 6)])
+
+    def test_rebuild_matches_the_incremental_statistics(self):
+        customer = create_customer(1)
+        for amount in ('950.00', '12500.00', '48000.50'):
+            work_order = create_work_order(customer)
+            work_order.base_amount = Decimal(amount)
+            work_order.status = 'completed'
+            work_order.save()
+        fields = ('scope', 'scope_key', 'count', 'histogram')
+        incremental = sorted(CostStatistic.objects.values_list(*fields))
+        means = {(scope, key): mean for scope, key, mean in CostStatistic.objects.values_list('scope', 'scope_key', 'mean')}
+        CostStatistic.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_cost_statistics', stdout=out)
+        self.assertIn(f'{len(incremental)} group(s)', out.getvalue())
+        self.assertEqual(sorted(CostStatistic.objects.values_list(*fields)), incremental)
+        for scope, key, mean in CostStatistic.objects.values_list('scope', 'scope_key', 'mean'):
+            self.assertAlmostEqual(mean, means[scope, key], places=6)
+
+
+class SharedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_compute_once(self):
+        calls, started, release, results = [], threading.Event(), threading.Event(), {}
+        def compute():
+            calls.append(threading.current_thread().name)
+            started.set()
+            release.wait(5)
+            return 'fresh'
+        def read(name):
+            results[name] = get_or_compute('fd:test', compute)
+        first = threading.Thread(target=read, args=('first',))
+        first.start()
+        self.assertTrue(started.wait(5))
+        second = threading.Thread(target=read, args=('second',))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(results, {'first': 'fresh', 'second': 'fresh'})
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrent_async_misses_compute_once(self):
+        calls = []
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return 'fresh'
+        async def read_twice():
+            return await asyncio.gather(aget_or_compute('fd:test', compute), aget_or_compute('fd:test', compute))
+        self.assertEqual(asyncio.run(read_twice()), ['fresh', 'fresh'])
+        self.assertEqual(calls, [1])
+
+    def test_write_bumps_the_version_after_commit(self):
+        counter = iter(range(10))
+        self.assertEqual(get_or_compute('fd:test', lambda: next(counter)), 0)
+        version = get_data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_customer(1)
+            self.assertEqual(get_data_version(), version)  # not before the write is visible
+        self.assertNotEqual(get_data_version(), version)
+        self.assertEqual(get_or_compute('fd:test', lambda: next(counter)), 1)
+
+
+@override_settings(FD_PRERENDER={'ENABLED': False})
+class MonthlySnapshotTests(TestCase):
+    """Closed months are read from snapshots when frozen, live otherwise; freezing is a background job"""
+
+    def setUp(self):
+        self.month = last_closed_month()
+        self.customer = create_customer(1)
+        self.first = build_invoice(create_work_order(self.customer), invoice_date=self.month)
+        self.first.save()
+        self.summary = financial_year_summary(self.month)
+
+    def freeze(self):
+        for job in BackgroundJob.objects.filter(kind=FREEZE_JOB, status='pending'):
+            run_job(job.pk)
+
+    def test_summary_queues_the_freeze_instead_of_writing_it(self):
+        self.assertFalse(MonthlySnapshot.objects.exists())
+        job = BackgroundJob.objects.get(kind=FREEZE_JOB)
+        self.assertIn(self.month.isoformat(), job.params['months'])
+        financial_year_summary(self.month)
+        self.assertEqual(BackgroundJob.objects.filter(kind=FREEZE_JOB).count(), 1)  # one waiting job is enough
+        self.freeze()
+        self.assertTrue(MonthlySnapshot.objects.filter(month=self.month).exists())
+        # Snapshots and outstanding, plus four for the open months (none in April: last year is all closed)
+        open_months = self.month.month != 3
+        with self.assertNumQueries(6 if open_months else 2):
+            self.assertEqual(financial_year_summary(self.month), self.summary)
+
+    def test_back_dated_invoice_is_counted_in_its_frozen_month(self):
+        self.freeze()
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice = build_invoice(create_work_order(self.customer), invoice_date=self.month + timedelta(days=5))
+            invoice.save()
+        self.assertFalse(MonthlySnapshot.objects.filter(month=self.month).exists())
+        summary = financial_year_summary(self.month)
+        self.assertEqual(summary['invoice_count'], self.summary['invoice_count'] + 1)
+        self.assertEqual(summary['invoiced_amount'], self.summary['invoiced_amount'] + invoice.total_amount)
+
+    def test_deleted_invoice_leaves_its_frozen_month(self):
+        self.freeze()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.delete()
+        summary = financial_year_summary(self.month)
+        self.assertEqual(summary['invoice_count'], self.summary['invoice_count'] - 1)
+
+    def test_outstanding_follows_payments_after_the_month_closed(self):
+        self.freeze()
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(invoice=self.first, amount=self.first.total_amount, payment_method='cash')
+        summary = financial_year_summary(self.month)
+        self.assertEqual(summary['outstanding_amount'], self.summary['outstanding_amount'] - self.first.total_amount)
+
+
+def create_matching_customers(count):
+    """count customers whose name contains 'Acme', indexed in one go"""
+    Customer.objects.bulk_create([
+        Customer(
+            company_name=f"Acme Traders {serial}", contact_name="Test Contact", mobile_number="9876543210",
+            email=f"acme{serial}@example.com", gst_number=f"24ACMEF{serial:04d}F1Z5",
+            address="Ahmedabad, Gujarat", branch_location="Ahmedabad",
+        )
+        for serial in range(count)
+    ])
+    rebuild_search_index()
+
+
+# Pages link their CSS/JS through the manifest storage, which needs collectstatic first
+plain_static_files = override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+@plain_static_files
+class SearchFilterTests(TestCase):
+    """Ranking is capped at SEARCH_LIMIT; filtering, counting and paging are not"""
+    MATCHES = SEARCH_LIMIT + 25
+
+    @classmethod
+    def setUpTestData(cls):
+        create_matching_customers(cls.MATCHES)
+        create_customer(1)
+
+    def test_filter_returns_every_match(self):
+        queryset, ranked_ids = filtered_queryset('customer', {'search': 'acme'})
+        self.assertEqual(len(ranked_ids), SEARCH_LIMIT)
+        self.assertEqual(queryset.count(), self.MATCHES)
+
+    def test_list_pages_through_every_match(self):
+        response = self.client.get('/customers/', {'search': 'acme'})
+        self.assertEqual(response.context['total_count'], self.MATCHES)
+        last_page = response.context['last_page']
+        response = self.client.get('/customers/', {'search': 'acme', 'page': last_page})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['customers']), self.MATCHES - (last_page - 1) * 10)
+
+    def test_middle_of_an_identifier_still_matches(self):
+        queryset, _ = filtered_queryset('customer', {'search': 'ABCDE0001'})
+        self.assertEqual(list(queryset.values_list('gst_number', flat=True)), ['24ABCDE0001F1Z5'])
+
+    @skipUnless(connection.vendor == 'sqlite', "FTS5 plan")
+    def test_full_text_match_runs_once_not_per_document(self):
+        queryset, _ = filtered_queryset('customer', {'search': 'acme traders'})
+        plan = query_plan(queryset)
+        [fts] = [row for row in plan if 'fd_search_fts' in row['detail']]
+        parent = next(row for row in plan if row['id'] == fts['parent'])
+        # An IN list of its own; joined to the documents it would run once per document
+        self.assertTrue(parent['detail'].startswith('LIST SUBQUERY'), plan)
+        self.assertEqual([row for row in plan if row['parent'] == fts['parent'] and row is not fts], [], plan)
+
+    def test_export_of_a_search_has_every_match(self):
+        response = self.client.post('/customers/?search=acme', {'bulk_action': 'export', 'export_format': 'csv'})
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), self.MATCHES + 1)  # header row
+        self.assertTrue(all('Acme Traders' in line for line in lines[1:]))
+
+
+@plain_static_files
+class BulkDeleteTests(TestCase):
+    """Background deletes: bottom-up, in bounded chunks, resumable, and only what the user confirmed"""
+
+    def setUp(self):
+        self.customer = create_customer(1)
+
+    def create_invoices(self, count, status='sent'):
+        invoices = []
+        for _ in range(count):
+            invoice = build_invoice(create_work_order(self.customer))
+            invoice.save()
+            invoices.append(invoice)
+        Invoice.objects.filter(pk__in=[invoice.pk for invoice in invoices]).update(status=status)
+        return invoices
+
+    def deletes(self, queries, table):
+        return [index for index, query in enumerate(queries) if query['sql'].startswith(f'DELETE FROM "{table}"')]
+
+    def test_rows_are_deleted_bottom_up_in_bounded_chunks(self):
+        self.create_invoices(5)
+        job = start_bulk_delete('customer', ids=[self.customer.pk])
+        with mock.patch('FD.bulk_delete.CHUNK_SIZE', 2), CaptureQueriesContext(connection) as context:
+            run_job(job.pk)
+        invoices, work_orders, customers = (self.deletes(context.captured_queries, table) for table in ('fd_invoice', 'fd_work_order', 'fd_customer'))
+        self.assertEqual((len(invoices), len(work_orders), len(customers)), (3, 3, 1))
+        self.assertLess(max(invoices), min(work_orders))
+        self.assertLess(max(work_orders), min(customers))
+        self.assertFalse(Customer.objects.exists())
+        self.assertEqual(BackgroundJob.objects.get(pk=job.pk).status, 'done')
+
+    def test_restarted_job_resumes_after_the_finished_batches(self):
+        invoices = self.create_invoices(4)
+        with mock.patch('FD.bulk_delete.BATCH_SIZE', 2):
+            job = start_bulk_delete('invoice', ids=[invoice.pk for invoice in invoices])
+            BackgroundJob.objects.filter(pk=job.pk).update(done=2)  # a worker died after the first batch
+            run_job(job.pk)
+        # The first batch counts as deleted already, so it is not touched again
+        self.assertEqual(set(Invoice.objects.values_list('pk', flat=True)), {invoices[0].pk, invoices[1].pk})
+
+    def test_filter_scope_deletes_only_the_rows_matching_when_confirmed(self):
+        sent = self.create_invoices(2)
+        paid = self.create_invoices(3, status='paid')
+        job = start_bulk_delete('invoice', filters={'status': 'paid'})
+        self.assertEqual(job.total, 3)
+        later = self.create_invoices(1, status='paid')
+        Invoice.objects.filter(pk=sent[0].pk).update(status='paid')  # edited into the filter after confirming
+        run_job(job.pk)
+        remaining = set(Invoice.objects.values_list('pk', flat=True))
+        self.assertEqual(remaining, {invoice.pk for invoice in sent + later})
+        self.assertFalse(remaining & {invoice.pk for invoice in paid})
+
+    def test_filter_scope_is_stored_as_pk_ranges_and_resumes(self):
+        invoices = self.create_invoices(7, status='paid')
+        Invoice.objects.filter(pk=invoices[3].pk).update(status='sent')
+        job = start_bulk_delete('invoice', filters={'status': 'paid'})
+        pks = [invoice.pk for invoice in invoices]
+        self.assertEqual(job.params['ranges'], [[pks[0], pks[2]], [pks[4], pks[6]]])
+        with mock.patch('FD.bulk_delete.BATCH_SIZE', 2):
+            BackgroundJob.objects.filter(pk=job.pk).update(done=2)
+            run_job(job.pk)
+        self.assertEqual(set(Invoice.objects.values_list('pk', flat=True)), {pks[0], pks[1], pks[3]})
+
+    def test_unfiltered_delete_is_refused(self):
+        self.create_invoices(2)
+        for kind, filters in (('invoice', {}), ('invoice', {'search': '  '}), ('customer', {'status': 'paid'})):
+            with self.subTest(kind=kind, filters=filters), self.assertRaises(ValueError):
+                start_bulk_delete(kind, filters=filters)
+        response = self.client.post('/invoices/', {'bulk_action': 'delete', 'delete_scope': 'filter'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(BackgroundJob.objects.exists())
+        self.assertEqual(Invoice.objects.count(), 2)
+
+    def test_delete_matching_is_offered_only_with_a_filter(self):
+        self.create_invoices(2)
+        self.assertNotContains(self.client.get('/invoices/'), 'delete-matching-form')
+        self.assertContains(self.client.get('/invoices/', {'status': 'sent'}), 'delete-matching-form')
+
+    def test_failed_delete_stays_listed_with_its_error(self):
+        BackgroundJob.objects.create(
+            kind='bulk_delete', target='invoice', status='failed', total=10, done=4,
+            error='database is locked', finished_at=timezone.now(),
+        )
+        self.assertContains(self.client.get('/invoices/'), 'stopped after 4: database is locked')
+
+
+@plain_static_files
+@override_settings(FD_PRERENDER={'ENABLED': False}, FD_PDF_STORE={'BACKEND': 'cache'})
+class ConditionalPageTests(TestCase):
+    """Every decorated page answers a current If-None-Match with 304 and changes its ETag with its data"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.settings_row = CompanySettings.objects.create()
+        cls.customer = create_customer(1)
+        cls.work_order = create_work_order(cls.customer)
+        cls.invoice = build_invoice(cls.work_order)
+        cls.invoice.save()
+
+    def urls(self):
+        invoice, work_order = self.invoice.pk, self.work_order.pk
+        return {
+            'customer detail': f'/customers/{self.customer.pk}/',
+            'invoice detail': f'/invoices/{invoice}/',
+            'invoice preview': f'/invoices/{invoice}/preview/',
+            'invoice print': f'/invoices/{invoice}/print/',
+            'invoice PDF': f'/invoices/{invoice}/export-pdf/',
+            'work order print': f'/work-orders/{work_order}/print/',
+            'work order PDF': f'/work-orders/{work_order}/export-pdf/',
+        }
+
+    def etags(self):
+        return {label: self.client.get(url)['ETag'] for label, url in self.urls().items()}
+
+    def test_current_etag_gets_not_modified(self):
+        for label, url in self.urls().items():
+            with self.subTest(label):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_payment_changes_the_invoice_etags_only(self):
+        before = self.etags()
+        # Pending: the invoice row itself is not saved again
+        Payment.objects.create(invoice=self.invoice, amount=Decimal('10.00'), payment_method='cash', status='pending')
+        after = self.etags()
+        changed = {label for label in before if before[label] != after[label]}
+        self.assertEqual(changed, {'invoice detail', 'invoice preview', 'invoice print', 'invoice PDF'})
+
+    def test_company_settings_change_every_document_etag(self):
+        before = self.etags()
+        self.settings_row.phone = '+91-9876543210'
+        self.settings_row.save()
+        after = self.etags()
+        changed = {label for label in before if before[label] != after[label]}
+        self.assertEqual(changed, set(before) - {'customer detail'})
+
+
+@plain_static_files
+@override_settings(FD_PRERENDER={'ENABLED': False})
+class CustomerStatementTests(TestCase):
+    """Statement lines merged in date order with running, opening and closing balances"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_customer(1)
+        cls.invoices = []
+        for day in (date(2025, 1, 10), date(2025, 2, 5), date(2025, 2, 5), date(2025, 3, 20), date(2025, 4, 2)):
+            invoice = build_invoice(create_work_order(cls.customer), invoice_date=day)
+            invoice.save()
+            cls.invoices.append(invoice)
+        for invoice, day, amount, status in (
+            (cls.invoices[0], date(2025, 2, 5), '500.00', 'completed'),   # same day as two invoices
+            (cls.invoices[0], date(2025, 3, 1), '680.00', 'completed'),
+            (cls.invoices[1], date(2025, 3, 25), '100.00', 'completed'),
+            (cls.invoices[3], date(2025, 3, 26), '200.00', 'pending'),    # not received yet
+        ):
+            Payment.objects.create(invoice=invoice, payment_date=day, amount=Decimal(amount), payment_method='upi', status=status)
+        cancelled = build_invoice(create_work_order(cls.customer), invoice_date=date(2025, 2, 1))
+        cancelled.save()
+        Invoice.objects.filter(pk=cancelled.pk).update(status='cancelled')
+
+    def balance_due(self):
+        return billed_invoices(self.customer.pk).aggregate(total=Sum('balance_due'))['total']
+
+    def test_running_and_closing_balance_over_small_chunks(self):
+        statement = Statement(self.customer, chunk_size=2)
+        lines = list(statement)
+        self.assertEqual(len(lines), 8)
+        self.assertEqual([line.date for line in lines], sorted(line.date for line in lines))
+        self.assertEqual([line.kind for line in lines if line.date == date(2025, 2, 5)], ['Invoice', 'Invoice', 'Payment'])
+        balance = Decimal('0.00')
+        for line in lines:
+            balance += (line.debit or 0) - (line.credit or 0)
+            self.assertEqual(line.balance, balance)
+        self.assertEqual(statement.opening, 0)
+        self.assertEqual(statement.closing, lines[-1].balance)
+        self.assertEqual(statement.closing, self.balance_due())
+
+    def test_date_range_opens_and_closes_on_the_full_statement(self):
+        full = list(Statement(self.customer, chunk_size=3))
+        statement = Statement(self.customer, date(2025, 2, 6), date(2025, 3, 25), chunk_size=1)
+        lines = list(statement)
+        self.assertEqual([line.date for line in lines], [date(2025, 3, 1), date(2025, 3, 20), date(2025, 3, 25)])
+        self.assertEqual(statement.opening, [line for line in full if line.date <= date(2025, 2, 5)][-1].balance)
+        self.assertEqual(statement.closing, [line for line in full if line.date <= date(2025, 3, 25)][-1].balance)
+
+    def test_page_and_pdf(self):
+        response = self.client.get(f'/customers/{self.customer.pk}/statement/', {'start_date': '2025-02-06'})
+        page = b''.join(response.streaming_content).decode()
+        self.assertIn(f'₹{self.balance_due()}', page)
+        self.assertIn(self.invoices[3].invoice_number, page)
+        self.assertNotIn(f'<td>{self.invoices[0].invoice_number}</td>', page)
+        self.assertIn('<td class="amount">₹3040.00</td>', page)  # opening, at two places on SQLite too
+        response = self.client.get(f'/customers/{self.customer.pk}/statement/pdf/', {'end_date': '2025-03-31'})
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+
+class PrerenderJobTests(TestCase):
+    def test_saves_of_one_invoice_share_a_pending_job(self):
+        invoice = build_invoice(create_work_order(create_customer(1)))
+        with mock.patch('FD.jobs.start') as start:
+            for _ in range(3):
+                with self.captureOnCommitCallbacks(execute=True):
+                    invoice.save()
+        self.assertEqual(BackgroundJob.objects.filter(kind=prerender.JOB_KIND, target=str(invoice.pk)).count(), 1)
+        self.assertEqual(start.call_count, 1)
+
+    def test_jobs_of_a_kind_run_on_one_worker_thread(self):
+        threads, finished = [], threading.Event()
+        def record(job_id):
+            threads.append(threading.current_thread().name)
+            if len(threads) == 3:
+                finished.set()
+        with mock.patch('FD.jobs.run_job', side_effect=record):
+            for job_id in range(3):
+                jobs.start(job_id, 'test_single_worker')
+            self.assertTrue(finished.wait(5))
+        self.assertEqual(threads, ['fd-jobs-test_single_worker'] * 3)
+
+    def test_print_key_changes_with_the_static_manifest(self):
+        keys = []
+        for manifest_hash in ('a1', 'b2'):
+            render_version.cache_clear()
+            with mock.patch('FD.conditional.staticfiles_storage', mock.Mock(manifest_hash=manifest_hash)):
+                keys.append(prerender.print_key(1, 'v1'))
+        render_version.cache_clear()
+        self.assertNotEqual(*keys)
+
+
+class PdfStoreTests(TestCase):
+    """Stored PDFs go to a scratch directory, never media/pdf_cache"""
+
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(FD_PDF_STORE={'DIRECTORY': self.directory, 'MAX_BYTES': 250}))
+        self.renders = []
+        renderer = lambda invoice, company_settings: self.renders.append(invoice.pk) or b'%PDF-' + b'x' * 95
+        self.enterContext(mock.patch.dict(pdf_store.DOCUMENTS, {'invoice': (Invoice, renderer)}))
+
+    def stored(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_least_recently_used_file_is_evicted_over_max_bytes(self):
+        store = pdf_store.get_store()
+        store.save('a', 1, b'x' * 100)
+        store.save('b', 1, b'x' * 100)
+        for name, mtime in (('a', 1000), ('b', 2000)):
+            os.utime(store.path(name, 1), (mtime, mtime))
+        store.open('a', 1).close()  # a hit makes a the most recently used
+        store.save('c', 1, b'x' * 100)
+        self.assertEqual(self.stored(), ['a-1.pdf', 'c-1.pdf'])
+
+    def test_new_version_replaces_the_old_and_oversized_file_is_kept(self):
+        store = pdf_store.get_store()
+        store.save('a', 1, b'x' * 100)
+        store.save('a', 2, b'x' * 300)
+        self.assertEqual(self.stored(), ['a-2.pdf'])
+
+    def test_pdf_is_rendered_once_per_invoice_version(self):
+        invoice = build_invoice(create_work_order(create_customer(1)))
+        invoice.save()
+        for _ in range(2):
+            handle, _ = pdf_store.invoice_pdf(invoice.pk)
+            self.assertTrue(handle.read().startswith(b'%PDF-'))
+            handle.close()
+        Invoice.objects.filter(pk=invoice.pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+        pdf_store.invoice_pdf(invoice.pk)[0].close()
+        self.assertEqual(self.renders, [invoice.pk, invoice.pk])
+        self.assertEqual(len(self.stored()), 1)
+
+    def test_cache_backend_keeps_pdfs_out_of_the_directory(self):
+        invoice = build_invoice(create_work_order(create_customer(1)))
+        invoice.save()
+        with self.settings(FD_PDF_STORE={'BACKEND': 'cache', 'DIRECTORY': self.directory}):
+            for _ in range(2):
+                pdf_store.invoice_pdf(invoice.pk)[0].close()
+        self.assertEqual(self.renders, [invoice.pk])
+        self.assertEqual(self.stored(), [])
+
+
+class InvoicePdfBatchTests(TestCase):
+    def test_invoice_date_range_selects_by_invoice_date_not_creation(self):
+        customer = create_customer(1)
+        for day in (date(2025, 2, 28), date(2025, 3, 1), date(2025, 3, 31), date(2025, 4, 1)):
+            build_invoice(create_work_order(customer), invoice_date=day).save()
+        queryset = batch_queryset({'invoice_date_from': '2025-03-01', 'invoice_date_to': '2025-03-31'})
+        self.assertEqual(sorted(queryset.values_list('invoice_date', flat=True)), [date(2025, 3, 1), date(2025, 3, 31)])
+        self.assertEqual(batch_queryset({'invoice_date_from': '2025-03-01'}).count(), 3)
+
+    def test_malformed_invoice_date_is_refused(self):
+        with self.assertRaises(ValueError):
+            batch_queryset({'invoice_date_to': '31/03/2025'})
+        self.assertEqual(self.client.get('/invoices/export-pdfs/', {'invoice_date_from': 'March'}).status_code, 400)
+
+    def test_download_needs_a_selection_or_filter(self):
+        build_invoice(create_work_order(create_customer(1))).save()
+        response = self.client.get('/invoices/export-pdfs/')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('filter', response.json()['error'])
+
+    def test_download_is_capped(self):
+        customer = create_customer(1)
+        for _ in range(3):
+            build_invoice(create_work_order(customer)).save()
+        with mock.patch('FD.pdf_batch.REQUEST_MAX_INVOICES', 2):
+            response = self.client.get('/invoices/export-pdfs/', {'status': 'sent'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('export_invoice_pdfs', response.json()['error'])
+
+    def test_download_renders_in_the_web_process(self):
+        customer = create_customer(1)
+        ids = []
+        for _ in range(2):
+            invoice = build_invoice(create_work_order(customer))
+            invoice.save()
+            ids.append(str(invoice.pk))
+        with mock.patch('FD.pdf_batch.PDFS_PER_WORKER', 1), mock.patch('FD.pdf_batch.ProcessPoolExecutor') as pool:
+            response = self.client.get('/invoices/export-pdfs/', {'ids': ','.join(ids)})
+            content = b''.join(response.streaming_content)
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(content.startswith(b'PK'))
+
+
+class GstinTests(TestCase):
+    def setUp(self):
+        gstin._cache.clear()
+
+    def test_check_digit(self):
+        for gst_number in ('27AAPFU0939F1ZV', '29AAGCB7383J1Z4', '33AAACH7409R1Z8'):
+            self.assertEqual(gstin.gstin_check_digit(gst_number[:14]), gst_number[14])
+        self.assertEqual(gstin.lookup('27AAPFU0939F1ZX')['error'], 'Invalid GST number check digit')
+        with self.assertNumQueries(0):
+            self.assertEqual(gstin.lookup('27AAPFU0939')['error'], 'Invalid GST number format')
+
+    def test_lookup_cache_is_a_bounded_lru_with_expiry(self):
+        cache = gstin.LookupCache(maxsize=2)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.get('a')
+        cache.set('c', 3, 60)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+        cache.set('d', 4, -1)
+        self.assertIsNone(cache.get('d'))
+
+    def test_customer_lookup_is_cached_until_a_customer_changes(self):
+        customer = create_customer(1)
+        with self.assertNumQueries(1):
+            self.assertTrue(gstin.lookup(customer.gst_number.lower())['from_database'])
+        with self.assertNumQueries(0):
+            gstin.lookup(customer.gst_number)
+        with self.captureOnCommitCallbacks(execute=True):
+            customer.company_name = 'Renamed'
+            customer.save()
+        self.assertEqual(gstin.lookup(customer.gst_number)['company_name'], 'Renamed')
+
+    def test_registry_answer_never_shadows_a_new_customer(self):
+        self.assertTrue(gstin.lookup('27AAPFU0939F1ZV')['from_api'])
+        # update() sends no signal, like a customer created by another process
+        Customer.objects.filter(pk=create_customer(1).pk).update(gst_number='27AAPFU0939F1ZV')
+        self.assertTrue(gstin.lookup('27AAPFU0939F1ZV')['from_database'])
+
+    def test_batch_reads_all_customers_in_one_query(self):
+        customers = [create_customer(serial) for serial in range(1, 4)]
+        gst_numbers = [customer.gst_number for customer in customers] + ['27AAPFU0939F1ZV', 'not a gstin']
+        with self.assertNumQueries(1):
+            results = gstin.lookup_many(gst_numbers)
+        self.assertEqual([results[customer.gst_number]['company_name'] for customer in customers],
+                         [customer.company_name for customer in customers])
+        self.assertTrue(results['27AAPFU0939F1ZV']['from_api'])
+        self.assertFalse(results['NOT A GSTIN']['success'])
+
+    def test_suggest_searches_the_unique_index(self):
+        for serial in (12, 11, 21):
+            create_customer(serial)
+        self.assertEqual([row['gst_number'] for row in gstin.suggest('24abcde001')], ['24ABCDE0011F1Z5', '24ABCDE0012F1Z5'])
+        self.assertEqual(gstin.suggest('24ABCDE0012F1Z5', limit=5)[0]['company_name'], 'Test Company 12')
+        queryset = Customer.objects.filter(gstin.prefix_filter('24AB')).order_by('gst_number')
+        self.assertEqual(full_table_scans(queryset), [], query_plan(queryset))
+
+
+def query_plan(queryset):
+    """EXPLAIN rows of queryset as dicts (EXPLAIN QUERY PLAN on SQLite)"""
+    sql, params = queryset.query.sql_with_params()
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def full_table_scans(queryset):
+    """
+    Tables the plan reads row by row: without any usable index, or (SQLite)
+    walking a whole index with nothing to stop it early
+    """
+    sliced = queryset.query.high_mark is not None
+    partial = {index.name for index in queryset.model._meta.indexes if index.condition is not None}
+    scans = []
+    for row in query_plan(queryset):
+        if connection.vendor == 'sqlite':
+            # "SCAN t USING [COVERING] INDEX i" walks an index in order; fine
+            # for ORDER BY ... LIMIT, a full scan in disguise without a LIMIT,
+            # unless i is partial and so holds only the rows asked for
+            match = re.match(r'SCAN (\w+)( USING (?:COVERING )?INDEX (\w+))?', row['detail'])
+            if match and not (match.group(2) and (sliced or match.group(3) in partial)):
+                scans.append(match.group(1))
+        # MySQL may still pick ALL on a near-empty test table, so only a
+        # scan with no candidate index at all counts as a regression
+        elif row['type'] == 'ALL' and not row['possible_keys']:
+            scans.append(row['table'])
+    return scans
+
+def plan_indexes(queryset):
+    """Names of the indexes the plan uses (SQLite) or may use (MySQL)"""
+    if connection.vendor == 'sqlite':
+        return {name for row in query_plan(queryset) for name in re.findall(r'INDEX (\w+)', row['detail'])}
+    return {name for row in query_plan(queryset) for name in (row['possible_keys'] or '').split(',') if name}
+
+def hot_queries():
+    """
+    (label, queryset, index it must use) for the filters and orderings the
+    views and reminder flow run; is_migrated filters name (SQLite, MySQL)
+    indexes, a partial one and its plain twin
+    """
+    today = timezone.localdate()
+    now = timezone.now()
+    month_start = today.replace(day=1)
+    next_page = Q(created_at__lt=now) | Q(created_at=now, pk__lt=1000)
+    newest = ('-created_at', '-pk')
+    return [
+        ('customer list', project(Customer.objects.order_by(*newest), CustomerRow)[:11], 'fd_customer_created_idx'),
+        ('customer list, next page', project(Customer.objects.filter(next_page).order_by(*newest), CustomerRow)[:11], 'fd_customer_created_idx'),
+        ('customer list, date range', project(Customer.objects.filter(created_between(month_start, today)).order_by(*newest), CustomerRow)[:11], 'fd_customer_created_idx'),
+        ('work order list', project(WorkOrder.objects.order_by(*newest), WorkOrderRow)[:11], 'fd_wo_created_idx'),
+        ('work order list, status', project(WorkOrder.objects.filter(status='completed').order_by(*newest), WorkOrderRow)[:11], 'fd_wo_status_created_idx'),
+        ('work order list, status and date range', project(WorkOrder.objects.filter(created_between(month_start, today), status='completed').order_by(*newest), WorkOrderRow)[:11], 'fd_wo_status_created_idx'),
+        ('invoice list', project(Invoice.objects.order_by(*newest), InvoiceRow)[:11], 'fd_invoice_created_idx'),
+        ('invoice list, next page', project(Invoice.objects.filter(next_page).order_by(*newest), InvoiceRow)[:11], 'fd_invoice_created_idx'),
+        ('invoice list, status', project(Invoice.objects.filter(status='paid').order_by(*newest), InvoiceRow)[:11], 'fd_invoice_status_created_idx'),
+        ('invoice list, status and date range', project(Invoice.objects.filter(created_between(month_start, today), status='overdue').order_by(*newest), InvoiceRow)[:11], 'fd_invoice_status_created_idx'),
+        ('dashboard recent invoices', Invoice.objects.filter(is_migrated=False).order_by('-created_at')[:5], ('fd_invoice_new_idx', 'fd_invoice_migrated_idx')),
+        ('dashboard recent work orders', WorkOrder.objects.filter(is_migrated=False).order_by('-created_at')[:5], ('fd_wo_new_idx', 'fd_wo_migrated_idx')),
+        ('dashboard overdue invoices', Invoice.objects.filter(is_migrated=False, status='overdue')[:5], ('fd_invoice_new_reminder_idx', 'fd_invoice_reminder_idx')),
+        ('legacy customers', Customer.objects.filter(is_migrated=True).order_by('-created_at')[:10], ('fd_customer_legacy_idx', 'fd_customer_migrated_idx')),
+        ('legacy work orders', WorkOrder.objects.filter(is_migrated=True).order_by('-created_at')[:10], ('fd_wo_legacy_idx', 'fd_wo_migrated_idx')),
+        ('legacy invoices', Invoice.objects.filter(is_migrated=True).order_by('-created_at')[:10], ('fd_invoice_legacy_idx', 'fd_invoice_migrated_idx')),
+        ('legacy payments', Payment.objects.filter(is_migrated=True), ('fd_payment_legacy_idx', 'fd_payment_migrated_idx')),
+        ('reminder candidates', Invoice.objects.filter(is_migrated=False, status__in=['sent', 'overdue'], balance_due__gt=0), ('fd_invoice_new_reminder_idx', 'fd_invoice_reminder_idx')),
+        ('scheduled reminders', Invoice.objects.filter(status__in=['sent', 'overdue'], balance_due__gt=0), 'fd_invoice_status_due_idx'),
+        ('overdue sweep', Invoice.objects.filter(status__in=['sent', 'partially_paid'], due_date__lt=today), 'fd_invoice_status_due_idx'),
+        ('month invoices', Invoice.objects.filter(invoice_date__gte=month_start, invoice_date__lt=today), 'fd_invoice_date_idx'),
+        ('month payments', Payment.objects.filter(status='completed', payment_date__gte=month_start, payment_date__lt=today), 'fd_payment_status_date_idx'),
+        ('month work orders', WorkOrder.objects.filter(created_at__gte=now - timedelta(days=30), created_at__lt=now), 'fd_wo_created_idx'),
+        ('recent customers', Customer.objects.filter(created_at__gte=now - timedelta(days=90)), 'fd_customer_created_idx'),
+        ('recent invoices', Invoice.objects.filter(created_at__gte=now - timedelta(days=90)), 'fd_invoice_created_idx'),
+        ('completed work orders', WorkOrder.objects.filter(status='completed'), 'fd_wo_status_created_idx'),
+        ('payment history', Payment.objects.all()[:20], 'fd_payment_ordering_idx'),
+    ]
+
+
+@skipUnless(connection.vendor in ('sqlite', 'mysql'), "EXPLAIN output is parsed for SQLite and MySQL")
+class QueryPlanTests(TestCase):
+    """The hot filter paths must be served by an index, never a full table scan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = create_customer(1)
+        work_order = create_work_order(customer)
+        build_invoice(work_order).save()
+
+    def test_hot_queries_use_indexes(self):
+        for label, queryset, index in hot_queries():
+            if isinstance(index, tuple):
+                index = index[connection.vendor == 'mysql']
+            with self.subTest(label):
+                self.assertEqual(full_table_scans(queryset), [], query_plan(queryset))
+                self.assertIn(index, plan_indexes(queryset), query_plan(queryset))
@@ -8,6 +8,7 @@ urlpatterns = [
     path('home/', views.home_view, name='home'),
     path('debug/', views.debug_view, name='debug'),
     path('test/', views.simple_test, name='test'),
+    path('query-log/', views.query_log_view, name='query_log'),
     
     # Customers
     path('customers/', views.CustomerListView.as_view(), name='customer_list'),
@@ -15,6 +16,8 @@ urlpatterns = [
     path('customers/<int:pk>/', views.CustomerDetailView.as_view(), name='customer_detail'),
     path('customers/<int:pk>/edit/', views.CustomerUpdateView.as_view(), name='customer_edit'),
     path('customers/<int:pk>/delete/', views.CustomerDeleteView.as_view(), name='customer_delete'),
+    path('customers/<int:pk>/statement/', views.customer_statement, name='customer_statement'),
+    path('customers/<int:pk>/statement/pdf/', views.customer_statement_pdf, name='customer_statement_pdf'),
     
     # Work Orders
     path('work-orders/', views.WorkOrderListView.as_view(), name='workorder_list'),
@@ -24,6 +27,7 @@ urlpatterns = [
     path('work-orders/<int:pk>/delete/', views.WorkOrderDeleteView.as_view(), name='workorder_delete'),
     path('work-orders/<int:pk>/convert-to-invoice/', views.ConvertToInvoiceView.as_view(), name='convert_to_invoice'),
     path('work-orders/<int:pk>/print/', views.PrintWorkOrderView.as_view(), name='print_workorder'),
+    path('work-orders/<int:pk>/export-pdf/', views.export_work_order_pdf, name='export_work_order_pdf'),
     
     # Invoices
     path('invoices/', views.InvoiceListView.as_view(), name='invoice_list'),
@@ -33,6 +37,7 @@ urlpatterns = [
     path('invoices/<int:pk>/print/', views.PrintInvoiceView.as_view(), name='print_invoice'),
     path('invoices/<int:pk>/preview/', views.InvoicePreviewView.as_view(), name='invoice_preview'),
     path('invoices/<int:pk>/export-pdf/', views.export_invoice_pdf, name='export_invoice_pdf'),
+    path('invoices/export-pdfs/', views.export_invoice_pdfs, name='export_invoice_pdfs'),
     
     # Payments
     path('invoices/<int:invoice_id>/add-payment/', views.PaymentCreateView.as_view(), name='add_payment'),
@@ -45,7 +50,10 @@ urlpatterns = [
     # Automation & API
     path('send-reminders/', views.AutomatedEmailView.as_view(), name='send_reminders'),
     path('api/gst-lookup/', views.GSTLookupView.as_view(), name='gst_lookup'),
+    path('api/gst-lookup/autocomplete/', views.GSTAutocompleteView.as_view(), name='gst_autocomplete'),
+    path('api/gst-lookup/batch/', views.GSTBatchLookupView.as_view(), name='gst_batch_lookup'),
     path('api/project-analytics/<int:project_id>/', views.ProjectAnalyticsView.as_view(), name='project_analytics'),
+    path('api/jobs/<int:pk>/', views.job_status_view, name='job_status'),
     
     # AI Analytics Dashboard
     path('ai-analytics/', views.AIAnalyticsView.as_view(), name='ai_dashboard'),
@@ -1,94 +1,147 @@
 # FD/views.py - COMPLETE FIXED VERSION WITH ALL IMPROVEMENTS
-from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponse
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.http import JsonResponse, HttpResponse, FileResponse, Http404
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
 from django.db import models, IntegrityError
-from django.core.cache import cache
 from decimal import Decimal, DecimalException
 from datetime import date, timedelta, datetime
 import json
 import io
-from .models import Customer, WorkOrder, Invoice, Payment, TermsAndConditions, EmailLog, PaymentReminderLog, EmailConfiguration, CompanySettings
+import asyncio
+from asgiref.sync import sync_to_async
+from .models import Customer, WorkOrder, Invoice, Payment, TermsAndConditions, EmailLog, PaymentReminderLog, EmailConfiguration, CompanySettings, BackgroundJob, get_financial_year
+from .aggregates import revenue_totals, adashboard_metrics, arevenue_totals, summarize_revenue, ainvoice_breakdown
+from .caching import aget_or_compute
+from .snapshots import financial_year_summary
+from .forecasting import get_forecast
+from .cost_stats import project_statistics
+from .pagination import KeysetPaginationMixin
+from .projections import CustomerRow, WorkOrderRow, InvoiceRow
+from .exports import export_response
+from .filters import active_filters, filter_params, filtered_queryset
+from .bulk_delete import start_bulk_delete
+from .conditional import conditional_page, validators
+from .pdf import pdf_filename, render_statement_pdf, work_order_filename
+from .pdf_store import document_pdf
+from .pdf_batch import REQUEST_MAX_INVOICES, batch_pdf_response, request_queryset
+from .prerender import invoice_print_html
+from .statement import Statement, parse_period, statement_filename, statement_response
+from . import gstin
+from .instrumentation import get_config as get_query_log_config, recent_requests, summarize_by_view
+
+def queue_bulk_delete(request, kind, label, selected_ids):
+    """Start a background delete of the selected ids, or of every row matching the list filters"""
+    if not selected_ids and request.POST.get('delete_scope') == 'filter' and not active_filters(kind, request.GET):
+        messages.error(request, f'Search or filter the {label} before deleting all matching ones.')
+    elif selected_ids or request.POST.get('delete_scope') == 'filter':
+        try:
+            job = start_bulk_delete(kind, ids=selected_ids, filters=filter_params(request.GET),
+                                    created_by=request.user.get_username())
+        except ValueError:
+            messages.error(request, 'Invalid selection.')
+        else:
+            messages.success(request, f'Deleting {job.total} {label} in the background.')
+    return redirect(request.get_full_path())
+
+FAILED_JOB_SHOWN_FOR = timedelta(days=1)
+
+def active_bulk_jobs(kind):
+    """Running deletes of kind, and ones that failed recently so the list can say they stopped"""
+    return list(BackgroundJob.objects.filter(
+        models.Q(status__in=['pending', 'running']) | models.Q(status='failed', finished_at__gte=timezone.now() - FAILED_JOB_SHOWN_FOR),
+        kind='bulk_delete', target=kind,
+    ))
+
+def job_status_view(request, pk):
+    """Progress of a background job, polled by the list pages"""
+    job = get_object_or_404(BackgroundJob, pk=pk)
+    return JsonResponse({
+        'id': job.pk,
+        'status': job.status,
+        'total': job.total,
+        'done': job.done,
+        'percent': job.percent,
+        'error': job.error,
+    })
+
+# Templates read request.user (a lazy, sync-only session lookup), so async
+# views render in the request's sync thread
+arender = sync_to_async(render)
 
 # Dashboard Views with Caching
 class DashboardView(View):
-    def get(self, request):
-        cache_key = f'dashboard_data_{request.user.id if request.user.is_authenticated else "anonymous"}'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is None:
-            cached_data = self.calculate_dashboard_data()
-            cache.set(cache_key, cached_data, 300)  # Cache for 5 minutes
-        
-        context = cached_data
-        return render(request, 'FD/dashboard.html', context)
+    async def get(self, request):
+        # One entry shared by all users, replaced whenever the underlying data changes
+        financial_year = get_financial_year(timezone.localdate())
+        context = await aget_or_compute(f'dashboard:{financial_year}', self.calculate_dashboard_data)
+        return await arender(request, 'FD/dashboard.html', dict(context))
 
-    def calculate_dashboard_data(self):
+    async def calculate_dashboard_data(self):
         """Calculate dashboard data (expensive operation)"""
-        # Get current financial year (April 1 to March 31)
-        today = timezone.now().date()
-        if today.month >= 4:
-            financial_year_start = date(today.year, 4, 1)
-            financial_year_end = date(today.year + 1, 3, 31)
-            financial_year = f"{today.year}-{today.year + 1}"
-        else:
-            financial_year_start = date(today.year - 1, 4, 1)
-            financial_year_end = date(today.year, 3, 31)
-            financial_year = f"{today.year - 1}-{today.year}"
-
         # NEW DATA (Created in new system - not migrated)
-        new_customers = Customer.objects.filter(is_migrated=False)
-        new_work_orders = WorkOrder.objects.filter(is_migrated=False)
         new_invoices = Invoice.objects.filter(is_migrated=False)
-        
-        # MIGRATED DATA (Legacy data)
-        migrated_customers = Customer.objects.filter(is_migrated=True)
-        migrated_work_orders = WorkOrder.objects.filter(is_migrated=True)
-        migrated_invoices = Invoice.objects.filter(is_migrated=True)
-
-        # Revenue calculations for NEW data
-        new_total_revenue = sum(inv.total_amount for inv in new_invoices if inv.total_amount) or 0
-        new_pending_payments = sum(inv.balance_due for inv in new_invoices.exclude(status='paid') if inv.balance_due) or 0
-        new_collected_revenue = new_total_revenue - new_pending_payments
+        new_work_orders = WorkOrder.objects.filter(is_migrated=False)
 
-        # Revenue calculations for MIGRATED data
-        migrated_total_revenue = sum(inv.total_amount for inv in migrated_invoices if inv.total_amount) or 0
-        migrated_pending_payments = sum(inv.balance_due for inv in migrated_invoices.exclude(status='paid') if inv.balance_due) or 0
-        migrated_collected_revenue = migrated_total_revenue - migrated_pending_payments
+        # Independent parts, awaited together:
+        # - current financial year (April 1 to March 31): frozen closed months + live open months
+        # - counts and revenue for new and migrated data, aggregated in the database
+        # - recent activities (plain rows so the cached copy never hits the database)
+        fy_summary, metrics, recent_invoices, recent_work_orders, overdue_invoices = await asyncio.gather(
+            sync_to_async(financial_year_summary)(timezone.localdate()),
+            adashboard_metrics(),
+            self.serialize_invoices(new_invoices.order_by('-created_at')[:5]),
+            self.serialize_work_orders(new_work_orders.order_by('-created_at')[:5]),
+            self.serialize_invoices(new_invoices.filter(status='overdue')[:5]),
+        )
 
         return {
-            'financial_year': financial_year,
-            
-            # NEW DATA METRICS (Fresh data)
-            'new_customers_count': new_customers.count(),
-            'new_work_orders_count': new_work_orders.count(),
-            'new_invoices_count': new_invoices.count(),
-            'new_total_revenue': new_total_revenue,
-            'new_pending_payments': new_pending_payments,
-            'new_collected_revenue': new_collected_revenue,
-            'new_collection_rate': (new_collected_revenue / new_total_revenue * 100) if new_total_revenue > 0 else 0,
-            
-            # MIGRATED DATA METRICS (Legacy data)
-            'migrated_customers_count': migrated_customers.count(),
-            'migrated_work_orders_count': migrated_work_orders.count(),
-            'migrated_invoices_count': migrated_invoices.count(),
-            'migrated_total_revenue': migrated_total_revenue,
-            'migrated_pending_payments': migrated_pending_payments,
-            'migrated_collected_revenue': migrated_collected_revenue,
-            'migrated_collection_rate': (migrated_collected_revenue / migrated_total_revenue * 100) if migrated_total_revenue > 0 else 0,
-            
-            # Recent activities
-            'recent_invoices': new_invoices.order_by('-created_at')[:5],
-            'recent_work_orders': new_work_orders.order_by('-created_at')[:5],
-            'overdue_invoices': new_invoices.filter(status='overdue')[:5],
+            'financial_year': fy_summary['financial_year'],
+            'fy_summary': fy_summary,
+            **metrics,
+            'recent_invoices': recent_invoices,
+            'recent_work_orders': recent_work_orders,
+            'overdue_invoices': overdue_invoices,
         }
 
+    async def serialize_invoices(self, queryset):
+        return [
+            {
+                'pk': row['pk'],
+                'invoice_number': row['invoice_number'],
+                'status': row['status'],
+                'total_amount': row['total_amount'],
+                'balance_due': row['balance_due'],
+                'customer': {'company_name': row['customer__company_name']},
+            }
+            async for row in queryset.values(
+                'pk', 'invoice_number', 'status', 'total_amount', 'balance_due', 'customer__company_name'
+            )
+        ]
+
+    async def serialize_work_orders(self, queryset):
+        return [
+            {
+                'pk': row['pk'],
+                'work_order_number': row['work_order_number'],
+                'project_title': row['project_title'],
+                'status': row['status'],
+                'total_cost': row['total_cost'],
+                'customer': {'company_name': row['customer__company_name']},
+            }
+            async for row in queryset.values(
+                'pk', 'work_order_number', 'project_title', 'status', 'total_cost', 'customer__company_name'
+            )
+        ]
+
 # Legacy Data Views
 class LegacyDataView(View):
     def get(self, request):
@@ -187,52 +240,44 @@ def simple_test(request):
     </ul>
     """)
 
+@staff_member_required
+def query_log_view(request):
+    """Per-view SQL counts/timings and slow statements recorded by QueryLogMiddleware"""
+    entries = recent_requests()
+    context = {
+        'enabled': get_query_log_config()['ENABLED'],
+        'config': get_query_log_config(),
+        'summary': summarize_by_view(entries),
+        'entries': entries[:50],
+    }
+    return render(request, 'FD/query_log.html', context)
+
 # Customer Views with Enhanced Filtering
-class CustomerListView(ListView):
+class CustomerListView(KeysetPaginationMixin, ListView):
     model = Customer
     template_name = 'FD/customer_list.html'
     context_object_name = 'customers'
     paginate_by = 10
+    projection = CustomerRow  # only the columns the list renders
 
     def get_queryset(self):
-        queryset = Customer.objects.all().order_by('-created_at')
-        
-        search_query = self.request.GET.get('search', '')
-        if search_query:
-            queryset = queryset.filter(
-                models.Q(company_name__icontains=search_query) |
-                models.Q(contact_name__icontains=search_query) |
-                models.Q(gst_number__icontains=search_query)
-            )
-        
-        # Date range filtering
-        start_date = self.request.GET.get('start_date')
-        end_date = self.request.GET.get('end_date')
-        
-        if start_date and end_date:
-            try:
-                start = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end = datetime.strptime(end_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__range=[start, end])
-            except ValueError:
-                pass  # Invalid date format, ignore filter
-        
+        queryset, self.ranked_ids = filtered_queryset('customer', self.request.GET)
         return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get the base queryset (before pagination)
-        base_queryset = self.get_queryset()
         
-        # Add total counts (not paginated)
-        context['total_customers_count'] = base_queryset.count()
+        # Add total counts (not paginated; cached count from the paginator)
+        context['total_customers_count'] = self.total_count
+        context['bulk_jobs'] = active_bulk_jobs('customer')
+        context['filters_active'] = bool(active_filters('customer', self.request.GET))  # 'Delete matching' needs one
         context['current_page_count'] = len(context['customers'])  # Current page count
         
         # Add additional context for stats
-        invoices = Invoice.objects.all()
-        context['total_revenue'] = sum(inv.total_amount for inv in invoices if inv.total_amount) or 0
-        context['pending_payments'] = sum(inv.balance_due for inv in invoices.exclude(status='paid') if inv.balance_due) or 0
-        context['active_invoices_count'] = invoices.exclude(status='paid').count()
+        totals = revenue_totals()
+        context['total_revenue'] = totals['total_revenue']
+        context['pending_payments'] = totals['pending_payments']
+        context['active_invoices_count'] = totals['active_invoices_count']
         
         # Add filter parameters for template
         context['search_query'] = self.request.GET.get('search', '')
@@ -248,15 +293,12 @@ class CustomerListView(ListView):
             action = request.POST.get('bulk_action')
             
             if action == 'export':
-                # Handle bulk export (placeholder)
-                messages.info(request, f'Export feature for {len(selected_ids)} customers coming soon!')
+                # Selected rows, or everything matching the current filters
+                queryset = Customer.objects.filter(id__in=selected_ids) if selected_ids else self.get_queryset()
+                return export_response('customer', queryset, request.POST.get('export_format', 'csv'))
             elif action == 'delete':
-                # Handle bulk delete
-                if selected_ids:
-                    customers = Customer.objects.filter(id__in=selected_ids)
-                    count = customers.count()
-                    customers.delete()
-                    messages.success(request, f'Successfully deleted {count} customers.')
+                # Chunked background delete: selected rows, or all rows matching the filters
+                return queue_bulk_delete(request, 'customer', 'customers', selected_ids)
         
         return self.get(request, *args, **kwargs)
     
@@ -283,11 +325,28 @@ class CustomerUpdateView(UpdateView):
         messages.success(self.request, 'Customer updated successfully!')
         return super().form_valid(form)
 
+@method_decorator(conditional_page('customer'), name='get')
 class CustomerDetailView(DetailView):
     model = Customer
     template_name = 'FD/customer_detail.html'
     context_object_name = 'customer'
 
+def customer_statement(request, pk):
+    """Statement of account (?start_date=&end_date=), streamed while invoices and payments are read"""
+    customer = get_object_or_404(Customer, pk=pk)
+    return statement_response(Statement(customer, *parse_period(request.GET)), request)
+
+def customer_statement_pdf(request, pk):
+    """Statement of account as PDF, same period parameters"""
+    customer = get_object_or_404(Customer, pk=pk)
+    statement = Statement(customer, *parse_period(request.GET))
+    try:
+        data = render_statement_pdf(statement, CompanySettings.objects.filter(is_active=True).first())
+    except ImportError:
+        messages.warning(request, 'PDF export requires reportlab library. Please install it: pip install reportlab')
+        return redirect('customer_statement', pk=pk)
+    return FileResponse(io.BytesIO(data), as_attachment=True, filename=statement_filename(statement), content_type='application/pdf')
+
 class CustomerDeleteView(DeleteView):
     model = Customer
     template_name = 'FD/customer_confirm_delete.html'
@@ -298,48 +357,24 @@ class CustomerDeleteView(DeleteView):
         return super().delete(request, *args, **kwargs)
 
 # Work Order Views - UPDATED with Enhanced Features
-class WorkOrderListView(ListView):
+class WorkOrderListView(KeysetPaginationMixin, ListView):
     model = WorkOrder
     template_name = 'FD/workorder_list.html'
     context_object_name = 'work_orders'
     paginate_by = 10
+    projection = WorkOrderRow  # only the columns the list renders
 
     def get_queryset(self):
-        queryset = WorkOrder.objects.all().order_by('-created_at')
-        
-        search_query = self.request.GET.get('search', '')
-        if search_query:
-            queryset = queryset.filter(
-                models.Q(work_order_number__icontains=search_query) |
-                models.Q(customer__company_name__icontains=search_query) |
-                models.Q(project_title__icontains=search_query)
-            )
-        
-        status_filter = self.request.GET.get('status', '')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Date range filtering
-        start_date = self.request.GET.get('start_date')
-        end_date = self.request.GET.get('end_date')
-        
-        if start_date and end_date:
-            try:
-                start = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end = datetime.strptime(end_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__range=[start, end])
-            except ValueError:
-                pass  # Invalid date format, ignore filter
-            
+        queryset, self.ranked_ids = filtered_queryset('work_order', self.request.GET)
         return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get the base queryset (before pagination)
-        base_queryset = self.get_queryset()
         
-        # Add total counts (not paginated)
-        context['total_work_orders_count'] = base_queryset.count()
+        # Add total counts (not paginated; cached count from the paginator)
+        context['total_work_orders_count'] = self.total_count
+        context['bulk_jobs'] = active_bulk_jobs('work_order')
+        context['filters_active'] = bool(active_filters('work_order', self.request.GET))  # 'Delete matching' needs one
         context['current_page_count'] = len(context['work_orders'])  # Current page count
         
         # Add filter parameters for template
@@ -357,20 +392,17 @@ class WorkOrderListView(ListView):
             action = request.POST.get('bulk_action')
             
             if action == 'export':
-                messages.info(request, f'Export feature for {len(selected_ids)} work orders coming soon!')
+                queryset = WorkOrder.objects.filter(id__in=selected_ids) if selected_ids else self.get_queryset()
+                return export_response('work_order', queryset, request.POST.get('export_format', 'csv'))
             elif action == 'delete':
-                if selected_ids:
-                    work_orders = WorkOrder.objects.filter(id__in=selected_ids)
-                    count = work_orders.count()
-                    work_orders.delete()
-                    messages.success(request, f'Successfully deleted {count} work orders.')
+                return queue_bulk_delete(request, 'work_order', 'work orders', selected_ids)
         
         return self.get(request, *args, **kwargs)
 
 class WorkOrderCreateView(CreateView):
     model = WorkOrder
     template_name = 'FD/workorder_form.html'
-    fields = ['customer', 'project_title', 'project_description', 'base_amount', 'gst_percentage', 'discount']
+    fields = ['customer', 'project_title', 'project_description', 'category', 'base_amount', 'gst_percentage', 'discount']
     success_url = reverse_lazy('workorder_list')
 
     def form_valid(self, form):
@@ -399,7 +431,7 @@ class WorkOrderCreateView(CreateView):
 class WorkOrderUpdateView(UpdateView):
     model = WorkOrder
     template_name = 'FD/workorder_form.html'
-    fields = ['customer', 'project_title', 'project_description', 'base_amount', 'gst_percentage', 'discount', 'status']
+    fields = ['customer', 'project_title', 'project_description', 'category', 'base_amount', 'gst_percentage', 'discount', 'status']
     success_url = reverse_lazy('workorder_list')
 
     def form_valid(self, form):
@@ -526,6 +558,7 @@ class ConvertToInvoiceView(View):
             print(traceback.format_exc())  # For debugging
             return redirect('workorder_detail', pk=pk)
 
+@method_decorator(conditional_page('invoice'), name='get')
 class InvoicePreviewView(DetailView):
     """Show invoice preview with payment details before printing"""
     model = Invoice
@@ -547,64 +580,38 @@ class InvoicePreviewView(DetailView):
             
         return context
           
+@method_decorator(conditional_page('work_order'), name='get')
 class PrintWorkOrderView(DetailView):
     model = WorkOrder
     template_name = 'FD/print_workorder.html'
     context_object_name = 'work_order'
 
 # Invoice Views with Enhanced Features
-class InvoiceListView(ListView):
+class InvoiceListView(KeysetPaginationMixin, ListView):
     model = Invoice
     template_name = 'FD/invoice_list.html'
     context_object_name = 'invoices'
     paginate_by = 10
+    projection = InvoiceRow  # only the columns the list renders
 
     def get_queryset(self):
-        queryset = Invoice.objects.all().order_by('-created_at')
-        
-        search_query = self.request.GET.get('search', '')
-        if search_query:
-            queryset = queryset.filter(
-                models.Q(invoice_number__icontains=search_query) |
-                models.Q(customer__company_name__icontains=search_query) |
-                models.Q(work_order__project_title__icontains=search_query)
-            )
-        
-        status_filter = self.request.GET.get('status', '')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Date range filtering
-        start_date = self.request.GET.get('start_date')
-        end_date = self.request.GET.get('end_date')
-        
-        if start_date and end_date:
-            try:
-                start = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end = datetime.strptime(end_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__range=[start, end])
-            except ValueError:
-                pass  # Invalid date format, ignore filter
-            
+        queryset, self.ranked_ids = filtered_queryset('invoice', self.request.GET)
         return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get the base queryset (before pagination)
-        base_queryset = self.get_queryset()
         
-        # Add total counts (not paginated)
-        context['total_invoices_count'] = base_queryset.count()
+        # Add total counts (not paginated; cached count from the paginator)
+        context['total_invoices_count'] = self.total_count
+        context['bulk_jobs'] = active_bulk_jobs('invoice')
+        context['filters_active'] = bool(active_filters('invoice', self.request.GET))  # 'Delete matching' needs one
+        context['pdf_batch_limit'] = REQUEST_MAX_INVOICES
         context['current_page_count'] = len(context['invoices'])  # Current page count
         
-        invoices = Invoice.objects.all()
-        total_revenue = sum(inv.total_amount for inv in invoices if inv.total_amount) or 0
-        pending_payments = sum(inv.balance_due for inv in invoices.exclude(status='paid') if inv.balance_due) or 0
-        collected_revenue = total_revenue - pending_payments
-        
-        context['total_revenue'] = total_revenue
-        context['pending_payments'] = pending_payments
-        context['collection_rate'] = (collected_revenue / total_revenue * 100) if total_revenue > 0 else 0
+        totals = revenue_totals()
+        context['total_revenue'] = totals['total_revenue']
+        context['pending_payments'] = totals['pending_payments']
+        context['collection_rate'] = totals['collection_rate']
         
         # Add filter parameters for template
         context['search_query'] = self.request.GET.get('search', '')
@@ -621,16 +628,14 @@ class InvoiceListView(ListView):
             action = request.POST.get('bulk_action')
             
             if action == 'export':
-                messages.info(request, f'Export feature for {len(selected_ids)} invoices coming soon!')
+                queryset = Invoice.objects.filter(id__in=selected_ids) if selected_ids else self.get_queryset()
+                return export_response('invoice', queryset, request.POST.get('export_format', 'csv'))
             elif action == 'delete':
-                if selected_ids:
-                    invoices = Invoice.objects.filter(id__in=selected_ids)
-                    count = invoices.count()
-                    invoices.delete()
-                    messages.success(request, f'Successfully deleted {count} invoices.')
+                return queue_bulk_delete(request, 'invoice', 'invoices', selected_ids)
         
         return self.get(request, *args, **kwargs)
     
+@method_decorator(conditional_page('invoice'), name='get')
 class InvoiceDetailView(DetailView):
     model = Invoice
     template_name = 'FD/invoice_detail.html'
@@ -655,98 +660,28 @@ class InvoiceDeleteView(DeleteView):
         messages.success(self.request, 'Invoice deleted successfully!')
         return super().delete(request, *args, **kwargs)
 
+@method_decorator(conditional_page('invoice'), name='get')
 class PrintInvoiceView(DetailView):
     model = Invoice
     template_name = 'FD/print_invoice_enhanced.html'
     context_object_name = 'invoice'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # Get active company settings
+    def get(self, request, *args, **kwargs):
+        pk = kwargs['pk']
+        # Usually rendered already by the job queued when the invoice last changed
         try:
-            context['company_settings'] = CompanySettings.objects.filter(is_active=True).first()
-        except Exception as e:
-            print(f"Error fetching company settings: {e}")
-            context['company_settings'] = None
-        return context
+            return HttpResponse(invoice_print_html(pk, validators(request, 'invoice', pk)[2]))
+        except Invoice.DoesNotExist:
+            raise Http404("No invoice found matching the query")
 
 # PDF Export Functionality with Error Handling
+@conditional_page('invoice')
 def export_invoice_pdf(request, pk):
     """Export invoice as PDF with fallback to HTML if reportlab not available"""
     try:
-        # Try to import reportlab
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib.units import inch
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib import colors
-        
-        invoice = get_object_or_404(Invoice, pk=pk)
-        company_settings = CompanySettings.objects.filter(is_active=True).first()
-        
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="invoice_{invoice.invoice_number}.pdf"'
-        
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Add company header
-        if company_settings:
-            story.append(Paragraph(company_settings.company_name, styles['Title']))
-            story.append(Paragraph(company_settings.address, styles['Normal']))
-            story.append(Paragraph(f"GST: {company_settings.gst_number}", styles['Normal']))
-            story.append(Spacer(1, 0.2*inch))
-        
-        # Add invoice header
-        story.append(Paragraph(f"INVOICE: {invoice.invoice_number}", styles['Heading1']))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Add invoice details
-        story.append(Paragraph(f"Date: {invoice.invoice_date}", styles['Normal']))
-        story.append(Paragraph(f"Due Date: {invoice.due_date}", styles['Normal']))
-        story.append(Paragraph(f"Customer: {invoice.customer.company_name}", styles['Normal']))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Add amount details
-        data = [
-            ['Description', 'Amount'],
-            ['Base Amount', f"₹{invoice.base_amount}"],
-            ['GST ({invoice.gst_percentage}%)', f"₹{invoice.gst_amount}"],
-            ['Total Amount', f"₹{invoice.total_amount}"],
-            ['Amount Paid', f"₹{invoice.amount_paid}"],
-            ['Balance Due', f"₹{invoice.balance_due}"],
-        ]
-        
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 12),
-        ]))
-        
-        story.append(table)
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Add terms and conditions
-        if invoice.terms_and_conditions:
-            story.append(Paragraph("Terms & Conditions:", styles['Heading2']))
-            story.append(Paragraph(invoice.terms_and_conditions, styles['Normal']))
-        
-        doc.build(story)
-        pdf = buffer.getvalue()
-        buffer.close()
-        response.write(pdf)
-        
-        return response
+        # Stored copy of the current version when there is one (sent without copying), else rendered now
+        pdf, invoice = document_pdf('invoice', pk, validators(request, 'invoice', pk)[2])
+        return FileResponse(pdf, as_attachment=True, filename=pdf_filename(invoice), content_type='application/pdf')
         
     except ImportError:
         # Fallback: redirect to print view with message
@@ -755,7 +690,33 @@ def export_invoice_pdf(request, pk):
     except Exception as e:
         messages.error(request, f'Error generating PDF: {str(e)}')
         return redirect('invoice_detail', pk=pk)
+
+@conditional_page('work_order')
+def export_work_order_pdf(request, pk):
+    """Export work order as PDF, same sections as the print view"""
+    try:
+        pdf, work_order = document_pdf('work_order', pk, validators(request, 'work_order', pk)[2])
+        return FileResponse(pdf, as_attachment=True, filename=work_order_filename(work_order), content_type='application/pdf')
+
+    except ImportError:
+        messages.warning(request, 'PDF export requires reportlab library. Please install it: pip install reportlab')
+        return redirect('print_workorder', pk=pk)
+    except Exception as e:
+        messages.error(request, f'Error generating PDF: {str(e)}')
+        return redirect('workorder_detail', pk=pk)
     
+def export_invoice_pdfs(request):
+    """
+    ZIP of invoice PDFs: ?ids=1,2,3 or the invoice list filters (search,
+    status, start_date, end_date) and invoice_date_from / invoice_date_to;
+    at most REQUEST_MAX_INVOICES of them
+    """
+    try:
+        queryset = request_queryset(request.GET)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return batch_pdf_response(queryset)
+
 # Payment Views
 class PaymentCreateView(CreateView):
     model = Payment
@@ -800,50 +761,48 @@ class PaymentDeleteView(DeleteView):
 
 # API Views
 class GSTLookupView(View):
+    async def get(self, request):
+        return JsonResponse(await sync_to_async(gstin.lookup)(request.GET.get('gst_number', '')))
+
+class GSTAutocompleteView(View):
+    async def get(self, request):
+        try:
+            limit = min(int(request.GET.get('limit', gstin.SUGGEST_LIMIT)), 50)
+        except ValueError:
+            limit = gstin.SUGGEST_LIMIT
+        matches = await sync_to_async(gstin.suggest)(request.GET.get('prefix', ''), max(limit, 1))
+        return JsonResponse({'success': True, 'matches': matches})
+
+@method_decorator(csrf_exempt, name='dispatch')  # read-only; posted to by the onboarding import scripts
+class GSTBatchLookupView(View):
+    """Resolve many GSTINs at once: ?gst_numbers=A,B,... or a JSON body {"gst_numbers": [...]}"""
+
     def get(self, request):
-        gst_number = request.GET.get('gst_number', '').strip()
-        
-        if not gst_number:
-            return JsonResponse({'success': False, 'error': 'GST number is required'})
-        
-        existing_customer = Customer.objects.filter(gst_number=gst_number).first()
-        if existing_customer:
-            return JsonResponse({
-                'success': True,
-                'company_name': existing_customer.company_name,
-                'address': existing_customer.address,
-                'contact_name': existing_customer.contact_name,
-                'email': existing_customer.email,
-                'mobile_number': existing_customer.mobile_number,
-                'from_database': True
-            })
-        
-        company_data = self.fetch_gst_details(gst_number)
-        return JsonResponse(company_data)
-    
-    def fetch_gst_details(self, gst_number):
+        return self.respond(request.GET.get('gst_numbers', '').split(','))
+
+    def post(self, request):
         try:
-            if len(gst_number) != 15:
-                return {'success': False, 'error': 'Invalid GST number format'}
-                
-            return {
-                'company_name': f'Company for GST {gst_number}',
-                'address': '123 Business Street, City, State - 560001',
-                'contact_name': 'Business Owner',
-                'email': f'contact{gst_number}@company.com',
-                'mobile_number': '9876543210',
-                'success': True,
-                'from_api': True
-            }
-            
-        except Exception as e:
-            return {'success': False, 'error': str(e)}
+            gst_numbers = json.loads(request.body or b'{}').get('gst_numbers', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({'success': False, 'error': 'Expected a JSON object with a gst_numbers list'}, status=400)
+        if not isinstance(gst_numbers, list):
+            return JsonResponse({'success': False, 'error': 'gst_numbers must be a list'}, status=400)
+        return self.respond([str(value) for value in gst_numbers])
+
+    def respond(self, gst_numbers):
+        gst_numbers = [value for value in gst_numbers if value.strip()]
+        if not gst_numbers:
+            return JsonResponse({'success': False, 'error': 'At least one GST number is required'}, status=400)
+        if len(gst_numbers) > gstin.MAX_BATCH:
+            return JsonResponse({'success': False, 'error': f'At most {gstin.MAX_BATCH} GST numbers per request'}, status=400)
+        results = gstin.lookup_many(gst_numbers)
+        return JsonResponse({'success': True, 'count': len(results), 'results': results})
 
 class ProjectAnalyticsView(View):
-    def get(self, request, project_id):
+    async def get(self, request, project_id):
         try:
-            work_order = get_object_or_404(WorkOrder, pk=project_id)
-            analytics_data = self.calculate_project_analytics(work_order)
+            work_order = await aget_object_or_404(WorkOrder, pk=project_id)
+            analytics_data = await self.calculate_project_analytics(work_order)
             
             return JsonResponse({
                 'success': True,
@@ -857,62 +816,94 @@ class ProjectAnalyticsView(View):
                 'error': str(e)
             }, status=400)
     
-    def calculate_project_analytics(self, work_order):
-        similar_projects = WorkOrder.objects.filter(
-            status='completed'
-        )
-        
-        actual_cost = float(work_order.total_cost) if work_order.total_cost else 0
-        
-        if similar_projects.exists():
-            avg_cost = sum(float(proj.total_cost) for proj in similar_projects if proj.total_cost) / len(similar_projects)
-            cost_variance = ((actual_cost - avg_cost) / avg_cost) * 100 if avg_cost > 0 else 0
-        else:
-            avg_cost = actual_cost
-            cost_variance = 0
+    async def calculate_project_analytics(self, work_order):
+        # Precomputed statistics of completed projects: one query, no scan of work orders
+        comparisons = await sync_to_async(project_statistics)(work_order)
+        overall = comparisons.get('all')
+        cost_variance = overall['cost_variance_percentage'] if overall else 0
         
         return {
-            'cost_variance_percentage': round(cost_variance, 1),
+            'cost_variance_percentage': cost_variance,
             'budget_health': 'within_budget' if cost_variance <= 10 else 'over_budget',
-            'similar_projects_comparison': len(similar_projects)
+            'similar_projects_comparison': overall['count'] if overall else 0,
+            'average_cost': overall['average_cost'] if overall else float(work_order.total_cost or 0),
+            'std_dev': overall['std_dev'] if overall else 0,
+            'z_score': overall['z_score'] if overall else 0,
+            'percentile_rank': overall['percentile_rank'] if overall else None,
+            'comparisons': comparisons,
         }
 
 # AI Analytics View
 class AIAnalyticsView(View):
-    def get(self, request):
+    async def get(self, request):
         # Get real data for predictions
         from django.utils import timezone
         from datetime import timedelta
         from decimal import Decimal
         
-        # Current data analysis
-        total_customers = Customer.objects.count()
-        total_invoices = Invoice.objects.count()
-        total_revenue = sum(inv.total_amount for inv in Invoice.objects.all() if inv.total_amount) or Decimal('0')
-        
         # Calculate growth rates from last 3 months
         three_months_ago = timezone.now() - timedelta(days=90)
         
+        # Current data, recent growth, the trend + seasonality forecast over the
+        # monthly series (cached until data changes) and the financial year,
+        # all independent of each other and awaited together
+        total_customers, breakdown, recent_customers, recent_totals, forecast, fy_summary = await asyncio.gather(
+            Customer.objects.acount(),
+            ainvoice_breakdown(),
+            Customer.objects.filter(created_at__gte=three_months_ago).acount(),
+            arevenue_totals(Invoice.objects.filter(created_at__gte=three_months_ago)),
+            sync_to_async(get_forecast)(),
+            sync_to_async(financial_year_summary)(),
+        )
+        revenue = summarize_revenue(breakdown)
+        total_invoices = revenue['invoice_count']
+        total_revenue = revenue['total_revenue']
+        
         # Customer growth calculation
-        recent_customers = Customer.objects.filter(created_at__gte=three_months_ago).count()
         customer_growth_rate = (recent_customers / total_customers * 100) if total_customers > 0 else 0
         
         # Revenue growth calculation
-        recent_revenue = sum(
-            inv.total_amount for inv in 
-            Invoice.objects.filter(created_at__gte=three_months_ago) 
-            if inv.total_amount
-        ) or Decimal('0')
+        recent_revenue = recent_totals['total_revenue']
         revenue_growth_rate = (recent_revenue / total_revenue * 100) if total_revenue > 0 else 0
         
         # AI Predictions based on real data
         predicted_customers = int(total_customers * (1 + customer_growth_rate/100))
         predicted_revenue = total_revenue * (1 + revenue_growth_rate/100)
+        forecast_context = {}
+        
+        if forecast:
+            revenue_fc = forecast['revenue']
+            customers_fc = forecast['customers']
+            # Step 0 is the current, still open month; "next month" is step 1
+            next_month = revenue_fc['forecast'][1]
+            last_month = revenue_fc['last_actual']
+            revenue_change = ((next_month - last_month) / last_month * 100) if last_month > 0 else 0
+            
+            predicted_customers = total_customers + round(sum(customers_fc['forecast'][1:]))
+            predicted_revenue = total_revenue + Decimal(str(round(sum(revenue_fc['forecast'][1:]), 2)))
+            customer_growth_rate = ((predicted_customers - total_customers) / total_customers * 100) if total_customers > 0 else 0
+            revenue_growth_rate = float((predicted_revenue - total_revenue) / total_revenue * 100) if total_revenue > 0 else 0
+            
+            forecast_context = {
+                'next_month_revenue': next_month,
+                'next_month_revenue_low': revenue_fc['lower'][1],
+                'next_month_revenue_high': revenue_fc['upper'][1],
+                'revenue_change': revenue_change,
+                'revenue_trend': 'up' if revenue_change >= 0 else 'down',
+                'expected_invoices': round(forecast['invoices']['forecast'][1]),
+                'predicted_revenue_low': total_revenue + Decimal(str(round(sum(revenue_fc['lower'][1:]), 2))),
+                'predicted_revenue_high': total_revenue + Decimal(str(round(sum(revenue_fc['upper'][1:]), 2))),
+                'revenue_forecast': [
+                    {'month': month, 'forecast': point, 'lower': low, 'upper': high}
+                    for month, point, low, high in zip(
+                        forecast['months'], revenue_fc['forecast'], revenue_fc['lower'], revenue_fc['upper']
+                    )
+                ],
+            }
         
         # Payment analysis
-        paid_invoices = Invoice.objects.filter(status='paid')
-        pending_invoices = Invoice.objects.filter(status__in=['sent', 'partially_paid'])
-        overdue_invoices = Invoice.objects.filter(status='overdue')
+        status_counts = revenue['status_counts']
+        pending_statuses = ['sent', 'partially_paid']
         
         context = {
             # Real current data
@@ -927,16 +918,22 @@ class AIAnalyticsView(View):
             'revenue_growth_rate': round(revenue_growth_rate, 1),
             
             # Payment analysis
-            'paid_invoices_count': paid_invoices.count(),
-            'pending_invoices_count': pending_invoices.count(),
-            'overdue_invoices_count': overdue_invoices.count(),
-            'paid_amount': sum(inv.total_amount for inv in paid_invoices if inv.total_amount) or Decimal('0'),
-            'pending_amount': sum(inv.balance_due for inv in pending_invoices if inv.balance_due) or Decimal('0'),
+            'paid_invoices_count': status_counts.get('paid', 0),
+            'pending_invoices_count': sum(status_counts.get(status, 0) for status in pending_statuses),
+            'overdue_invoices_count': status_counts.get('overdue', 0),
+            'paid_amount': revenue['status_totals'].get('paid', Decimal('0')),
+            'pending_amount': sum(
+                (revenue['status_balances'].get(status, Decimal('0')) for status in pending_statuses),
+                Decimal('0')
+            ),
             
             # Financial year
             'financial_year': self.get_financial_year(),
+            'fy_summary': fy_summary,
+            
+            **forecast_context,
         }
-        return render(request, 'FD/ai_analytics.html', context)
+        return await arender(request, 'FD/ai_analytics.html', context)
     
     def get_financial_year(self):
         from datetime import datetime
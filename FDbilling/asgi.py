@@ -3,6 +3,17 @@ ASGI config for FDbilling project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The dashboard, AI analytics and the GST lookup / project analytics JSON
+endpoints are async views; served over ASGI they wait on the database
+without holding a worker each. Run with any ASGI server, e.g.:
+
+    pip install uvicorn
+    uvicorn FDbilling.asgi:application --workers 2
+
+(set DJANGO_SETTINGS_MODULE=FDbilling.settings_online for production, and
+run collectstatic first). WSGI (FDbilling/wsgi.py) keeps working; async
+views are then run to completion inside the request's worker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -36,6 +36,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "FD.instrumentation.QueryLogMiddleware",  # Opt-in, see FD_QUERY_LOG
 ]
 
 ROOT_URLCONF = "FDbilling.urls"
@@ -64,6 +65,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file, not shared-cache memory, so threaded tests get real database locking
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -136,6 +139,11 @@ SECURE_CONTENT_TYPE_NOSNIFF = True
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json_lines': {
+            'format': '%(message)s',
+        },
+    },
     'handlers': {
         'console': {
             'level': 'DEBUG',
@@ -146,6 +154,15 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'filename': BASE_DIR / 'debug.log',
         },
+        'query_log': {
+            'level': 'INFO',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'query_log.jsonl',
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 5,
+            'formatter': 'json_lines',
+            'delay': True,
+        },
     },
     'loggers': {
         'django': {
@@ -158,9 +175,37 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'FD.querylog': {
+            'handlers': ['query_log'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
+# Per-request SQL timing (FD/instrumentation.py); view at /query-log/ as staff
+FD_QUERY_LOG = {
+    'ENABLED': False,
+    'SLOW_QUERY_MS': 100,
+    'TOP_N': 5,
+    'EXPLAIN': True,
+}
+
+# Rendered invoice PDFs (FD/pdf_store.py), reused until the invoice, its
+# payments or the company settings change
+FD_PDF_STORE = {
+    'BACKEND': 'disk',  # or 'cache' to keep them in the default cache
+    'DIRECTORY': MEDIA_ROOT / 'pdf_cache',
+    'MAX_BYTES': 256 * 1024 * 1024,
+}
+
+# Invoice PDFs and print pages rendered in the background after each change
+# (FD/prerender.py); failures are listed under Background jobs in the admin
+FD_PRERENDER = {
+    'ENABLED': True,
+    'PRINT_TIMEOUT': 30 * 24 * 60 * 60,
+}
+
 # Custom settings for your application
 FOLKDRIVE_SETTINGS = {
     'COMPANY_NAME': 'FolkDrive Solutions',
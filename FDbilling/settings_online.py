@@ -33,6 +33,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware", 
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "FD.instrumentation.QueryLogMiddleware",  # Opt-in, see FD_QUERY_LOG
 ]
 
 ROOT_URLCONF = "FDbilling.urls"
@@ -52,6 +53,15 @@ DATABASES = {
     }
 }
 
+# Cache shared by all web workers (dashboard data and its version key).
+# Create the table once with: python manage.py createcachetable
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'fd_cache',
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -76,6 +86,7 @@ USE_TZ = True
 
 # Static files
 STATIC_URL = "/static/"
+STATICFILES_DIRS = [BASE_DIR / "static"]  # CSS/JS moved out of the templates (extract_inline_assets)
 STATIC_ROOT = "/home/Folkdrive/folkdrive-billing/staticfiles"  # ⚠️ Check folder name
 
 # Default primary key field type
@@ -95,4 +106,57 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 # Security settings for production
 SECURE_SSL_REDIRECT = True
 SESSION_COOKIE_SECURE = True
-CSRF_COOKIE_SECURE = True
\ No newline at end of file
+CSRF_COOKIE_SECURE = True
+
+# Per-request SQL timing (FD/instrumentation.py); view at /query-log/ as staff
+FD_QUERY_LOG = {
+    'ENABLED': False,
+    'SLOW_QUERY_MS': 200,
+    'TOP_N': 5,
+    'EXPLAIN': True,
+}
+
+# Rendered invoice PDFs (FD/pdf_store.py), reused until the invoice, its
+# payments or the company settings change
+FD_PDF_STORE = {
+    'BACKEND': 'disk',  # or 'cache' to keep them in the default cache
+    'DIRECTORY': BASE_DIR / 'media' / 'pdf_cache',
+    'MAX_BYTES': 256 * 1024 * 1024,
+}
+
+# Invoice PDFs and print pages rendered in the background after each change
+# (FD/prerender.py); failures are listed under Background jobs in the admin
+FD_PRERENDER = {
+    'ENABLED': True,
+    'PRINT_TIMEOUT': 30 * 24 * 60 * 60,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_lines': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'query_log': {
+            'level': 'INFO',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'query_log.jsonl',
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 5,
+            'formatter': 'json_lines',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'FD.querylog': {
+            'handlers': ['query_log'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+(BASE_DIR / 'logs').mkdir(parents=True, exist_ok=True)
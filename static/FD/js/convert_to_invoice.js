@@ -0,0 +1,96 @@
+// Enhanced conversion functionality
+const conversionData = document.currentScript.dataset;
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize AOS
+    AOS.init({
+        duration: 800,
+        once: true,
+        offset: 50
+    });
+
+    // Toggle payment fields
+    const collectPayment = document.getElementById('collect_payment');
+    const paymentFields = document.getElementById('paymentFields');
+
+    if (collectPayment && paymentFields) {
+        collectPayment.addEventListener('change', function() {
+            if (this.checked) {
+                paymentFields.style.display = 'block';
+                // Set default payment amount to full amount
+                document.getElementById('payment_amount').value = conversionData.totalCost;
+            } else {
+                paymentFields.style.display = 'none';
+                // Clear payment fields
+                document.getElementById('payment_amount').value = '';
+                document.getElementById('reference_number').value = '';
+                document.getElementById('payment_notes').value = '';
+            }
+        });
+    }
+
+    // Form validation
+    const form = document.getElementById('conversionForm');
+    const invoiceDate = document.getElementById('invoice_date');
+
+    // Set minimum date to today
+    const today = new Date().toISOString().split('T')[0];
+    if (invoiceDate) invoiceDate.min = today;
+
+    // Payment amount validation
+    const paymentAmount = document.getElementById('payment_amount');
+    if (paymentAmount) {
+        paymentAmount.addEventListener('input', function() {
+            const maxAmount = parseFloat(conversionData.totalCost);
+            const enteredAmount = parseFloat(this.value) || 0;
+
+            if (enteredAmount > maxAmount) {
+                this.value = maxAmount;
+                showToast('Payment amount cannot exceed invoice total', 'warning');
+            }
+        });
+    }
+
+    // Form submission
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            let isValid = true;
+
+            // Basic validation
+            if (!invoiceDate.value) {
+                isValid = false;
+                showToast('Please select an invoice date', 'error');
+            }
+
+            if (!isValid) {
+                e.preventDefault();
+            } else {
+                showLoading();
+            }
+        });
+    }
+
+    // Auto-fill reference number for cash payments
+    const paymentMethod = document.getElementById('payment_method');
+    if (paymentMethod) {
+        paymentMethod.addEventListener('change', function() {
+            const referenceInput = document.getElementById('reference_number');
+            if (this.value === 'cash' && referenceInput && !referenceInput.value) {
+                referenceInput.value = 'CASH' + new Date().getTime().toString().slice(-6);
+            }
+        });
+    }
+
+    console.log('Convert to invoice page loaded successfully');
+});
+
+// Helper functions
+function showToast(message, type) {
+    // You can implement a toast notification system here
+    console.log(`${type.toUpperCase()}: ${message}`);
+}
+
+function showLoading() {
+    // You can implement a loading indicator here
+    console.log('Creating invoice...');
+}
@@ -0,0 +1,34 @@
+// Customer detail page interactions
+document.addEventListener('DOMContentLoaded', function() {
+    // Enhanced table row interactions
+    const tableRows = document.querySelectorAll('.table-row');
+    tableRows.forEach(row => {
+        row.addEventListener('click', function(e) {
+            if (!e.target.closest('.action-buttons')) {
+                const viewLink = this.querySelector('a[href*="workorder_detail"]');
+                if (viewLink) {
+                    viewLink.click();
+                }
+            }
+        });
+    });
+
+    // Add confirmation for delete action
+    const deleteForm = document.querySelector('form[action*="customer_delete"]');
+    if (deleteForm) {
+        deleteForm.addEventListener('submit', function(e) {
+            if (!confirm('Are you sure you want to delete this customer? This action cannot be undone.')) {
+                e.preventDefault();
+            }
+        });
+    }
+
+    // Initialize AOS
+    AOS.init({
+        duration: 800,
+        once: true,
+        offset: 50
+    });
+
+    console.log('Customer detail page loaded successfully');
+});
@@ -0,0 +1,95 @@
+// Enhanced form interactions
+const customerFormData = document.currentScript.dataset;
+
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.querySelector('.customer-form');
+    const gstInput = document.getElementById(customerFormData.gstInput);
+    const mobileInput = document.getElementById(customerFormData.mobileInput);
+
+    // GST number validation
+    if (gstInput) {
+        gstInput.addEventListener('blur', function() {
+            const gstNumber = this.value.trim();
+            if (gstNumber && gstNumber.length !== 15) {
+                this.classList.add('has-error');
+            } else {
+                this.classList.remove('has-error');
+            }
+        });
+    }
+
+    // Mobile number validation
+    if (mobileInput) {
+        mobileInput.addEventListener('blur', function() {
+            const mobileNumber = this.value.trim();
+            const mobileRegex = /^[6-9]\d{9}$/;
+
+            if (mobileNumber && !mobileRegex.test(mobileNumber)) {
+                this.classList.add('has-error');
+            } else {
+                this.classList.remove('has-error');
+            }
+        });
+    }
+
+    // Auto-format GST number to uppercase
+    if (gstInput) {
+        gstInput.addEventListener('input', function() {
+            this.value = this.value.toUpperCase();
+        });
+    }
+
+    // Suggest existing customers' GST numbers while typing
+    if (gstInput) {
+        const gstSuggestions = document.createElement('datalist');
+        gstSuggestions.id = 'gst-suggestions';
+        gstInput.after(gstSuggestions);
+        gstInput.setAttribute('list', gstSuggestions.id);
+        gstInput.setAttribute('autocomplete', 'off');
+
+        let suggestTimer = null;
+        gstInput.addEventListener('input', function() {
+            const prefix = this.value.trim();
+            clearTimeout(suggestTimer);
+            if (prefix.length < 2 || prefix.length >= 15) {
+                gstSuggestions.innerHTML = '';
+                return;
+            }
+            suggestTimer = setTimeout(function() {
+                fetch(customerFormData.autocompleteUrl + '?prefix=' + encodeURIComponent(prefix))
+                    .then(response => response.json())
+                    .then(data => {
+                        gstSuggestions.innerHTML = '';
+                        (data.matches || []).forEach(match => {
+                            const option = document.createElement('option');
+                            option.value = match.gst_number;
+                            option.label = match.company_name;
+                            gstSuggestions.appendChild(option);
+                        });
+                    })
+                    .catch(() => {});
+            }, 150);
+        });
+    }
+
+    // Enhanced focus effects
+    const formControls = form.querySelectorAll('.form-control');
+    formControls.forEach(control => {
+        control.addEventListener('focus', function() {
+            this.parentElement.classList.add('focused');
+        });
+
+        control.addEventListener('blur', function() {
+            this.parentElement.classList.remove('focused');
+        });
+    });
+
+    // Initialize AOS
+    AOS.init({
+        duration: 800,
+        once: true,
+        offset: 50
+    });
+
+    console.log('Customer form loaded successfully');
+});
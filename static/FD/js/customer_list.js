@@ -0,0 +1,58 @@
+// Enhanced stats animations
+document.addEventListener('DOMContentLoaded', function() {
+    // Animate progress rings
+    const progressRings = document.querySelectorAll('.progress-ring-fill');
+    progressRings.forEach(ring => {
+        const radius = ring.r.baseVal.value;
+        const circumference = radius * 2 * Math.PI;
+        const offset = circumference - (65 / 100) * circumference;
+        ring.style.strokeDasharray = `${circumference} ${circumference}`;
+        ring.style.strokeDashoffset = circumference;
+
+        setTimeout(() => {
+            ring.style.strokeDashoffset = offset;
+        }, 500);
+    });
+
+    // Animate graph bars on hover
+    const statCards = document.querySelectorAll('.stat-card');
+    statCards.forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            const graphBars = this.querySelectorAll('.graph-bar');
+            graphBars.forEach((bar, index) => {
+                setTimeout(() => {
+                    bar.style.transform = 'scaleY(1.2)';
+                }, index * 100);
+            });
+        });
+
+        card.addEventListener('mouseleave', function() {
+            const graphBars = this.querySelectorAll('.graph-bar');
+            graphBars.forEach(bar => {
+                bar.style.transform = 'scaleY(1)';
+            });
+        });
+    });
+
+    // Table row interactions
+    const tableRows = document.querySelectorAll('.table-row');
+    tableRows.forEach(row => {
+        row.addEventListener('click', function(e) {
+            if (!e.target.closest('.action-buttons')) {
+                const viewLink = this.querySelector('a[title="View Details"]');
+                if (viewLink) {
+                    viewLink.click();
+                }
+            }
+        });
+    });
+
+    // Initialize AOS
+    AOS.init({
+        duration: 800,
+        once: true,
+        offset: 50
+    });
+
+    console.log('Customer list with stunning stats loaded successfully');
+});
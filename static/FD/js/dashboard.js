@@ -0,0 +1,64 @@
+// Initialize AOS animations
+document.addEventListener('DOMContentLoaded', function() {
+    AOS.init({
+        duration: 400,
+        once: true,
+        offset: 10
+    });
+
+    // Tab functionality
+    const tabButtons = document.querySelectorAll('.tab-btn');
+    const tabContents = document.querySelectorAll('.tab-content');
+
+    tabButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const targetTab = this.getAttribute('data-tab');
+
+            tabButtons.forEach(btn => btn.classList.remove('active'));
+            this.classList.add('active');
+
+            tabContents.forEach(content => {
+                content.classList.remove('active');
+                if (content.id === targetTab) {
+                    content.classList.add('active');
+                }
+            });
+        });
+    });
+
+    // Quick Actions functionality
+    const navActions = document.querySelectorAll('.nav-action');
+
+    navActions.forEach(action => {
+        action.addEventListener('click', function() {
+            const actionType = this.getAttribute('data-action');
+
+            // Add click animation
+            this.style.transform = 'scale(0.95)';
+            setTimeout(() => {
+                this.style.transform = '';
+            }, 150);
+        });
+    });
+
+    // Calculate and set progress bar widths
+    function calculateProgressBars() {
+        const revenueCards = document.querySelectorAll('.revenue-card');
+
+        revenueCards.forEach(card => {
+            const collected = parseFloat(card.getAttribute('data-collected')) || 0;
+            const total = parseFloat(card.getAttribute('data-total')) || 0;
+            const progressFill = card.querySelector('.progress-fill');
+
+            if (total > 0 && progressFill) {
+                const percentage = (collected / total) * 100;
+                progressFill.style.width = percentage + '%';
+            }
+        });
+    }
+
+    // Initialize progress bars
+    calculateProgressBars();
+
+    console.log('Dashboard with enhanced navigation loaded successfully');
+});
@@ -0,0 +1,40 @@
+// Invoice detail interactions
+document.addEventListener('DOMContentLoaded', function() {
+    // Enhanced payment record interactions
+    const paymentRecords = document.querySelectorAll('.payment-record');
+    paymentRecords.forEach(record => {
+        record.addEventListener('click', function() {
+            // Add payment record click functionality here
+            console.log('Payment record clicked:', this);
+        });
+    });
+
+    // Initialize AOS
+    AOS.init({
+        duration: 800,
+        once: true,
+        offset: 50
+    });
+
+    // Add copy invoice number functionality
+    const invoiceNumber = document.querySelector('.brand-title');
+    if (invoiceNumber) {
+        invoiceNumber.addEventListener('click', function() {
+            const text = this.textContent;
+            navigator.clipboard.writeText(text).then(() => {
+                // Show copied notification
+                const originalText = this.textContent;
+                this.textContent = 'Copied!';
+                setTimeout(() => {
+                    this.textContent = originalText;
+                }, 2000);
+            });
+        });
+
+        // Add cursor pointer to indicate it's clickable
+        invoiceNumber.style.cursor = 'pointer';
+        invoiceNumber.title = 'Click to copy invoice number';
+    }
+
+    console.log('Invoice detail page with stunning design loaded successfully');
+});
@@ -0,0 +1,17 @@
+document.querySelectorAll('.job-progress-item').forEach(function (item) {
+    function poll() {
+        fetch(item.dataset.jobUrl, {headers: {'Accept': 'application/json'}})
+            .then(function (response) { return response.json(); })
+            .then(function (job) {
+                item.querySelector('.job-progress-bar').style.width = job.percent + '%';
+                item.querySelector('.job-progress-count').textContent = job.done + ' / ' + job.total;
+                if (job.status === 'done' || job.status === 'failed') {
+                    window.location.reload();
+                } else {
+                    setTimeout(poll, 1000);
+                }
+            })
+            .catch(function () { setTimeout(poll, 5000); });
+    }
+    setTimeout(poll, 1000);
+});
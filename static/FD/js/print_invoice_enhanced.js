@@ -0,0 +1,22 @@
+// Auto-print option (optional)
+window.onload = function() {
+    // Uncomment the line below if you want to auto-print
+    // setTimeout(() => { window.print(); }, 1000);
+};
+
+// Add smooth interactions for buttons
+document.addEventListener('DOMContentLoaded', function() {
+    const buttons = document.querySelectorAll('.print-btn, .close-btn');
+
+    buttons.forEach(button => {
+        button.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-2px)';
+        });
+
+        button.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+
+    console.log('Enhanced invoice print template loaded successfully');
+});
@@ -0,0 +1,21 @@
+// Email reminders functionality
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize AOS
+    AOS.init({
+        duration: 800,
+        once: true,
+        offset: 50
+    });
+
+    // Add confirmation for sending reminders
+    const sendForm = document.querySelector('form[action="send_reminders"]');
+    if (sendForm) {
+        sendForm.addEventListener('submit', function(e) {
+            if (!confirm('Are you sure you want to send payment reminders to all eligible invoices?')) {
+                e.preventDefault();
+            }
+        });
+    }
+
+    console.log('Payment reminders page loaded successfully');
+});
@@ -0,0 +1,101 @@
+// Enhanced financial calculations with animations
+const workOrderFormFields = document.currentScript.dataset;
+
+document.addEventListener('DOMContentLoaded', function() {
+    const baseAmountInput = document.getElementById(workOrderFormFields.baseAmount);
+    const gstPercentageInput = document.getElementById(workOrderFormFields.gstPercentage);
+    const discountInput = document.getElementById(workOrderFormFields.discount);
+
+    const baseAmountDisplay = document.getElementById('baseAmountDisplay');
+    const gstAmountDisplay = document.getElementById('gstAmountDisplay');
+    const discountAmountDisplay = document.getElementById('discountAmountDisplay');
+    const totalAmountDisplay = document.getElementById('totalAmountDisplay');
+
+    function calculateFinancials() {
+        const baseAmount = parseFloat(baseAmountInput?.value) || 0;
+        const gstPercentage = parseFloat(gstPercentageInput?.value) || 0;
+        const discount = parseFloat(discountInput?.value) || 0;
+
+        // Calculate discount amount
+        const discountAmount = (baseAmount * discount) / 100;
+
+        // Calculate taxable amount after discount
+        const taxableAmount = baseAmount - discountAmount;
+
+        // Calculate GST amount
+        const gstAmount = (taxableAmount * gstPercentage) / 100;
+
+        // Calculate total amount
+        const totalAmount = taxableAmount + gstAmount;
+
+        // Animate number updates
+        animateNumber(baseAmountDisplay, baseAmount);
+        animateNumber(gstAmountDisplay, gstAmount);
+        animateNumber(discountAmountDisplay, discountAmount);
+        animateNumber(totalAmountDisplay, totalAmount);
+    }
+
+    function animateNumber(element, value) {
+        if (!element) return;
+
+        const start = parseFloat(element.textContent.replace('₹', '')) || 0;
+        const duration = 500;
+        const startTime = performance.now();
+
+        function update(currentTime) {
+            const elapsed = currentTime - startTime;
+            const progress = Math.min(elapsed / duration, 1);
+
+            // Easing function
+            const easeOut = 1 - Math.pow(1 - progress, 3);
+            const currentValue = start + (value - start) * easeOut;
+
+            element.textContent = '₹' + currentValue.toFixed(2);
+
+            if (progress < 1) {
+                requestAnimationFrame(update);
+            }
+        }
+
+        requestAnimationFrame(update);
+    }
+
+    // Add event listeners for real-time calculation
+    if (baseAmountInput) baseAmountInput.addEventListener('input', calculateFinancials);
+    if (gstPercentageInput) gstPercentageInput.addEventListener('input', calculateFinancials);
+    if (discountInput) discountInput.addEventListener('input', calculateFinancials);
+
+    // Initial calculation
+    calculateFinancials();
+
+    // Enhanced form interactions
+    const form = document.querySelector('.workorder-form');
+    const formControls = form.querySelectorAll('.form-control');
+
+    formControls.forEach(control => {
+        control.addEventListener('focus', function() {
+            this.parentElement.classList.add('focused');
+        });
+
+        control.addEventListener('blur', function() {
+            this.parentElement.classList.remove('focused');
+        });
+    });
+
+    // Auto-focus first field
+    const firstField = form.querySelector('input, select, textarea');
+    if (firstField) {
+        setTimeout(() => {
+            firstField.focus();
+        }, 300);
+    }
+
+    // Initialize AOS
+    AOS.init({
+        duration: 800,
+        once: true,
+        offset: 50
+    });
+
+    console.log('Work order form with stunning design loaded successfully');
+});